@@ -20,6 +20,11 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = None
 
+# alembic.ini의 자리표시자 대신 애플리케이션과 같은 DB 설정(.env) 사용
+if config.get_main_option("sqlalchemy.url", "").startswith("driver://"):
+    from stock.backend.core.config import db_settings
+    config.set_main_option("sqlalchemy.url", db_settings.url.replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -0,0 +1,58 @@
+"""crypto_quotes 숫자형 가격/거래량 컬럼 추가
+
+문자열 p/v 컬럼은 전환 기간 동안 유지하고, 새 price/volume(DOUBLE) 컬럼을
+추가한 뒤 기존 행을 id 구간별로 나눠 채움. 애플리케이션은 두 컬럼을 모두 쓰고
+읽을 때는 price가 NULL이면 p로 대체함 (CryptoQuote.price_value).
+백필이 끝나고 모든 인스턴스가 이 버전 이상이면 후속 리비전에서 p/v를 제거할 수 있음.
+
+Revision ID: 3a7c1e9b2d45
+Revises: 
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c1e9b2d45'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 백필 시 한 번에 갱신하는 id 구간 크기 (긴 잠금 방지)
+BACKFILL_CHUNK = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("crypto_quotes")}
+
+    # create_all로 이미 컬럼이 생긴 새 DB는 추가를 건너뜀
+    if "price" not in columns:
+        op.add_column("crypto_quotes", sa.Column("price", sa.Double(), nullable=True))
+    if "volume" not in columns:
+        op.add_column("crypto_quotes", sa.Column("volume", sa.Double(), nullable=True))
+
+    # 구간마다 바로 커밋해서 큰 테이블에서도 잠금을 짧게 유지
+    with op.get_context().autocommit_block():
+        max_id = bind.execute(sa.text("SELECT MAX(id) FROM crypto_quotes")).scalar() or 0
+        for start in range(0, max_id, BACKFILL_CHUNK):
+            bind.execute(
+                sa.text(
+                    "UPDATE crypto_quotes "
+                    "SET price = CAST(p AS DECIMAL(30, 10)), "
+                    "    volume = CAST(COALESCE(NULLIF(v, ''), '0') AS DECIMAL(30, 10)) "
+                    "WHERE id > :start AND id <= :end AND price IS NULL"
+                ),
+                {"start": start, "end": start + BACKFILL_CHUNK}
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("crypto_quotes", "volume")
+    op.drop_column("crypto_quotes", "price")
@@ -0,0 +1,93 @@
+"""시세 테이블 일 단위 RANGE 파티션 적용
+
+stock_quotes / crypto_quotes를 TO_DAYS(created_at) 기준 일 파티션으로 나눔.
+MySQL은 파티션 키가 모든 고유 키에 포함되어야 하므로 기본 키를 (id, created_at)로
+바꾸고 created_at을 NOT NULL로 만듦 (id 단일 인덱스는 AUTO_INCREMENT용으로 유지).
+가장 오래된 행의 날짜부터 오늘 + 3일까지 파티션을 만들고 MAXVALUE 파티션(pmax)을
+둠. 이후 파티션 추가/삭제는 services/retention.py가 주기적으로 처리함.
+
+MySQL이 아니면 아무것도 하지 않음 (보관 기간 정리는 청크 삭제로 동작).
+기존 행이 많으면 테이블을 다시 쓰므로 점검 시간에 실행해야 함.
+
+Revision ID: 8f2d4b6a1c37
+Revises: 3a7c1e9b2d45
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from datetime import date, datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d4b6a1c37'
+down_revision: Union[str, None] = '3a7c1e9b2d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("stock_quotes", "crypto_quotes")
+# 미리 만들어 둘 미래 일 파티션 수 (오늘 포함)
+FUTURE_PARTITIONS = 3
+# 파티션 수 상한 (MySQL 최대 8192개) - 더 오래된 행은 첫 파티션에 들어감
+MAX_INITIAL_PARTITIONS = 400
+
+
+def _partition_clause(day: date) -> str:
+    # TO_DAYS(d) == d.toordinal() + 365
+    return f"PARTITION p{day:%Y%m%d} VALUES LESS THAN ({(day + timedelta(days=1)).toordinal() + 365})"
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bool(bind.execute(
+        sa.text(
+            "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"table": table}
+    ).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+
+    today = datetime.utcnow().date()
+    for table in TABLES:
+        if _is_partitioned(bind, table):
+            continue
+
+        oldest = bind.execute(sa.text(f"SELECT MIN(created_at) FROM {table}")).scalar()
+        start = max(oldest.date() if oldest else today, today - timedelta(days=MAX_INITIAL_PARTITIONS))
+        days = [start + timedelta(days=offset) for offset in range((today - start).days + FUTURE_PARTITIONS)]
+        partitions = ", ".join(_partition_clause(day) for day in days)
+
+        # AUTO_INCREMENT 컬럼은 기본 키를 바꾸는 동안에도 자신이 첫 컬럼인 인덱스가 필요함
+        indexes = sa.inspect(bind).get_indexes(table)
+        if not any(index["column_names"][:1] == ["id"] for index in indexes):
+            op.create_index(f"ix_{table}_id", table, ["id"])
+
+        op.execute(f"UPDATE {table} SET created_at = COALESCE(updated_at, UTC_TIMESTAMP()) WHERE created_at IS NULL")
+        op.execute(
+            f"ALTER TABLE {table} MODIFY created_at DATETIME NOT NULL, "
+            f"DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        )
+        op.execute(
+            f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(created_at)) "
+            f"({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+
+    for table in TABLES:
+        if _is_partitioned(bind, table):
+            op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id), MODIFY created_at DATETIME NULL")
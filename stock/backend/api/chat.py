@@ -1,11 +1,14 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
 from sqlalchemy.orm import Session
 from stock.backend.database import get_db, SessionLocal
-from typing import Dict, List, Set
+from stock.backend.utils.ws_broadcast import encode_json, SendQueues, DROP_OLDEST
+from stock.backend.services.broker import broker, MessageBroker, CHAT_CHANNEL
+from typing import Any, Dict, List, Optional, Set
 import asyncio
 import json
 import logging
 import time
+import uuid
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -22,11 +25,19 @@ rest_router = APIRouter(
 
 # Symbol별 채팅방 관리
 class ChatRoomManager:
-    def __init__(self):
+    def __init__(self, message_broker: Optional[MessageBroker] = None):
         # symbol -> set of websockets
         self.chat_rooms: Dict[str, Set[WebSocket]] = {}
         # websocket -> user info
         self.user_connections: Dict[WebSocket, Dict] = {}
+        # connection id -> websocket (다른 워커로 전달되는 메시지에서 제외할 연결 지정용)
+        self.connection_ids: Dict[str, WebSocket] = {}
+        # 연결별 전송 대기열 - 채팅 메시지는 대체하지 않고 오래된 것부터 버림
+        self.queues = SendQueues(policy=DROP_OLDEST, on_evict=self.disconnect)
+        # 브로커가 있으면 모든 워커의 같은 채팅방에 전달, 없으면 이 워커의 채팅방에만 전달
+        self.broker = message_broker
+        if message_broker is not None:
+            message_broker.subscribe(CHAT_CHANNEL, self.deliver)
     
     async def connect(self, websocket: WebSocket, symbol: str, user_info: Dict):
         """채팅방에 연결"""
@@ -34,7 +45,11 @@ class ChatRoomManager:
             self.chat_rooms[symbol] = set()
         
         self.chat_rooms[symbol].add(websocket)
+        self.queues.register(websocket)
+        connection_id = uuid.uuid4().hex
+        self.connection_ids[connection_id] = websocket
         self.user_connections[websocket] = {
+            "connection_id": connection_id,
             "symbol": symbol,
             "nickname": user_info.get("nickname", "익명"),
             "user_id": user_info.get("user_id", "guest"),
@@ -71,6 +86,8 @@ class ChatRoomManager:
             
             # 사용자 연결 정보 제거
             del self.user_connections[websocket]
+            self.connection_ids.pop(user_info["connection_id"], None)
+            self.queues.unregister(websocket)
             
             logger.info(f" 사용자 '{nickname}' {symbol} 채팅방 퇴장")
             
@@ -87,21 +104,30 @@ class ChatRoomManager:
                 }))
     
     async def broadcast_to_room(self, symbol: str, message: Dict, exclude: WebSocket = None):
-        """특정 symbol 채팅방에 메시지 브로드캐스트"""
+        """특정 symbol 채팅방에 메시지 브로드캐스트 - 브로커를 거쳐 다른 워커의 같은 채팅방에도 전달"""
+        payload = {"symbol": symbol, "message": message}
+        if exclude is not None and exclude in self.user_connections:
+            payload["exclude"] = self.user_connections[exclude]["connection_id"]
+        
+        if self.broker is None:
+            self.deliver(payload)
+        else:
+            self.broker.publish(CHAT_CHANNEL, payload)
+    
+    def deliver(self, payload: Dict[str, Any]):
+        """이 워커에 연결된 채팅방 사용자에게 전송 (직렬화는 한 번, 전송은 연결별 대기열에서)"""
+        symbol = payload.get("symbol")
         if symbol not in self.chat_rooms:
             return
         
-        disconnected = []
-        for websocket in self.chat_rooms[symbol].copy():
-            if websocket != exclude:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except:
-                    disconnected.append(websocket)
-        
-        # 연결이 끊어진 WebSocket 정리
-        for ws in disconnected:
-            self.disconnect(ws)
+        # 전송 실패/느린 연결은 대기열이 self.disconnect로 정리
+        exclude = self.connection_ids.get(payload.get("exclude"))
+        recipients = [websocket for websocket in self.chat_rooms[symbol] if websocket != exclude]
+        self.queues.fan_out(recipients, encode_json(payload["message"]))
+    
+    async def send_personal_message(self, websocket: WebSocket, message: Dict):
+        """한 사용자에게만 전송 - 브로드캐스트와 같은 대기열을 거쳐 순서 유지"""
+        self.queues.send(websocket, encode_json(message))
     
     def get_room_info(self, symbol: str) -> Dict:
         """채팅방 정보 조회"""
@@ -124,7 +150,7 @@ class ChatRoomManager:
         }
 
 # 전역 채팅방 매니저
-chat_manager = ChatRoomManager()
+chat_manager = ChatRoomManager(broker)
 
 @router.websocket("/{symbol}")
 async def websocket_chat_endpoint(
@@ -146,7 +172,7 @@ async def websocket_chat_endpoint(
     try:
         # 현재 채팅방 정보 전송
         room_info = chat_manager.get_room_info(symbol.upper())
-        await websocket.send_text(json.dumps({
+        await chat_manager.send_personal_message(websocket, {
             "type": "room_info",
             "data": {
                 "symbol": symbol.upper(),
@@ -154,7 +180,7 @@ async def websocket_chat_endpoint(
                 "users": room_info["users"],
                 "message": f"{symbol.upper()} 채팅방에 입장했습니다."
             }
-        }))
+        })
         
         # 메시지 수신 루프
         while True:
@@ -184,10 +210,10 @@ async def websocket_chat_endpoint(
             except WebSocketDisconnect:
                 break
             except json.JSONDecodeError:
-                await websocket.send_text(json.dumps({
+                await chat_manager.send_personal_message(websocket, {
                     "type": "error",
                     "data": {"message": "잘못된 메시지 형식입니다."}
-                }))
+                })
             except Exception as e:
                 logger.error(f"채팅 메시지 처리 오류: {e}")
                 
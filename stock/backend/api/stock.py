@@ -1,12 +1,18 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from stock.backend.utils.ws_manager import safe_add_client, safe_remove_client
-import threading
 import asyncio
-import json
 import logging
-from stock.backend.services.stock_service import run_ws
+from stock.backend.auth.dependencies import get_admin_user
 from stock.backend.services.finnhub_service import get_stock_quote, get_stock_symbols, get_crypto_symbols
-from typing import List, Optional
+from stock.backend.services.tick_store import tick_store, to_epoch_ms, STOCK, CRYPTO
+from stock.backend.services.market_hub import market_hub, stock_topic, crypto_topic
+from stock.backend.database import run_db
+from stock.backend.utils.downsample import downsample_rows, LTTB, METHODS as DOWNSAMPLE_METHODS
+from stock.backend.utils.pagination import encode_cursor, decode_cursor
+from stock.backend.utils.streaming import iter_rows, NDJSON, CSV, FORMATS as STREAM_FORMATS
+from stock.backend.utils.ws_broadcast import encode_json
+from typing import Dict, List, Optional, Tuple
 import time
 
 # 로거 설정
@@ -25,102 +31,88 @@ rest_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-running_threads = {}
+def format_legacy_tick(tick: dict) -> dict:
+    """허브 틱을 레거시 클라이언트 형식(s/p/v/t)으로 변환"""
+    if tick["kind"] == CRYPTO:
+        return {
+            "type": "crypto_update",
+            "data": [{
+                "s": tick.get("s") or f"BINANCE:{tick['symbol']}USDT",
+                "p": str(tick["price"]),
+                "v": str(tick.get("volume", 0)),
+                "t": tick.get("t") or tick["timestamp"]
+            }],
+            "data_source": "memory"
+        }
+    
+    return {
+        "type": "stock_update",
+        "data": [{
+            "s": tick["symbol"],
+            "p": str(tick["price"]),
+            "v": "0",  # StockQuote에는 volume 필드가 없으므로 0으로 고정
+            "t": tick["timestamp"]
+        }],
+        "data_source": "memory"
+    }
+
+# 토픽별 마지막 레거시 틱과 인코딩 결과 - 같은 틱을 받는 연결들이 JSON 직렬화를 한 번만 하도록 공유
+_legacy_encoded: Dict[str, Tuple[dict, str]] = {}
+
+def encode_legacy_tick(topic: str, tick: dict) -> str:
+    """허브 틱을 레거시 형식 JSON 텍스트로 변환 - 허브가 구독자에게 같은 틱 객체를 전달하므로 틱마다 한 번만 직렬화"""
+    cached = _legacy_encoded.get(topic)
+    if cached is not None and cached[0] is tick:
+        return cached[1]
+    
+    encoded = encode_json(format_legacy_tick(tick))
+    _legacy_encoded[topic] = (tick, encoded)
+    return encoded
 
 @router.websocket("/stocks")
 async def websocket_endpoint(websocket: WebSocket, symbol: str = Query(...)):
     """
-    레거시 WebSocket 엔드포인트 - DB 기반으로 수정
+    레거시 WebSocket 엔드포인트 - 심볼 토픽을 구독해서 새 틱만 전송
     """
     await websocket.accept()
     
-    # DB 세션 가져오기
-    from stock.backend.database import get_db
-    db = next(get_db())
+    # 심볼 타입에 따라 구독할 토픽 결정
+    if symbol.startswith("BINANCE:"):
+        kind = CRYPTO
+        tick_symbol = symbol.split(":")[1].replace("USDT", "").upper()
+        topic = crypto_topic(tick_symbol)
+    else:
+        kind = STOCK
+        tick_symbol = symbol
+        topic = stock_topic(tick_symbol)
+    
+    async def send_tick(tick: dict):
+        await websocket.send_text(encode_legacy_tick(topic, tick))
     
     try:
-        # 심볼 타입에 따라 적절한 처리
-        if symbol.startswith("BINANCE:"):
-            # 암호화폐인 경우 - DB에서 조회
-            from stock.backend.models import CryptoQuote
-            from sqlalchemy import desc
-            crypto_symbol = symbol.split(":")[1].replace("USDT", "")
-            
-            while True:
-                try:
-                    # DB에서 최근 5개 레코드 조회
-                    recent_quotes = db.query(CryptoQuote)\
-                        .filter(CryptoQuote.symbol == crypto_symbol.upper())\
-                        .order_by(desc(CryptoQuote.created_at))\
-                        .limit(5)\
-                        .all()
-                    
-                    if recent_quotes:
-                        latest_quote = recent_quotes[0]
-                        formatted_data = {
-                            "type": "crypto_update",
-                            "data": [{
-                                "s": latest_quote.s,
-                                "p": latest_quote.p,
-                                "v": latest_quote.v,
-                                "t": latest_quote.t
-                            }],
-                            "data_source": "database"
-                        }
-                        await websocket.send_text(json.dumps(formatted_data))
-                    
-                    # 1초 간격
-                    await asyncio.sleep(1.0)
-                    
-                except WebSocketDisconnect:
-                    logger.info(f"레거시 암호화폐 WebSocket 연결 해제: {symbol}")
-                    break
-                except Exception as e:
-                    logger.error(f"암호화폐 WebSocket 오류: {e}")
-                    await asyncio.sleep(1.0)
-                    
-        else:
-            # 주식인 경우 - DB에서 조회
-            from stock.backend.models import StockQuote
-            from sqlalchemy import desc
-            
-            while True:
-                try:
-                    # DB에서 최근 5개 레코드 조회
-                    recent_quotes = db.query(StockQuote)\
-                        .filter(StockQuote.symbol == symbol)\
-                        .order_by(desc(StockQuote.created_at))\
-                        .limit(5)\
-                        .all()
-                    
-                    if recent_quotes:
-                        latest_quote = recent_quotes[0]
-                        formatted_data = {
-                            "type": "stock_update",
-                            "data": [{
-                                "s": symbol,
-                                "p": str(latest_quote.c),
-                                "v": "0",  # StockQuote에는 volume 필드가 없으므로 0으로 고정
-                                "t": int(latest_quote.created_at.timestamp() * 1000)
-                            }],
-                            "data_source": "database"
-                        }
-                        await websocket.send_text(json.dumps(formatted_data))
-                    
-                    # 2초 간격
-                    await asyncio.sleep(2.0)
-                    
-                except WebSocketDisconnect:
-                    logger.info(f"레거시 주식 WebSocket 연결 해제: {symbol}")
-                    break
-                except Exception as e:
-                    logger.error(f"주식 WebSocket 오류: {e}")
-                    await asyncio.sleep(2.0)
-                    
+        # 연결 즉시 최신 틱 한 번 전송
+        await tick_store.ensure_symbol_async(kind, tick_symbol)
+        latest = tick_store.get_latest(kind, tick_symbol)
+        if latest:
+            await send_tick({"kind": kind, "symbol": tick_symbol, **latest})
+        
+        await market_hub.stream(websocket, topic, send_tick)
+        
+    except WebSocketDisconnect:
+        logger.info(f"레거시 WebSocket 연결 해제: {symbol}")
     except Exception as e:
         logger.error(f"WebSocket 연결 오류: {e}")
-    finally:
-        db.close()
+
+def raise_quote_unavailable(symbol: str):
+    """수집기가 없는 워커에서 캐시 미스면 503 - 수집 인스턴스에 요청해 두었으므로 잠시 후 다시 시도"""
+    from stock.backend.core.config import app_settings
+    
+    if not app_settings.market_collector_enabled:
+        raise HTTPException(
+            status_code=503,
+            detail=f"'{symbol}' 시세를 수집 인스턴스에 요청했습니다. 잠시 후 다시 시도하세요",
+            headers={"Retry-After": "5"}
+        )
 
 # REST API 엔드포인트 - 주식 시세 정보 수정
 @rest_router.get("/quote")
@@ -138,7 +130,7 @@ async def get_stock_quote_endpoint(symbol: str = Query(...), save_to_db: bool =
         )
     
     # stock_service에서 캐시된 데이터 조회
-    from stock.backend.services.stock_service import get_cached_stock_data, register_symbol
+    from stock.backend.services.stock_service import get_cached_stock_data_async
     from stock.backend.services.quote_service import quote_service
     import logging
     
@@ -146,7 +138,7 @@ async def get_stock_quote_endpoint(symbol: str = Query(...), save_to_db: bool =
     logger.info(f"📡 REST API 요청 수신: {symbol}")
     
     # 캐시된 데이터 조회
-    data = get_cached_stock_data(symbol)
+    data = await get_cached_stock_data_async(symbol)
     
     if data:
         # 데이터 소스 정보 추출
@@ -178,45 +170,191 @@ async def get_stock_quote_endpoint(symbol: str = Query(...), save_to_db: bool =
         
         #  조건부 DB 저장
         if save_to_db and final_source == 'api':
-            saved = quote_service.save_stock_quote(response_data)
+            saved = await run_db(quote_service.save_stock_quote, response_data)
             logger.info(f" DB 저장: {symbol} {'성공' if saved else '실패'}")
         
         return response_data
     else:
         logger.error(f" 데이터 없음: {symbol}")
+        raise_quote_unavailable(symbol)
         raise HTTPException(status_code=404, detail=f"심볼 '{symbol}'의 데이터를 찾을 수 없습니다")
 
+# limit 없이 cursor만 주었을 때의 페이지 크기
+HISTORY_PAGE_SIZE = 500
+
+def format_stock_quote(quote) -> dict:
+    """StockQuote를 이력 응답 형식으로 변환"""
+    return {
+        "c": quote.c,
+        "d": quote.d,
+        "dp": quote.dp,
+        "h": quote.h,
+        "l": quote.l,
+        "o": quote.o,
+        "pc": quote.pc,
+        "created_at": quote.created_at.isoformat()
+    }
+
+def format_crypto_quote(quote) -> dict:
+    """CryptoQuote를 이력 응답 형식으로 변환"""
+    return {
+        "s": quote.s,
+        "p": quote.p,
+        "v": quote.v,
+        "t": quote.t,
+        "created_at": quote.created_at.isoformat()
+    }
+
+def parse_cursor(cursor: Optional[str]):
+    """next_cursor 문자열 검증"""
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def stream_history(chunks, columns: List[str], fmt: str, filename: str) -> StreamingResponse:
+    """이력 행 묶음을 NDJSON/CSV 스트리밍 응답으로 변환"""
+    try:
+        body = iter_rows(chunks, columns, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.csv"'} if fmt == CSV else None
+    return StreamingResponse(body, media_type=STREAM_FORMATS[fmt], headers=headers)
+
+def check_downsample_method(method: str):
+    """다운샘플링 방식 검증"""
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 다운샘플링 방식입니다: {method} (lttb, minmax)")
+
+async def get_bar_history(kind: str, symbol: str, hours: int, resolution: str,
+                          max_points: Optional[int] = None, downsample: str = LTTB) -> dict:
+    """OHLCV 봉 이력 응답 구성 (주식/암호화폐 이력 API 공용)"""
+    from stock.backend.services.bar_rollup import bar_rollup
+    
+    check_downsample_method(downsample)
+    try:
+        bars = await run_db(bar_rollup.get_bars, kind, symbol, hours, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    data = downsample_rows(
+        bars["data"],
+        [bar["t"] for bar in bars["data"]],
+        [bar["c"] for bar in bars["data"]],
+        max_points,
+        downsample
+    )
+    return {
+        "symbol": symbol,
+        "hours": hours,
+        "resolution": bars["resolution"],
+        "source_resolution": bars["source_resolution"],
+        "count": len(data),
+        "total_count": len(bars["data"]),
+        "data": data
+    }
+
+async def get_statistics(kind: str, symbol: str, window: str) -> dict:
+    """기간 통계 조회 (주식/암호화폐 통계 API 공용) - 캐시에 있으면 DB 스레드를 거치지 않음"""
+    from stock.backend.services.quote_statistics import quote_statistics
+    
+    stats = quote_statistics.get_cached(kind, symbol, window)
+    if stats is not None:
+        return stats
+    try:
+        return await run_db(quote_statistics.get_statistics, kind, symbol, window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 #  새로운 API 엔드포인트 추가
+@rest_router.get("/latest")
+async def get_latest_quotes(kind: str = Query(default=STOCK, description="stock 또는 crypto")):
+    """종류별 모든 심볼의 최신 시세 (최신 시세 테이블 한 번 조회)"""
+    from stock.backend.services.latest_quotes import latest_quotes, latest_quote_to_dict
+    
+    if kind not in (STOCK, CRYPTO):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 종류입니다: {kind}")
+    
+    quotes = await run_db(latest_quotes.get_latest, kind)
+    return {"kind": kind, "count": len(quotes), "data": [latest_quote_to_dict(quote) for quote in quotes]}
+
+@rest_router.get("/latest/{symbol}")
+async def get_latest_quote(symbol: str, kind: str = Query(default=STOCK, description="stock 또는 crypto")):
+    """심볼 하나의 최신 시세 (기본 키 조회)"""
+    from stock.backend.services.latest_quotes import latest_quotes, latest_quote_to_dict
+    
+    if kind not in (STOCK, CRYPTO):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 종류입니다: {kind}")
+    
+    quote = await run_db(latest_quotes.get, kind, symbol.upper())
+    if quote is None:
+        raise HTTPException(status_code=404, detail=f"심볼 '{symbol}'의 최신 시세가 없습니다")
+    return latest_quote_to_dict(quote)
+
 @rest_router.get("/history/{symbol}")
-async def get_stock_history(symbol: str, hours: int = Query(default=24, description="조회할 시간 범위 (시간 단위)")):
-    """주식 시세 이력 조회"""
+async def get_stock_history(
+    symbol: str,
+    hours: int = Query(default=24, description="조회할 시간 범위 (시간 단위)"),
+    resolution: str = Query(default="raw", description="봉 크기 (raw: 원본 시세, auto, 1m, 5m, 15m, 1h, 4h, 1d 등)"),
+    max_points: Optional[int] = Query(default=None, ge=4, description="최대 반환 개수 - 넘으면 차트 모양을 유지하며 다운샘플링"),
+    downsample: str = Query(default=LTTB, description="다운샘플링 방식 (lttb, minmax)"),
+    limit: Optional[int] = Query(default=None, ge=1, le=5000, description="페이지 크기 - 주면 (created_at, id) 키셋 페이지로 조회"),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor")
+):
+    """주식 시세 이력 조회 - resolution을 주면 OHLCV 봉 테이블에서 조회"""
     from stock.backend.services.quote_service import quote_service
     
-    history = quote_service.get_quote_history(symbol, hours)
-    return {
+    if resolution != "raw":
+        return await get_bar_history(STOCK, symbol, hours, resolution, max_points, downsample)
+    
+    check_downsample_method(downsample)
+    next_cursor = None
+    if limit or cursor:
+        history, next_cursor = await run_db(
+            quote_service.get_quote_history_page, symbol, hours, limit or HISTORY_PAGE_SIZE, parse_cursor(cursor)
+        )
+    else:
+        history = await run_db(quote_service.get_quote_history, symbol, hours)
+    total = len(history)
+    history = downsample_rows(
+        history,
+        [to_epoch_ms(quote.created_at) for quote in history],
+        [quote.c for quote in history],
+        max_points,
+        downsample
+    )
+    response = {
         "symbol": symbol,
         "hours": hours,
         "count": len(history),
-        "data": [
-            {
-                "c": quote.c,
-                "d": quote.d,
-                "dp": quote.dp,
-                "h": quote.h,
-                "l": quote.l,
-                "o": quote.o,
-                "pc": quote.pc,
-                "created_at": quote.created_at.isoformat()
-            } for quote in history
-        ]
+        "total_count": total,
+        "data": [format_stock_quote(quote) for quote in history]
     }
+    if limit or cursor:
+        response["next_cursor"] = encode_cursor(*next_cursor) if next_cursor else None
+    return response
 
-@rest_router.get("/statistics/{symbol}")
-async def get_stock_statistics(symbol: str):
-    """특정 심볼의 통계 정보 조회"""
-    from stock.backend.services.quote_service import quote_service
+@rest_router.get("/history/{symbol}/export")
+async def export_stock_history(
+    symbol: str,
+    hours: int = Query(default=24, ge=1, description="내보낼 시간 범위 (시간 단위)"),
+    format: str = Query(default=NDJSON, description="응답 형식 (ndjson, csv)")
+):
+    """주식 시세 이력 스트리밍 내보내기 - 서버 측 커서로 읽는 대로 전송 (최신순)"""
+    from stock.backend.services.quote_service import quote_service, STOCK_HISTORY_COLUMNS
     
-    stats = quote_service.get_quote_statistics(symbol)
+    return stream_history(
+        quote_service.iter_quote_history(symbol, hours), STOCK_HISTORY_COLUMNS, format, f"{symbol}_history"
+    )
+
+@rest_router.get("/statistics/{symbol}")
+async def get_stock_statistics(
+    symbol: str,
+    window: str = Query(default="24h", description="통계 기간 (1h, 24h, 7d)")
+):
+    """특정 심볼의 기간 통계 정보 조회 (최저/최고/평균/표준편차/변동률)"""
+    stats = await get_statistics(STOCK, symbol, window)
     if not stats:
         raise HTTPException(status_code=404, detail=f"심볼 '{symbol}'의 데이터를 찾을 수 없습니다")
     
@@ -227,7 +365,7 @@ async def get_stored_symbols():
     """저장된 모든 심볼 목록 조회"""
     from stock.backend.services.quote_service import quote_service
     
-    symbols = quote_service.get_all_symbols()
+    symbols = await run_db(quote_service.get_all_symbols)
     return {
         "total": len(symbols),
         "symbols": symbols 
@@ -319,10 +457,69 @@ async def get_collector_symbols():
         "symbols": MOST_ACTIVE_STOCKS
     }
 
+@rest_router.get("/finnhub/status")
+async def get_finnhub_status():
+    """공용 Finnhub 클라이언트 상태 조회 (요청 수, 429 횟수, 레인별 대기 수)"""
+    from stock.backend.services.finnhub_client import finnhub_client
+    
+    return finnhub_client.get_status()
+
+@rest_router.post("/bars/rebuild")
+async def rebuild_bars(
+    kind: str = Query(default=STOCK, description="stock 또는 crypto"),
+    hours: int = Query(default=24, ge=1, description="재계산할 시간 범위 (시간 단위, 최대 DB 보관 기간)"),
+    symbol: Optional[str] = Query(default=None, description="특정 심볼만 재계산"),
+    admin=Depends(get_admin_user)
+):
+    """원본 시세로 OHLCV 봉 재계산 (롤업 도입 이전 데이터 채우기, 관리자 전용)"""
+    from stock.backend.services.bar_rollup import bar_rollup
+    from stock.backend.core.config import db_settings
+    
+    if kind not in (STOCK, CRYPTO):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 종류입니다: {kind}")
+    max_hours = db_settings.retention_days * 24
+    if hours > max_hours:
+        raise HTTPException(status_code=400, detail=f"재계산 범위는 DB 보관 기간({max_hours}시간) 이내여야 합니다")
+    
+    processed = await run_db(bar_rollup.rebuild, kind, hours, symbol)
+    return {"message": "봉 재계산이 완료되었습니다", "processed_rows": processed}
+
+@rest_router.get("/finnhub/stream/status")
+async def get_finnhub_stream_status():
+    """Finnhub 실시간 체결 스트림 상태 조회 (연결 여부, 구독 심볼 수, 체결/반영 수)"""
+    from stock.backend.services.trade_stream import trade_stream
+    
+    return trade_stream.get_status()
+
+@rest_router.get("/db/write-buffer/status")
+async def get_write_buffer_status():
+    """시세 쓰기 버퍼 상태 조회 (대기 행 수, 저장 행 수, 저장 1회당 소요 시간)"""
+    from stock.backend.database import write_buffer
+    
+    return write_buffer.get_status()
+
+@rest_router.get("/db/retention/status")
+async def get_retention_status():
+    """시세 보관 기간 정리 상태 조회 (모드, 추가/삭제한 파티션, 삭제 진행 행 수)"""
+    from stock.backend.services.retention import retention_service
+    
+    return retention_service.get_status()
+
+@rest_router.post("/db/retention/run")
+async def run_retention(
+    days: Optional[int] = Query(default=None, ge=1, description="보관 기간 (일) - 없으면 설정값"),
+    admin=Depends(get_admin_user)
+):
+    """시세 보관 기간 정리 즉시 실행 (관리자 전용)"""
+    from stock.backend.services.retention import retention_service
+    
+    results = await run_db(retention_service.run_once, days)
+    return {"message": "보관 기간 정리가 완료되었습니다", "results": results}
+
 @rest_router.get("/crypto/{symbol}")
 async def get_crypto_quote(symbol: str):
     """암호화폐 시세 조회 API"""
-    from stock.backend.services.stock_service import get_cached_crypto_data, TOP_10_CRYPTOS
+    from stock.backend.services.stock_service import get_cached_crypto_data_async, TOP_10_CRYPTOS
     
     # 지원하는 암호화폐인지 확인
     if symbol.upper() not in TOP_10_CRYPTOS:
@@ -331,7 +528,7 @@ async def get_crypto_quote(symbol: str):
             detail=f"지원하지 않는 암호화폐입니다. 지원 목록: {', '.join(TOP_10_CRYPTOS)}"
         )
     
-    data = get_cached_crypto_data(symbol.upper())
+    data = await get_cached_crypto_data_async(symbol.upper())
     
     if data:
         return {
@@ -344,35 +541,73 @@ async def get_crypto_quote(symbol: str):
             "cache_age": data.get('_cache_age', 0)
         }
     else:
+        raise_quote_unavailable(symbol.upper())
         raise HTTPException(status_code=404, detail=f"암호화폐 '{symbol}' 데이터를 찾을 수 없습니다")
 
 @rest_router.get("/crypto/history/{symbol}")
-async def get_crypto_history(symbol: str, hours: int = Query(default=24, description="조회할 시간 범위 (시간 단위)")):
-    """암호화폐 시세 이력 조회"""
+async def get_crypto_history(
+    symbol: str,
+    hours: int = Query(default=24, description="조회할 시간 범위 (시간 단위)"),
+    resolution: str = Query(default="raw", description="봉 크기 (raw: 원본 시세, auto, 1m, 5m, 15m, 1h, 4h, 1d 등)"),
+    max_points: Optional[int] = Query(default=None, ge=4, description="최대 반환 개수 - 넘으면 차트 모양을 유지하며 다운샘플링"),
+    downsample: str = Query(default=LTTB, description="다운샘플링 방식 (lttb, minmax)"),
+    limit: Optional[int] = Query(default=None, ge=1, le=5000, description="페이지 크기 - 주면 (created_at, id) 키셋 페이지로 조회"),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor")
+):
+    """암호화폐 시세 이력 조회 - resolution을 주면 OHLCV 봉 테이블에서 조회"""
     from stock.backend.services.crypto_service import crypto_service
     
-    history = crypto_service.get_crypto_quote_history(symbol.upper(), hours)
-    return {
+    if resolution != "raw":
+        return await get_bar_history(CRYPTO, symbol.upper(), hours, resolution, max_points, downsample)
+    
+    check_downsample_method(downsample)
+    next_cursor = None
+    if limit or cursor:
+        history, next_cursor = await run_db(
+            crypto_service.get_crypto_quote_history_page, symbol.upper(), hours, limit or HISTORY_PAGE_SIZE, parse_cursor(cursor)
+        )
+    else:
+        history = await run_db(crypto_service.get_crypto_quote_history, symbol.upper(), hours)
+    total = len(history)
+    history = downsample_rows(
+        history,
+        [to_epoch_ms(quote.created_at) for quote in history],
+        [quote.price_value for quote in history],
+        max_points,
+        downsample
+    )
+    response = {
         "symbol": symbol.upper(),
         "hours": hours,
         "count": len(history),
-        "data": [
-            {
-                "s": quote.s,
-                "p": quote.p,
-                "v": quote.v,
-                "t": quote.t,
-                "created_at": quote.created_at.isoformat()
-            } for quote in history
-        ]
+        "total_count": total,
+        "data": [format_crypto_quote(quote) for quote in history]
     }
+    if limit or cursor:
+        response["next_cursor"] = encode_cursor(*next_cursor) if next_cursor else None
+    return response
 
-@rest_router.get("/crypto/statistics/{symbol}")
-async def get_crypto_statistics(symbol: str):
-    """특정 암호화폐의 통계 정보 조회"""
-    from stock.backend.services.crypto_service import crypto_service
+@rest_router.get("/crypto/history/{symbol}/export")
+async def export_crypto_history(
+    symbol: str,
+    hours: int = Query(default=24, ge=1, description="내보낼 시간 범위 (시간 단위)"),
+    format: str = Query(default=NDJSON, description="응답 형식 (ndjson, csv)")
+):
+    """암호화폐 시세 이력 스트리밍 내보내기 - 서버 측 커서로 읽는 대로 전송 (최신순)"""
+    from stock.backend.services.crypto_service import crypto_service, CRYPTO_HISTORY_COLUMNS
     
-    stats = crypto_service.get_crypto_quote_statistics(symbol.upper())
+    return stream_history(
+        crypto_service.iter_crypto_quote_history(symbol.upper(), hours), CRYPTO_HISTORY_COLUMNS, format,
+        f"{symbol.upper()}_history"
+    )
+
+@rest_router.get("/crypto/statistics/{symbol}")
+async def get_crypto_statistics(
+    symbol: str,
+    window: str = Query(default="24h", description="통계 기간 (1h, 24h, 7d)")
+):
+    """특정 암호화폐의 기간 통계 정보 조회 (최저/최고/평균/표준편차/VWAP/변동률)"""
+    stats = await get_statistics(CRYPTO, symbol.upper(), window)
     if not stats:
         raise HTTPException(status_code=404, detail=f"암호화폐 '{symbol}' 데이터를 찾을 수 없습니다")
     
@@ -383,7 +618,7 @@ async def get_stored_crypto_symbols():
     """저장된 모든 암호화폐 심볼 목록 조회"""
     from stock.backend.services.crypto_service import crypto_service
     
-    symbols = crypto_service.get_all_crypto_symbols()
+    symbols = await run_db(crypto_service.get_all_crypto_symbols)
     return {
         "total": len(symbols),
         "symbols": symbols
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Form, Request, Response
 from fastapi.responses import RedirectResponse, JSONResponse
 from sqlalchemy.orm import Session
-from stock.backend.database import get_db
+from stock.backend.database import get_db, run_db
 from stock.backend.auth.auth_service import create_access_token
 from stock.backend.auth.dependencies import get_current_user
 from stock.backend.auth.kakao_service import get_kakao_access_token, get_kakao_user_info
@@ -284,7 +284,7 @@ async def check_email_availability(
 ):
     """이메일 사용 가능 여부 확인"""
     try:
-        existing_user = crud.get_user_by_email(db, email)
+        existing_user = await run_db(crud.get_user_by_email, db, email)
         available = existing_user is None
 
         return {
@@ -304,7 +304,7 @@ async def check_nickname_availability(
 ):
     """닉네임 사용 가능 여부 확인"""
     try:
-        existing_user = crud.get_user_by_nickname(db, nickname)
+        existing_user = await run_db(crud.get_user_by_nickname, db, nickname)
         available = existing_user is None
 
         return {
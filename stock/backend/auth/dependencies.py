@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from stock.backend.database import get_db
 from stock.backend.auth.auth_service import extract_user_id
 from stock.backend.auth import crud
+from stock.backend.core.config import auth_settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,12 @@ def get_current_user(
         logger.error(f"사용자 인증 실패: {e}")
         raise HTTPException(status_code=401, detail="토큰 검증 실패")
 
+def get_admin_user(current_user=Depends(get_current_user)):
+    """관리자 사용자만 허용 (ADMIN_EMAILS에 등록된 이메일)"""
+    if (current_user.email or "").lower() not in auth_settings.admin_emails:
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
+    return current_user
+
 def get_current_user_optional(
     access_token: str = Cookie(None),
     db: Session = Depends(get_db)
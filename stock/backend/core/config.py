@@ -44,6 +44,18 @@ class DatabaseSettings:
         self.host = os.getenv("DB_HOST", "localhost")
         self.port = os.getenv("DB_PORT", "3306")
         self.name = os.getenv("DB_NAME", "stock_db")
+        # 이벤트 루프 밖에서 DB 호출을 처리할 스레드 수 (커넥션 풀 크기와 동일하게 유지)
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        # 시세 쓰기 버퍼 - N행 또는 T밀리초마다 다중 행 INSERT 한 번으로 저장
+        self.write_batch_size = int(os.getenv("DB_WRITE_BATCH_SIZE", "500"))
+        self.write_flush_ms = int(os.getenv("DB_WRITE_FLUSH_MS", "1000"))
+        # 저장 대기 행이 이 수를 넘으면 생산자를 잠시 멈춤 (backpressure)
+        self.write_max_pending = int(os.getenv("DB_WRITE_MAX_PENDING", "10000"))
+        # 시세 보관 기간 (일) - 지난 일 파티션은 삭제, 파티션이 없으면 나눠서 DELETE
+        self.retention_days = int(os.getenv("DB_RETENTION_DAYS", "7"))
+        # 보관 기간이 지난 시세를 삭제 전에 심볼/일별 압축 파일로 옮겨 둘 디렉터리 (백테스트용)
+        self.archive_enabled = os.getenv("QUOTE_ARCHIVE_ENABLED", "true").lower() == "true"
+        self.archive_dir = os.getenv("QUOTE_ARCHIVE_DIR", str(project_root / "data" / "quote_archive"))
         
         print(f" 데이터베이스 설정:")
         print(f"   사용자: {self.user}")
@@ -65,6 +77,11 @@ class APISettings:
     
     def __init__(self):
         self.finnhub_api_key = os.getenv("FINNHUB_API_KEY", "")
+        # Finnhub 요금제의 분당 요청 한도 (무료 플랜 60회)
+        self.finnhub_rate_limit = int(os.getenv("FINNHUB_RATE_LIMIT", "60"))
+        # 실시간 체결 스트림 (웹소켓 1개로 여러 심볼 구독) - 무료 플랜은 연결당 50심볼
+        self.finnhub_stream_enabled = os.getenv("FINNHUB_STREAM_ENABLED", "true").lower() == "true"
+        self.finnhub_stream_max_symbols = int(os.getenv("FINNHUB_STREAM_MAX_SYMBOLS", "50"))
         
         # API 키 검증
         if not self.finnhub_api_key or self.finnhub_api_key == "":
@@ -82,6 +99,10 @@ class AuthSettings:
         self.jwt_expire_minutes = int(os.getenv("JWT_EXPIRE_MINUTES", "1440"))
         self.kakao_client_id = os.getenv("KAKAO_CLIENT_ID", "")
         self.kakao_redirect_uri = os.getenv("KAKAO_REDIRECT_URI", "http://localhost:8000/auth/kakao/callback")
+        # 운영 API(보관 기간 정리, 봉 재계산 등)를 호출할 수 있는 관리자 이메일 (쉼표로 구분)
+        self.admin_emails = {
+            email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+        }
         
         # JWT 시크릿 키 검증
         if not self.jwt_secret_key:
@@ -109,6 +130,19 @@ class AppSettings:
         self.allowed_methods = ["*"]
         self.allowed_headers = ["*"]
 
+        # WebSocket 연결별 전송 대기열 - 크기와 가득 찼을 때 정책 (drop_oldest, coalesce_latest, disconnect)
+        self.ws_send_queue_size = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.ws_overflow_policy = os.getenv("WS_OVERFLOW_POLICY", "coalesce_latest")
+        # 전송 성공 없이 이만큼 메시지를 버렸거나 한 번 전송이 이 시간(초)을 넘으면 느린 연결로 보고 해제
+        self.ws_evict_after = int(os.getenv("WS_EVICT_AFTER", "256"))
+        self.ws_send_timeout = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+
+        # 워커 간 시세/채팅 브로커 - memory:// (단일 워커) 또는 redis://호스트:포트 (여러 워커/서버)
+        self.broker_url = os.getenv("BROKER_URL", "memory://")
+        self.broker_channel_prefix = os.getenv("BROKER_CHANNEL_PREFIX", "stock")
+        # 시세 수집기/보관 기간 정리 실행 여부 - 여러 워커를 띄울 때는 한 인스턴스에서만 true
+        self.market_collector_enabled = os.getenv("MARKET_COLLECTOR_ENABLED", "true").lower() == "true"
+
 # 전역 설정 인스턴스
 db_settings = DatabaseSettings()
 api_settings = APISettings()
@@ -1,30 +1,129 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Dict, Any
+from sqlalchemy import desc, func
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime, timedelta
 import logging
 from stock.backend.models import StockQuote, CryptoQuote
+from stock.backend.database.models import LatestQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
 
 logger = logging.getLogger(__name__)
 
+def get_recent_quotes_by_symbol(db: Session, model, symbols: Iterable[str], limit: int = 30) -> Dict[str, List[Any]]:
+    """
+    여러 심볼의 최근 N개 레코드를 한 번의 쿼리로 조회
+    
+    ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY created_at DESC) 윈도우로
+    심볼별 순위를 매기고 상위 N개만 가져온다 (idx_symbol_created 사용).
+    
+    :param model: StockQuote 또는 CryptoQuote 모델 클래스
+    :param symbols: 조회할 심볼 목록
+    :param limit: 심볼별 최대 레코드 수
+    :return: {심볼: [레코드, ...]} - 각 목록은 오래된 것부터 정렬
+    """
+    symbols = list(dict.fromkeys(symbols))
+    grouped: Dict[str, List[Any]] = {symbol: [] for symbol in symbols}
+    if not symbols or limit <= 0:
+        return grouped
+    
+    ranked = db.query(
+        model.id.label("id"),
+        func.row_number().over(
+            partition_by=model.symbol,
+            order_by=(desc(model.created_at), desc(model.id))
+        ).label("rn")
+    ).filter(model.symbol.in_(symbols)).subquery()
+    
+    rows = db.query(model)\
+        .join(ranked, model.id == ranked.c.id)\
+        .filter(ranked.c.rn <= limit)\
+        .order_by(model.symbol, model.created_at, model.id)\
+        .all()
+    
+    for row in rows:
+        grouped.setdefault(row.symbol, []).append(row)
+    
+    return grouped
+
+def get_latest_quotes_by_symbol(db: Session, model, symbols: Optional[Iterable[str]] = None,
+                                limit: Optional[int] = None) -> List[Any]:
+    """
+    심볼별 최신 레코드 1개씩 조회 (심볼 순)
+    
+    심볼별 MAX(created_at)은 idx_symbol_created 인덱스만 훑어 심볼 수만큼만 읽고,
+    그 (symbol, created_at)으로 원본 행을 인덱스 조회한다.
+    같은 시각의 행이 여러 개면 id가 가장 큰 행을 사용한다.
+    
+    :param model: StockQuote 또는 CryptoQuote 모델 클래스
+    :param symbols: 조회할 심볼 목록 (None이면 전체)
+    :param limit: 최대 심볼 수
+    """
+    latest = db.query(
+        model.symbol.label("symbol"),
+        func.max(model.created_at).label("created_at")
+    )
+    if symbols is not None:
+        latest = latest.filter(model.symbol.in_(list(symbols)))
+    latest = latest.group_by(model.symbol).order_by(model.symbol)
+    if limit:
+        latest = latest.limit(limit)
+    latest = latest.subquery()
+    
+    rows = db.query(model)\
+        .join(latest, (model.symbol == latest.c.symbol) & (model.created_at == latest.c.created_at))\
+        .order_by(model.symbol, desc(model.id))\
+        .all()
+    
+    unique: Dict[str, Any] = {}
+    for row in rows:
+        unique.setdefault(row.symbol, row)
+    return list(unique.values())
+
 class DataService:
     def __init__(self, db_session: Session):
         self.db = db_session
         
+    def get_recent_stock_quotes(self, symbols: Iterable[str], limit: int = 30) -> Dict[str, List[StockQuote]]:
+        """심볼별 최근 주식 시세 일괄 조회"""
+        return get_recent_quotes_by_symbol(self.db, StockQuote, symbols, limit)
+        
+    def get_recent_crypto_quotes(self, symbols: Iterable[str], limit: int = 30) -> Dict[str, List[CryptoQuote]]:
+        """심볼별 최근 암호화폐 시세 일괄 조회"""
+        return get_recent_quotes_by_symbol(self.db, CryptoQuote, symbols, limit)
+        
+    def get_latest_table(self, kind: str, limit: Optional[int] = None) -> List[LatestQuote]:
+        """최신 시세 테이블 조회 (심볼 수만큼의 작은 테이블 한 번 읽기)"""
+        query = self.db.query(LatestQuote)\
+            .filter(LatestQuote.kind == kind)\
+            .order_by(LatestQuote.symbol)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+        
     def get_latest_stock_data(self, limit: int = 50) -> List[Dict[str, Any]]:
         """최신 주식 데이터 조회"""
         try:
-            # 각 심볼별로 최신 데이터 1개씩 조회
-            subquery = self.db.query(
-                StockQuote.symbol,
-                desc(StockQuote.created_at).label('max_created_at')
-            ).group_by(StockQuote.symbol).subquery()
+            latest = self.get_latest_table(STOCK, limit)
+            if latest:
+                return [
+                    {
+                        "seq": quote.seq,
+                        "symbol": quote.symbol,
+                        "currentPrice": quote.price,
+                        "change": quote.change,
+                        "changePercent": quote.change_percent,
+                        "high": quote.high,
+                        "low": quote.low,
+                        "open": quote.open,
+                        "previousClose": quote.prev_close,
+                        "timestamp": quote.quoted_at.isoformat(),
+                        "type": "stock"
+                    }
+                    for quote in latest
+                ]
             
-            stocks = self.db.query(StockQuote).join(
-                subquery,
-                (StockQuote.symbol == subquery.c.symbol) &
-                (StockQuote.created_at == subquery.c.max_created_at)
-            ).limit(limit).all()
+            # 최신 시세 테이블이 아직 비어 있으면 이력 테이블에서 심볼별 최신 데이터 1개씩 조회
+            stocks = get_latest_quotes_by_symbol(self.db, StockQuote, limit=limit)
             
             return [
                 {
@@ -49,17 +148,24 @@ class DataService:
     def get_latest_crypto_data(self, limit: int = 20) -> List[Dict[str, Any]]:
         """최신 암호화폐 데이터 조회"""
         try:
-            # 각 심볼별로 최신 데이터 1개씩 조회
-            subquery = self.db.query(
-                CryptoQuote.symbol,
-                desc(CryptoQuote.created_at).label('max_created_at')
-            ).group_by(CryptoQuote.symbol).subquery()
+            latest = self.get_latest_table(CRYPTO, limit)
+            if latest:
+                return [
+                    {
+                        "seq": quote.seq,
+                        "symbol": quote.symbol,
+                        "price": str(quote.price),
+                        "volume": str(quote.volume or 0),
+                        "change": quote.change,
+                        "changePercent": quote.change_percent,
+                        "timestamp": quote.quoted_at.isoformat(),
+                        "type": "crypto"
+                    }
+                    for quote in latest
+                ]
             
-            cryptos = self.db.query(CryptoQuote).join(
-                subquery,
-                (CryptoQuote.symbol == subquery.c.symbol) &
-                (CryptoQuote.created_at == subquery.c.max_created_at)
-            ).limit(limit).all()
+            # 최신 시세 테이블이 아직 비어 있으면 이력 테이블에서 심볼별 최신 데이터 1개씩 조회
+            cryptos = get_latest_quotes_by_symbol(self.db, CryptoQuote, limit=limit)
             
             return [
                 {
@@ -7,6 +7,8 @@ from .connection import (
     test_connection
 )
 from .models import Base
+from .executor import run_db, shutdown_db_executor
+from .write_behind import write_buffer
 
 __all__ = [
     "engine",
@@ -15,5 +17,8 @@ __all__ = [
     "create_db_and_tables",
     "create_db_and_tables_safe",
     "test_connection",
-    "Base"
+    "Base",
+    "run_db",
+    "shutdown_db_executor",
+    "write_buffer"
 ]
@@ -14,6 +14,7 @@ try:
         db_settings.url,
         pool_pre_ping=True,
         pool_recycle=3600,
+        pool_size=db_settings.pool_size,
         echo=False,
         connect_args={"charset": "utf8mb4"}
     )
@@ -77,7 +78,7 @@ def create_db_and_tables() -> bool:
         
         # 모델 import 및 테이블 생성
         try:
-            from .models import StockQuote, CryptoQuote
+            from .models import StockQuote, CryptoQuote, StockBar, CryptoBar, LatestQuote
             logger.info(" 모델 import 성공")
         except ImportError as e:
             logger.warning(f" 모델 import 실패: {e}")
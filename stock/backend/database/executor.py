@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+import asyncio
+import logging
+
+from ..core.config import db_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 동기 SQLAlchemy 호출 전용 스레드 풀 - 커넥션 풀 크기만큼만 동시에 실행
+db_executor = ThreadPoolExecutor(
+    max_workers=db_settings.pool_size,
+    thread_name_prefix="db"
+)
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    블로킹 DB 함수를 전용 스레드 풀에서 실행하고 결과를 기다림
+
+    이벤트 루프는 쿼리가 끝날 때까지 다른 소켓/요청을 계속 처리함
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """애플리케이션 종료 시 스레드 풀 정리"""
+    db_executor.shutdown(wait=False)
+    logger.info(" DB 실행기 종료")
@@ -1,5 +1,7 @@
 from ..connection import Base
 from .stock import StockQuote
 from .crypto import CryptoQuote
+from .bar import StockBar, CryptoBar
+from .latest import LatestQuote
 
-__all__ = ["Base", "StockQuote", "CryptoQuote"]
+__all__ = ["Base", "StockQuote", "CryptoQuote", "StockBar", "CryptoBar", "LatestQuote"]
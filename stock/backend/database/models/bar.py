@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.sql import func
+from ..connection import Base
+
+class StockBar(Base):
+    """주식 OHLCV 봉 모델 (1m/5m/1h/1d 롤업)"""
+    __tablename__ = "stock_bars"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20), nullable=False)
+    resolution = Column(String(4), nullable=False)  # 1m, 5m, 1h, 1d
+    bucket = Column(DateTime, nullable=False)       # 봉 시작 시각 (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False, default=0)
+    tick_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # 봉 하나당 한 행 - 롤업 UPSERT 키이자 조회 인덱스
+    __table_args__ = (
+        Index('uq_stock_bar', 'symbol', 'resolution', 'bucket', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<StockBar(symbol='{self.symbol}', resolution='{self.resolution}', bucket='{self.bucket}', close={self.close})>"
+
+class CryptoBar(Base):
+    """암호화폐 OHLCV 봉 모델 (1m/5m/1h/1d 롤업)"""
+    __tablename__ = "crypto_bars"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20), nullable=False)
+    resolution = Column(String(4), nullable=False)  # 1m, 5m, 1h, 1d
+    bucket = Column(DateTime, nullable=False)       # 봉 시작 시각 (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False, default=0)
+    tick_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # 봉 하나당 한 행 - 롤업 UPSERT 키이자 조회 인덱스
+    __table_args__ = (
+        Index('uq_crypto_bar', 'symbol', 'resolution', 'bucket', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<CryptoBar(symbol='{self.symbol}', resolution='{self.resolution}', bucket='{self.bucket}', close={self.close})>"
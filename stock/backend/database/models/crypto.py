@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Index, BigInteger
+from sqlalchemy import Column, Integer, String, Double, DateTime, Index, BigInteger
 from sqlalchemy.sql import func
 from ..connection import Base
 
@@ -12,6 +12,8 @@ class CryptoQuote(Base):
     p = Column(String(20), nullable=False)  # 가격 (문자열)
     v = Column(String(20), nullable=True)   # 거래량 (문자열)
     t = Column(BigInteger, nullable=False)  # 타임스탬프 (밀리초)
+    price = Column(Double, nullable=True)   # 가격 (숫자, 전환 기간에는 p와 함께 저장)
+    volume = Column(Double, nullable=True)  # 거래량 (숫자)
     created_at = Column(DateTime, default=func.now(), index=True)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
@@ -22,4 +24,4 @@ class CryptoQuote(Base):
     )
 
     def __repr__(self):
-        return f"<CryptoQuote(symbol='{self.symbol}', price={self.p}, time='{self.created_at}')>"
+        return f"<CryptoQuote(symbol='{self.symbol}', price={self.price if self.price is not None else self.p}, time='{self.created_at}')>"
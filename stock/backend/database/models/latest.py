@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Double, DateTime, BigInteger
+from sqlalchemy.sql import func
+from ..connection import Base
+
+class LatestQuote(Base):
+    """종류/심볼별 최신 시세 모델 (시세 저장 시 UPSERT로 갱신되는 한 행)"""
+    __tablename__ = "latest_quotes"
+
+    kind = Column(String(10), primary_key=True)    # stock, crypto
+    symbol = Column(String(20), primary_key=True)  # AAPL, BTC 등
+    price = Column(Double, nullable=False)          # 마지막 가격
+    change = Column(Double, nullable=True)          # 변동폭 (주식: 전일 종가 대비, 암호화폐: 당일 시가 대비)
+    change_percent = Column(Double, nullable=True)  # 변동률 (%)
+    open = Column(Double, nullable=True)            # 당일 시가
+    high = Column(Double, nullable=True)            # 당일 고가
+    low = Column(Double, nullable=True)             # 당일 저가
+    prev_close = Column(Double, nullable=True)      # 전일 종가 (주식)
+    volume = Column(Double, nullable=True)          # 당일 누적 거래량 (암호화폐)
+    seq = Column(BigInteger, nullable=False, default=1)  # 갱신될 때마다 1씩 증가하는 순번
+    quoted_at = Column(DateTime, nullable=False)    # 마지막 시세 시각 (UTC)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<LatestQuote(kind='{self.kind}', symbol='{self.symbol}', price={self.price}, seq={self.seq})>"
@@ -0,0 +1,252 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import insert
+
+from .connection import engine
+from ..core.config import db_settings
+
+logger = logging.getLogger(__name__)
+
+# 버퍼가 가득 찼을 때 생산자가 자리가 나기를 기다리는 최대 시간 (초)
+BACKPRESSURE_TIMEOUT = 5.0
+# 일괄 INSERT 실패 시 재시도 횟수와 첫 대기 시간 (초, 재시도마다 두 배)
+WRITE_RETRIES = 3
+WRITE_RETRY_BACKOFF = 0.5
+
+class WriteBehindBuffer:
+    """
+    시세 행 쓰기 버퍼 (write-behind)
+
+    생산자는 행을 버퍼에 넣고 바로 반환하며, 전용 스레드가 batch_size 행이 모이거나
+    가장 오래된 행이 flush_ms 만큼 기다렸을 때 테이블별 다중 행 INSERT 한 번으로 저장함
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_ms: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.batch_size = batch_size or db_settings.write_batch_size
+        self.flush_interval = (flush_ms or db_settings.write_flush_ms) / 1000.0
+        self.max_pending = max_pending or db_settings.write_max_pending
+        self._pending: Dict[Any, List[Dict[str, Any]]] = {}
+        self._flush_hooks: Dict[Any, List[Callable]] = {}
+        self._pending_count = 0
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        # 테이블별 저장 잠금 - 한 묶음의 INSERT와 후처리 hook을 감싸며 paused(model)이 같은 잠금을 잡음
+        self._model_locks: Dict[Any, threading.Lock] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+        self.flush_count = 0
+        self.rows_written = 0
+        self.failed_rows = 0
+        self.retry_count = 0
+        self.dropped_rows = 0
+        self.backpressure_waits = 0
+        self.total_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_flush: Dict[str, Any] = {}
+
+    def add_flush_hook(self, model: Any, hook: Callable[[Any, List[Dict[str, Any]]], None]):
+        """
+        저장이 끝난 행으로 호출할 함수 등록 - hook(conn, rows)
+
+        hook은 별도 트랜잭션에서 실행되므로 실패해도 이미 저장된 행은 유지됨
+        """
+        self._flush_hooks.setdefault(model, []).append(hook)
+
+    def _model_lock(self, model: Any) -> threading.Lock:
+        with self._cond:
+            return self._model_locks.setdefault(model, threading.Lock())
+
+    @contextmanager
+    def paused(self, model: Any):
+        """
+        with 블록 동안 테이블 하나의 저장(다중 행 INSERT와 후처리 hook)을 멈춤 - 진행 중인 묶음이 끝난 뒤 진입
+
+        그동안 들어온 행은 버퍼에 쌓였다가 블록이 끝난 뒤 저장됨 (hook이 갱신하는 테이블을 다시 계산할 때 사용).
+        저장 스레드가 이 테이블 차례에서 기다리므로 블록은 짧게 유지해야 함
+        """
+        with self._model_lock(model):
+            yield
+
+    def _ensure_started(self):
+        """첫 행이 들어올 때 저장 스레드 시작"""
+        if self.is_running:
+            return
+        with self._cond:
+            if self.is_running:
+                return
+            self.is_running = True
+            self._thread = threading.Thread(target=self._run, name="db-write-buffer", daemon=True)
+            self._thread.start()
+        logger.info(f" DB 쓰기 버퍼 시작 ({self.batch_size}행 / {self.flush_interval * 1000:.0f}ms)")
+
+    def submit(self, model: Any, rows: Union[Dict[str, Any], List[Dict[str, Any]]],
+               timeout: float = BACKPRESSURE_TIMEOUT) -> bool:
+        """
+        저장할 행을 버퍼에 추가 - 버퍼가 가득 차면 최대 timeout초 동안 대기
+
+        :param model: 저장할 ORM 모델 클래스 (예: StockQuote)
+        :return: 버퍼에 들어갔으면 True, 대기 시간 안에 자리가 나지 않아 버렸으면 False
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return True
+
+        self._ensure_started()
+        with self._cond:
+            # 한 번에 max_pending보다 많이 들어오면 버퍼가 빌 때까지만 기다림
+            limit = max(self.max_pending - len(rows), 0)
+            if self._pending_count > limit:
+                self.backpressure_waits += 1
+                self._cond.notify_all()
+                if not self._cond.wait_for(lambda: self._pending_count <= limit, timeout):
+                    self.dropped_rows += len(rows)
+                    logger.warning(f" DB 쓰기 버퍼 포화: {model.__tablename__} {len(rows)}행 버림")
+                    return False
+
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._pending.setdefault(model, []).extend(rows)
+            self._pending_count += len(rows)
+            if self._pending_count >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def _take(self) -> Dict[Any, List[Dict[str, Any]]]:
+        """대기 중인 행을 모두 꺼냄 (self._cond 보유 상태에서 호출)"""
+        batch = self._pending
+        self._pending = {}
+        self._pending_count = 0
+        self._oldest = None
+        # 자리가 난 것을 기다리는 생산자에게 알림
+        self._cond.notify_all()
+        return batch
+
+    def _run(self):
+        """저장 스레드 루프 - batch_size 또는 flush_interval 조건이 되면 저장"""
+        while True:
+            with self._cond:
+                while self.is_running and self._pending_count < self.batch_size:
+                    if self._oldest is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._oldest + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not self.is_running and self._pending_count == 0:
+                    break
+
+            self.flush()
+
+        logger.info(" DB 쓰기 버퍼 루프 종료")
+
+    def flush(self) -> int:
+        """지금까지 들어온 행을 즉시 저장 - 반환 시점에는 이전에 추가된 행이 모두 처리됨"""
+        with self._write_lock:
+            with self._cond:
+                batch = self._take()
+            # 재계산 등으로 멈춘 테이블은 뒤로 미뤄 다른 테이블 저장이 기다리지 않게 함
+            items = sorted(batch.items(), key=lambda item: self._model_lock(item[0]).locked())
+            return sum(self._write(model, rows) for model, rows in items)
+
+    def _write(self, model: Any, rows: List[Dict[str, Any]]) -> int:
+        """테이블 하나의 행을 batch_size 단위 다중 행 INSERT로 저장"""
+        written = 0
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            with self._model_lock(model):
+                written += self._write_chunk(model, chunk)
+        return written
+
+    def _write_chunk(self, model: Any, chunk: List[Dict[str, Any]]) -> int:
+        """묶음 하나 저장 후 후처리 hook 실행 - 저장한 행 수 반환"""
+        started = time.perf_counter()
+        if not self._insert(model, chunk):
+            return 0
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flush_count += 1
+        self.rows_written += len(chunk)
+        self.total_flush_ms += elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.last_flush = {
+            "table": model.__tablename__,
+            "rows": len(chunk),
+            "ms": round(elapsed_ms, 1)
+        }
+        logger.info(f" DB 일괄 저장: {model.__tablename__} {len(chunk)}행 ({elapsed_ms:.1f}ms)")
+
+        for hook in self._flush_hooks.get(model, ()):
+            try:
+                with engine.begin() as conn:
+                    hook(conn, chunk)
+            except Exception as e:
+                logger.error(f" DB 저장 후처리 실패: {model.__tablename__} {getattr(hook, '__name__', hook)}, 오류: {e}")
+        return len(chunk)
+
+    def _insert(self, model: Any, chunk: List[Dict[str, Any]]) -> bool:
+        """다중 행 INSERT - 실패하면 대기 시간을 늘려 가며 WRITE_RETRIES번 재시도하고, 그래도 실패하면 행을 버림"""
+        delay = WRITE_RETRY_BACKOFF
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(model.__table__).values(chunk))
+                return True
+            except Exception as e:
+                if attempt == WRITE_RETRIES:
+                    self.failed_rows += len(chunk)
+                    logger.error(
+                        f" DB 일괄 저장 실패로 {len(chunk)}행을 버림: {model.__tablename__} "
+                        f"({WRITE_RETRIES}회 재시도), 오류: {e}"
+                    )
+                    return False
+                self.retry_count += 1
+                logger.warning(
+                    f" DB 일괄 저장 실패: {model.__tablename__} {len(chunk)}행, "
+                    f"{delay:.1f}초 후 재시도 ({attempt + 1}/{WRITE_RETRIES}), 오류: {e}"
+                )
+                time.sleep(delay)
+                delay *= 2
+
+    def stop(self):
+        """저장 스레드 중지 - 남은 행을 모두 저장한 뒤 반환"""
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self.flush()
+        logger.info(f" DB 쓰기 버퍼 종료 (저장: {self.rows_written}행, 실패: {self.failed_rows}행)")
+
+    def get_status(self) -> Dict[str, Any]:
+        """버퍼 상태 및 저장 통계 반환"""
+        with self._cond:
+            pending = self._pending_count
+        return {
+            "is_running": self.is_running,
+            "pending": pending,
+            "batch_size": self.batch_size,
+            "flush_ms": int(self.flush_interval * 1000),
+            "max_pending": self.max_pending,
+            "flush_count": self.flush_count,
+            "rows_written": self.rows_written,
+            "failed_rows": self.failed_rows,
+            "retry_count": self.retry_count,
+            "dropped_rows": self.dropped_rows,
+            "backpressure_waits": self.backpressure_waits,
+            "avg_flush_ms": round(self.total_flush_ms / self.flush_count, 1) if self.flush_count else 0,
+            "max_flush_ms": round(self.max_flush_ms, 1),
+            "rows_per_second": round(self.rows_written / (self.total_flush_ms / 1000), 1) if self.total_flush_ms else 0,
+            "last_flush": self.last_flush
+        }
+
+# 전역 쓰기 버퍼 인스턴스
+write_buffer = WriteBehindBuffer()
@@ -2,11 +2,14 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from stock.backend.api import stock, chat
 from stock.backend.auth import auth_router
-from stock.backend.database import create_db_and_tables_safe
-from stock.backend.services.auto_collector import auto_collector
+from stock.backend.database import create_db_and_tables_safe, run_db, shutdown_db_executor, write_buffer
+from stock.backend.services.ingestion_pipeline import ingestion_pipeline
+from stock.backend.services.trade_stream import trade_stream
+from stock.backend.services.retention import retention_service
+from stock.backend.services.broker import broker
 from stock.backend.websocket_routes import router as websocket_router
 from stock.backend.utils.logger import configure_logging
-from stock.backend.core.config import app_settings
+from stock.backend.core.config import app_settings, api_settings
 from stock.backend.stockDeal.mock_investment import router as mock_investment_router
 from fastapi.middleware.cors import CORSMiddleware
 from stock.backend.chatbot import chat_router 
@@ -88,28 +91,38 @@ async def startup_event():
     except Exception as e:
 
         logger.warning(f" WebSocket 매니저 초기화 실패: {e}")
+
+    # 워커 간 시세/채팅 브로커 연결 (memory://면 이 프로세스 안에서만 전달)
+    await broker.start()
+
+    # 실시간 차트용 틱 저장소를 DB의 최근 데이터로 한 번 채움
+    if db_success:
+        from stock.backend.services.tick_store import tick_store
+        from stock.backend.services.symbol_registry import MOST_ACTIVE_STOCKS, TOP_10_CRYPTOS
+        await run_db(tick_store.warm_from_db, MOST_ACTIVE_STOCKS, TOP_10_CRYPTOS)
+
+    # 여러 워커/서버로 띄울 때는 수집기를 한 인스턴스에서만 실행하고 틱은 브로커로 받음
+    if not app_settings.market_collector_enabled:
+        logger.info(" 시세 수집기 비활성화 (MARKET_COLLECTOR_ENABLED=false) - 브로커로 받은 틱만 전송")
+        logger.info(" 모든 서비스 초기화 완료!")
+        return
     
-    # 잠시 대기 후 자동 수집기들 시작
+    # 잠시 대기 후 통합 수집 파이프라인 시작 (주식/암호화폐 단일 수집기)
     import asyncio
     await asyncio.sleep(2)
-
-    # 암호화폐 자동 수집기 먼저 시작 (WebSocket 데이터 준비)
     try:
-        from stock.backend.services.stock_service import start_crypto_collection
-        start_crypto_collection()
-        logger.info("₿ 암호화폐 데이터 자동 수집기 시작")
+        ingestion_pipeline.start()
     except Exception as e:
 
-        logger.error(f" 암호화폐 수집기 시작 실패: {e}")
+        logger.error(f" 수집 파이프라인 시작 실패: {e}")
     
-    # 추가 대기 후 주식 자동 수집기 시작
-    await asyncio.sleep(1)
-    try:
-        auto_collector.start_collector()
-        logger.info(" 주식 데이터 자동 수집기 시작")
-    except Exception as e:
-
-        logger.error(f" 주식 수집기 시작 실패: {e}")
+    # 실시간 체결 스트림 시작 (웹소켓 1개로 레지스트리 심볼 구독)
+    if api_settings.finnhub_stream_enabled:
+        trade_stream.start()
+    
+    # 시세 보관 기간 정리 (일 파티션 추가/삭제 또는 청크 삭제)
+    if db_success:
+        retention_service.start()
     
     logger.info(" 모든 서비스 초기화 완료!")
 
@@ -119,20 +132,32 @@ async def shutdown_event():
 
     logger.info(" 통합 API 종료...")
     
-    # 모든 자동 수집기 중지
+    # 실시간 체결 스트림 중지
+    await trade_stream.stop()
+    
+    # 통합 수집 파이프라인 중지
     try:
-        auto_collector.stop_collector()
-        logger.info(" 주식 데이터 자동 수집기 중지")
+        ingestion_pipeline.stop()
     except Exception as e:
 
-        logger.error(f" 주식 수집기 중지 실패: {e}")
+        logger.error(f" 수집 파이프라인 중지 실패: {e}")
     
+    # 보관 기간 정리 중지
+    retention_service.stop()
+    
+    # 쓰기 버퍼에 남은 시세 저장
     try:
-        from stock.backend.services.stock_service import stop_crypto_collection
-        stop_crypto_collection()
-        logger.info(" 암호화폐 데이터 자동 수집기 중지")
+        write_buffer.stop()
     except Exception as e:
-        logger.error(f" 암호화폐 수집기 중지 실패: {e}")
+
+        logger.error(f" DB 쓰기 버퍼 종료 실패: {e}")
+    
+    shutdown_db_executor()
+    
+    await broker.stop()
+    
+    from stock.backend.services.finnhub_client import finnhub_client
+    finnhub_client.close()
 
 @app.get("/")
 async def root():
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Index, BigInteger
+from sqlalchemy import Column, Integer, String, Float, Double, Numeric, DateTime, Index, BigInteger, cast, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -43,6 +44,10 @@ class CryptoQuote(Base):
     v = Column(String(20), nullable=True)   # 거래량 (문자열)
     t = Column(BigInteger, nullable=False)  # 타임스탬프 (밀리초) - INT에서 BigInteger로 변경
     
+    # 숫자형 가격/거래량 - 전환 기간에는 p/v와 함께 저장 (이전 행은 NULL일 수 있음)
+    price = Column(Double, nullable=True)   # 현재 가격
+    volume = Column(Double, nullable=True)  # 거래량
+    
     # 메타 데이터
     created_at = Column(DateTime, default=datetime.utcnow)  # 데이터 생성 시간
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # 마지막 업데이트 시간
@@ -54,5 +59,24 @@ class CryptoQuote(Base):
         Index("idx_crypto_s", "s"),                                  # 전체 심볼 인덱스
         Index("idx_crypto_t", "t"),                                  # 타임스탬프 인덱스 추가
     )
+    
+    # 전환 기간 이중 읽기 - 숫자 컬럼이 비어 있으면 문자열 컬럼으로 대체
+    @hybrid_property
+    def price_value(self) -> float:
+        return self.price if self.price is not None else float(self.p)
+    
+    @price_value.expression
+    def price_value(cls):
+        return func.coalesce(cls.price, cast(cls.p, Numeric(30, 10)))
+    
+    @hybrid_property
+    def volume_value(self) -> float:
+        if self.volume is not None:
+            return self.volume
+        return float(self.v) if self.v else 0.0
+    
+    @volume_value.expression
+    def volume_value(cls):
+        return func.coalesce(cls.volume, cast(cls.v, Numeric(30, 10)), 0)
 
 
@@ -0,0 +1,254 @@
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.mysql import insert
+
+from stock.backend.core.config import db_settings
+from stock.backend.database import SessionLocal, engine, write_buffer
+from stock.backend.database.models import StockBar, CryptoBar
+from stock.backend.models import StockQuote, CryptoQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+# 저장하는 봉 해상도 (작은 것부터) - 라벨: 초
+RESOLUTIONS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400
+}
+RAW = "raw"
+AUTO = "auto"
+
+# resolution=auto일 때 목표로 하는 최대 봉 개수
+MAX_BARS = 500
+# 재계산 시 원본 시세를 나눠 읽는 크기
+REBUILD_CHUNK = 5000
+
+EPOCH = datetime(1970, 1, 1)
+UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+
+def parse_resolution(resolution: str) -> int:
+    """'15m', '4h', '1d' 형식의 해상도를 초로 변환"""
+    match = re.fullmatch(r"(\d+)([mhd])", resolution or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"지원하지 않는 해상도입니다: {resolution} (예: 1m, 5m, 1h, 1d, auto, raw)")
+    return int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+
+def bucket_start(created_at: datetime, seconds: int) -> datetime:
+    """시각이 속한 봉의 시작 시각 (UTC 기준 정렬)"""
+    elapsed = int((created_at - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=elapsed - elapsed % seconds)
+
+class BarRollupService:
+    """
+    OHLCV 봉 롤업 서비스
+
+    쓰기 버퍼가 시세 행을 저장할 때마다 같은 행으로 1m/5m/1h/1d 봉을 갱신하고,
+    이력 조회 시 요청 해상도를 만족하는 가장 큰 봉 테이블을 읽음
+    """
+
+    def _models(self, kind: str):
+        """종류별 (봉 모델, 원본 시세 모델)"""
+        return (StockBar, StockQuote) if kind == STOCK else (CryptoBar, CryptoQuote)
+
+    def aggregate(self, points: Iterable[Tuple[str, datetime, float, float]]) -> List[Dict[str, Any]]:
+        """
+        (심볼, 시각, 가격, 거래량) 목록을 해상도별 봉으로 합침 - points는 시간순이어야 함
+
+        :return: 봉 행 목록 (UPSERT용)
+        """
+        bars: Dict[Tuple[str, str, datetime], Dict[str, Any]] = {}
+        for symbol, created_at, price, volume in points:
+            for label, seconds in RESOLUTIONS.items():
+                key = (symbol, label, bucket_start(created_at, seconds))
+                bar = bars.get(key)
+                if bar is None:
+                    bars[key] = {
+                        "symbol": symbol,
+                        "resolution": label,
+                        "bucket": key[2],
+                        "open": price,
+                        "high": price,
+                        "low": price,
+                        "close": price,
+                        "volume": volume,
+                        "tick_count": 1
+                    }
+                else:
+                    bar["high"] = max(bar["high"], price)
+                    bar["low"] = min(bar["low"], price)
+                    bar["close"] = price
+                    bar["volume"] += volume
+                    bar["tick_count"] += 1
+        return list(bars.values())
+
+    def _upsert(self, conn, model, bars: List[Dict[str, Any]]):
+        """봉 UPSERT - 이미 있는 봉은 시가를 유지하고 고가/저가/종가/거래량만 합침"""
+        if not bars:
+            return
+        stmt = insert(model).values(bars)
+        stmt = stmt.on_duplicate_key_update(
+            high=func.greatest(model.high, stmt.inserted.high),
+            low=func.least(model.low, stmt.inserted.low),
+            close=stmt.inserted.close,
+            volume=model.volume + stmt.inserted.volume,
+            tick_count=model.tick_count + stmt.inserted.tick_count,
+            updated_at=func.now()
+        )
+        conn.execute(stmt)
+
+    def apply_stock_rows(self, conn, rows: List[Dict[str, Any]]):
+        """쓰기 버퍼 후처리 - 저장된 주식 시세 행으로 봉 갱신"""
+        points = [(row["symbol"], row["created_at"], float(row["c"]), 0.0) for row in rows]
+        self._upsert(conn, StockBar, self.aggregate(points))
+
+    def apply_crypto_rows(self, conn, rows: List[Dict[str, Any]]):
+        """쓰기 버퍼 후처리 - 저장된 암호화폐 시세 행으로 봉 갱신"""
+        points = [
+            (row["symbol"], row["created_at"], row["price"], row["volume"])
+            for row in rows
+        ]
+        self._upsert(conn, CryptoBar, self.aggregate(points))
+
+    def choose_resolution(self, hours: int, resolution: str) -> Tuple[str, int]:
+        """
+        요청 해상도를 (읽을 봉 테이블 해상도, 응답 봉 크기 초)로 변환
+
+        요청 크기를 나누어떨어지게 만드는 가장 큰 저장 해상도를 고르고,
+        auto면 봉 개수가 MAX_BARS 이하가 되는 크기를 고름
+        """
+        if resolution == AUTO:
+            target = hours * 3600 / MAX_BARS
+            candidates = [label for label, seconds in RESOLUTIONS.items() if seconds >= target]
+            label = candidates[0] if candidates else "1d"
+            return label, RESOLUTIONS[label]
+
+        seconds = parse_resolution(resolution)
+        if seconds < RESOLUTIONS["1m"]:
+            raise ValueError(f"1분보다 작은 해상도는 지원하지 않습니다: {resolution}")
+        label = [label for label, stored in RESOLUTIONS.items() if seconds % stored == 0][-1]
+        return label, seconds
+
+    def get_bars(self, kind: str, symbol: str, hours: int = 24, resolution: str = AUTO) -> Dict[str, Any]:
+        """봉 이력 조회 (최신 봉부터) - 저장 해상도보다 큰 봉은 읽은 봉을 다시 합쳐서 반환"""
+        model, _ = self._models(kind)
+        label, seconds = self.choose_resolution(hours, resolution)
+        since = bucket_start(datetime.utcnow() - timedelta(hours=hours), seconds)
+
+        with SessionLocal() as db:
+            bars = db.execute(
+                select(model.bucket, model.open, model.high, model.low, model.close, model.volume, model.tick_count)
+                .where(model.symbol == symbol, model.resolution == label, model.bucket >= since)
+                .order_by(model.bucket)
+            ).all()
+
+        merged: List[Dict[str, Any]] = []
+        for bucket, open_, high, low, close, volume, tick_count in bars:
+            start = bucket_start(bucket, seconds)
+            if merged and merged[-1]["bucket"] == start:
+                bar = merged[-1]
+                bar["h"] = max(bar["h"], high)
+                bar["l"] = min(bar["l"], low)
+                bar["c"] = close
+                bar["v"] += volume
+                bar["n"] += tick_count
+            else:
+                merged.append({"bucket": start, "o": open_, "h": high, "l": low, "c": close, "v": volume, "n": tick_count})
+
+        data = [
+            {
+                "o": bar["o"],
+                "h": bar["h"],
+                "l": bar["l"],
+                "c": bar["c"],
+                "v": bar["v"],
+                "n": bar["n"],
+                "t": int((bar["bucket"] - EPOCH).total_seconds() * 1000),
+                "created_at": bar["bucket"].isoformat()
+            } for bar in reversed(merged)
+        ]
+        return {
+            "resolution": resolution if resolution != AUTO else label,
+            "source_resolution": label,
+            "bar_seconds": seconds,
+            "data": data
+        }
+
+    def rebuild(self, kind: str, hours: int = 24, symbol: Optional[str] = None) -> int:
+        """
+        원본 시세로 최근 봉 재계산 (롤업 도입 전 데이터 채우기/복구용)
+
+        하루(가장 큰 봉 크기) x 심볼 단위로 봉을 지우고 다시 집계하며, 그동안 이 종류의 시세 저장만 잠시 멈춤.
+        원본 시세는 DB 보관 기간까지만 있으므로 hours는 보관 기간으로 줄임
+        :return: 다시 집계한 원본 시세 행 수
+        """
+        model, quote_model = self._models(kind)
+        hours = min(hours, db_settings.retention_days * 24)
+        day = bucket_start(datetime.utcnow() - timedelta(hours=hours), RESOLUTIONS["1d"])
+        now = datetime.utcnow()
+
+        processed = 0
+        while day <= now:
+            next_day = day + timedelta(days=1)
+            symbols = [symbol] if symbol else self._symbols_between(model, quote_model, day, next_day)
+            for name in symbols:
+                processed += self._rebuild_day(kind, name, day, next_day)
+            day = next_day
+
+        logger.info(f" 봉 재계산 완료: {kind} {symbol or '전체'} 최근 {hours}시간, 원본 {processed}행")
+        return processed
+
+    def _symbols_between(self, model, quote_model, since: datetime, until: datetime) -> List[str]:
+        """기간 안에 봉 또는 원본 시세가 있는 심볼 목록"""
+        with engine.connect() as conn:
+            bar_symbols = conn.execute(
+                select(model.symbol).where(model.bucket >= since, model.bucket < until).distinct()
+            ).scalars().all()
+            quote_symbols = conn.execute(
+                select(quote_model.symbol).where(quote_model.created_at >= since, quote_model.created_at < until).distinct()
+            ).scalars().all()
+        return sorted(set(bar_symbols) | set(quote_symbols))
+
+    def _rebuild_day(self, kind: str, symbol: str, since: datetime, until: datetime) -> int:
+        """
+        심볼 하나의 하루치 봉 재계산 - 다시 집계한 원본 행 수 반환
+
+        쓰기 버퍼의 봉 갱신 hook과 같은 봉을 동시에 고치지 않도록 이 종류의 저장을 멈춘 채 한 트랜잭션으로 처리함
+        (이미 저장된 시세는 모두 봉에 반영된 상태에서 지우고 다시 집계하며, 그동안 들어온 시세는 끝난 뒤 hook으로 반영)
+        """
+        model, quote_model = self._models(kind)
+        columns = [quote_model.id, quote_model.symbol, quote_model.created_at]
+        columns += [quote_model.c] if kind == STOCK else [quote_model.price_value, quote_model.volume_value]
+
+        processed = 0
+        last_id = 0
+        with write_buffer.paused(quote_model), engine.begin() as conn:
+            conn.execute(
+                delete(model).where(model.symbol == symbol, model.bucket >= since, model.bucket < until)
+            )
+            while True:
+                rows = conn.execute(
+                    select(*columns)
+                    .where(quote_model.symbol == symbol, quote_model.created_at >= since,
+                           quote_model.created_at < until, quote_model.id > last_id)
+                    .order_by(quote_model.id)
+                    .limit(REBUILD_CHUNK)
+                ).all()
+                if not rows:
+                    break
+                points = [
+                    (row[1], row[2], float(row[3]), float(row[4]) if kind == CRYPTO else 0.0)
+                    for row in rows
+                ]
+                self._upsert(conn, model, self.aggregate(points))
+                processed += len(rows)
+                last_id = rows[-1][0]
+        return processed
+
+# 전역 봉 롤업 서비스 인스턴스
+bar_rollup = BarRollupService()
@@ -0,0 +1,294 @@
+import asyncio
+import json
+import random
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from stock.backend.core.config import app_settings
+from stock.backend.utils.ws_broadcast import encode_json
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성 - 없으면 memory:// 브로커만 사용
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# 브로커 채널
+MARKET_CHANNEL = "market"
+CHAT_CHANNEL = "chat"
+QUOTE_CHANNEL = "quote"
+
+# Redis 재연결 대기 시간 (지수 증가, 초)
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+# Redis로 보내기 전에 모아 두는 최대 메시지 수 - 연결이 끊긴 동안 넘치면 오래된 것부터 버림
+OUTBOX_SIZE = 10000
+# 파이프라인으로 한 번에 보내는 최대 PUBLISH 명령 수
+PUBLISH_BATCH = 500
+
+Handler = Callable[[Dict[str, Any]], None]
+
+class MessageBroker(ABC):
+    """
+    워커 간 메시지 브로커 인터페이스
+
+    publish한 메시지는 이 워커를 포함한 모든 워커의 채널 핸들러에 전달되고, 각 워커의 핸들러는
+    자기 프로세스의 소켓/틱 저장소에만 반영함. 핸들러는 동기 함수이며 이 워커에서 발행한 메시지는
+    publish를 호출한 스레드에서, 다른 워커에서 온 메시지는 이벤트 루프에서 실행됨
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published_count = 0
+        self.received_count = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        """채널 핸들러 등록"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def unsubscribe(self, channel: str, handler: Handler):
+        """채널 핸들러 해제"""
+        handlers = self._handlers.get(channel)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def _dispatch(self, channel: str, message: Dict[str, Any]):
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f" 브로커 메시지 처리 오류: {channel}, 오류: {e}")
+
+    @abstractmethod
+    def publish(self, channel: str, message: Dict[str, Any]):
+        """메시지 발행 - 수집기 스레드와 이벤트 루프 어디서든 호출 가능"""
+
+    async def start(self):
+        """브로커 시작 - 이벤트 루프 안에서 호출"""
+
+    async def stop(self):
+        """브로커 중지"""
+
+    def get_status(self) -> Dict[str, Any]:
+        """브로커 상태 반환"""
+        return {
+            "type": type(self).__name__,
+            "channels": {channel: len(handlers) for channel, handlers in self._handlers.items()},
+            "published_count": self.published_count,
+            "received_count": self.received_count
+        }
+
+class InProcessBroker(MessageBroker):
+    """단일 워커용 브로커 - 같은 프로세스의 핸들러에 바로 전달"""
+
+    def publish(self, channel: str, message: Dict[str, Any]):
+        self.published_count += 1
+        self._dispatch(channel, message)
+
+class RedisBroker(MessageBroker):
+    """
+    Redis pub/sub 브로커 (redis.asyncio) - 워커(프로세스/서버)마다 하나씩 두고 같은 Redis에 연결
+
+    이 워커의 핸들러에는 바로 전달하고 Redis로도 발행하며, 되돌아온 자기 메시지는 워커 ID로 걸러냄.
+    발행은 대기열에 모아 파이프라인으로 보내고, 실패한 묶음(연결 끊김, NOAUTH 같은 오류 응답)은 대기열 앞에
+    되돌린 뒤 지수 백오프로 다시 시도함 (끊긴 시점에 따라 중복 전달될 수 있음). pub/sub은 최대 한 번 전달이므로
+    구독 연결이 끊긴 동안 다른 워커에서 발행된 메시지는 받지 못함 (클라이언트는 스냅샷/재동기화로 복구)
+    """
+
+    def __init__(self, url: str, prefix: Optional[str] = None):
+        super().__init__()
+        parsed = urlparse(url)
+        self.url = url
+        # 상태 표시용 (비밀번호 제외)
+        self.display_url = f"{parsed.scheme}://{parsed.hostname or 'localhost'}:{parsed.port or 6379}{parsed.path}"
+        self.prefix = prefix or app_settings.broker_channel_prefix
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.is_running = False
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = []
+        # (Redis 채널, 직렬화한 메시지) - 발행 태스크가 모아서 파이프라인으로 전송
+        self._outbox: Deque[Tuple[str, str]] = deque()
+        self._ready: Optional[asyncio.Event] = None
+        self.connected = {"publish": False, "subscribe": False}
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.retry_count = 0
+        self.reconnect_count = 0
+
+    def _channel(self, channel: str) -> str:
+        return f"{self.prefix}:{channel}"
+
+    def publish(self, channel: str, message: Dict[str, Any]):
+        self.published_count += 1
+        self._dispatch(channel, message)
+        if self._loop is None:
+            return
+
+        item = (self._channel(channel), encode_json({"o": self.worker_id, "m": message}))
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        try:
+            if current_loop is self._loop:
+                self._enqueue(item)
+            else:
+                self._loop.call_soon_threadsafe(self._enqueue, item)
+        except RuntimeError:
+            # 이벤트 루프가 이미 종료됨
+            pass
+
+    def _enqueue(self, item: Tuple[str, str]):
+        self._outbox.append(item)
+        self._trim_outbox()
+        self._ready.set()
+
+    def _trim_outbox(self):
+        # 대기열이 넘치면 가장 오래된 메시지부터 버림
+        while len(self._outbox) > OUTBOX_SIZE:
+            self._outbox.popleft()
+            self.dropped_count += 1
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._client = aioredis.from_url(self.url)
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self.is_running = True
+        self._tasks = [
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._subscribe_loop())
+        ]
+        logger.info(f" Redis 브로커 시작: {self.display_url} (채널 {self.prefix}:*, 워커 {self.worker_id})")
+
+    async def stop(self):
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info(f" Redis 브로커 중지됨 (발행: {self.sent_count}, 수신: {self.received_count}, 버림: {self.dropped_count})")
+
+    async def _backoff(self, role: str, backoff: float) -> float:
+        """재시도 대기 (지수 증가, 지터 포함) - 다음 대기 시간 반환"""
+        delay = backoff * (1 + random.random() * 0.5)
+        logger.warning(f" Redis 브로커 {role} 재시도 대기: {delay:.1f}초")
+        await asyncio.sleep(delay)
+        return min(backoff * 2, MAX_BACKOFF)
+
+    async def _publish_loop(self):
+        """모인 메시지를 PUBLISH_BATCH개씩 파이프라인으로 발행 - 실패한 묶음은 대기열 앞에 되돌려 재시도"""
+        backoff = MIN_BACKOFF
+        while self.is_running:
+            while not self._outbox:
+                self._ready.clear()
+                await self._ready.wait()
+            batch = [self._outbox.popleft() for _ in range(min(len(self._outbox), PUBLISH_BATCH))]
+            try:
+                async with self._client.pipeline(transaction=False) as pipe:
+                    for channel, payload in batch:
+                        pipe.publish(channel, payload)
+                    await pipe.execute()
+            except asyncio.CancelledError:
+                self._outbox.extendleft(reversed(batch))
+                raise
+            except Exception as e:
+                # 연결 오류뿐 아니라 오류 응답(NOAUTH 등)도 버리지 않고 되돌림
+                self._outbox.extendleft(reversed(batch))
+                self._trim_outbox()
+                self.connected["publish"] = False
+                self.retry_count += 1
+                logger.error(f" Redis 브로커 발행 오류 ({len(batch)}건 재시도 예정): {e}")
+                backoff = await self._backoff("publish", backoff)
+                continue
+
+            self.connected["publish"] = True
+            self.sent_count += len(batch)
+            backoff = MIN_BACKOFF
+
+    async def _subscribe_loop(self):
+        """접두어 아래 모든 채널을 구독하고 다른 워커가 보낸 메시지를 핸들러에 전달 - 끊기면 다시 구독"""
+        backoff = MIN_BACKOFF
+        while self.is_running:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.psubscribe(self._channel("*"))
+                self.connected["subscribe"] = True
+                backoff = MIN_BACKOFF
+                logger.info(f" Redis 브로커 구독 시작: {self._channel('*')}")
+                async for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._receive(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f" Redis 브로커 구독 오류: {e}")
+            finally:
+                self.connected["subscribe"] = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            if not self.is_running:
+                break
+            self.reconnect_count += 1
+            backoff = await self._backoff("subscribe", backoff)
+
+    def _receive(self, channel: Any, data: Any):
+        """구독으로 받은 메시지 처리 - 이 워커가 보낸 메시지는 이미 전달했으므로 무시"""
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            logger.error(f" 브로커 메시지 파싱 실패: {data[:100]!r}")
+            return
+        if envelope.get("o") == self.worker_id:
+            return
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        self.received_count += 1
+        self._dispatch(channel[len(self.prefix) + 1:], envelope.get("m") or {})
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status.update({
+            "url": self.display_url,
+            "worker_id": self.worker_id,
+            "connected": dict(self.connected),
+            "outbox": len(self._outbox),
+            "sent_count": self.sent_count,
+            "dropped_count": self.dropped_count,
+            "retry_count": self.retry_count,
+            "reconnect_count": self.reconnect_count
+        })
+        return status
+
+def create_broker(url: Optional[str] = None) -> MessageBroker:
+    """
+    주소로 브로커 생성
+
+    memory:// (기본값) - 단일 워커, redis://[:비밀번호@]호스트:포트[/db] 또는 rediss:// - 여러 워커/서버 (redis 패키지 필요)
+    """
+    url = url or "memory://"
+    scheme = urlparse(url).scheme
+    if scheme in ("", "memory"):
+        return InProcessBroker()
+    if scheme in ("redis", "rediss"):
+        if aioredis is None:
+            raise ValueError("redis 패키지가 설치되지 않아 Redis 브로커를 사용할 수 없습니다 (pip install redis)")
+        return RedisBroker(url)
+    raise ValueError(f"지원하지 않는 브로커 주소입니다: {url} (memory://, redis://)")
+
+# 전역 브로커 인스턴스
+broker = create_broker(app_settings.broker_url)
@@ -1,29 +1,67 @@
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import Session
-from stock.backend.database import SessionLocal
+from stock.backend.database import SessionLocal, engine, write_buffer
 from stock.backend.models import CryptoQuote
+from stock.backend.services.tick_store import to_epoch_ms, CRYPTO
+from stock.backend.services.market_hub import publish_tick
+from stock.backend.services.bar_rollup import bar_rollup
+from stock.backend.services.latest_quotes import latest_quotes
+from stock.backend.services.quote_archive import quote_archive
+from stock.backend.services.quote_statistics import quote_statistics, DEFAULT_WINDOW
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 이력 스트리밍 시 내보내는 컬럼
+CRYPTO_HISTORY_COLUMNS = ["created_at", "s", "p", "v", "t"]
+
 class CryptoQuoteService:
     """암호화폐 시세 데이터베이스 서비스 클래스"""
     
     def __init__(self):
         pass
     
+    def build_crypto_row(self, crypto_data: Dict[str, Any]) -> Dict[str, Any]:
+        """시세 딕셔너리로 crypto_quotes 저장용 행 생성 (저장 시각 포함)"""
+        now = datetime.utcnow()
+        return {
+            "symbol": crypto_data['symbol'],                # BTC, ETH 등
+            "s": crypto_data['s'],                          # BINANCE:BTCUSDT
+            "p": str(crypto_data['p']),                     # 현재가 (문자열)
+            "v": str(crypto_data.get('v', '0')),            # 거래량 (문자열)
+            "t": int(crypto_data['t']),                     # 타임스탬프 (밀리초)
+            "price": float(crypto_data['p']),               # 현재가 (숫자)
+            "volume": float(crypto_data.get('v') or 0),     # 거래량 (숫자)
+            "created_at": now,
+            "updated_at": now
+        }
+    
+    def publish_crypto_tick(self, row: Dict[str, Any]):
+        """실시간 차트용 틱 발행 - 워커마다 메모리 틱 저장소에 반영 후 구독자에게 한 번 발행"""
+        publish_tick(
+            CRYPTO,
+            row["symbol"],
+            row["price"],
+            to_epoch_ms(row["created_at"]),
+            volume=row["volume"],
+            s=row["s"],
+            t=row["t"]
+        )
+    
     def save_crypto_quote(self, crypto_data: Dict[str, Any]) -> bool:
-        """암호화폐 시세 데이터를 데이터베이스에 저장"""
+        """
+        암호화폐 시세 데이터를 쓰기 버퍼를 거쳐 데이터베이스에 저장
+        
+        틱은 바로 발행하고, DB에는 버퍼가 다른 행과 모아서 다중 행 INSERT로 저장함
+        """
         try:
-            #  입력 데이터 검증 및 로깅
-            logger.info(f" 암호화폐 저장 시도: {crypto_data}")
-            
             # 필수 필드 검증
             symbol = crypto_data.get('symbol', '')
             s = crypto_data.get('s', '')
             p = crypto_data.get('p', '0')
-            v = crypto_data.get('v', '0')
             t = crypto_data.get('t', 0)
             
             if not symbol:
@@ -42,43 +80,28 @@ class CryptoQuoteService:
                 logger.error(f" 유효하지 않은 타임스탬프: t={t}")
                 return False
             
-            logger.info(f" 데이터 검증 통과: {symbol} - 가격: {p}, 타임스탬프: {t}")
+            row = self.build_crypto_row(crypto_data)
+            queued = write_buffer.submit(CryptoQuote, row)
+            self.publish_crypto_tick(row)
             
-            with SessionLocal() as db:
-                # CryptoQuote 객체 생성
-                crypto_quote = CryptoQuote(
-                    symbol=symbol,                            # BTC, ETH 등
-                    s=s,                                      # BINANCE:BTCUSDT
-                    p=str(p),                                 # 현재가 (문자열)
-                    v=str(v),                                 # 거래량 (문자열)
-                    t=int(t)                                  # 타임스탬프 (밀리초)
-                )
-                
-                logger.info(f" CryptoQuote 객체 생성 완료: {symbol}")
-                
-                db.add(crypto_quote)
-                logger.info(f" 세션에 추가 완료: {symbol}")
-                
-                db.commit()
-                logger.info(f" 커밋 완료: {symbol}")
-                
-                db.refresh(crypto_quote)
-                logger.info(f" 새로고침 완료: {symbol}, ID: {crypto_quote.id}")
-                
-                logger.info(f" 암호화폐 시세 저장 완료: {symbol} (ID: {crypto_quote.id})")
-                return True
+            logger.debug(f" 암호화폐 시세 저장 대기열 추가: {symbol} - 가격: {p}, 타임스탬프: {t}")
+            return queued
                 
         except Exception as e:
-            logger.error(f" 암호화폐 시세 저장 실패: {crypto_data.get('symbol', 'UNKNOWN')}")
-            logger.error(f" 상세 오류: {str(e)}")
-            logger.error(f" 오류 타입: {type(e).__name__}")
-            
-            # 스택 트레이스 출력
-            import traceback
-            logger.error(f" 스택 트레이스:\n{traceback.format_exc()}")
-            
+            logger.error(f" 암호화폐 시세 저장 실패: {crypto_data.get('symbol', 'UNKNOWN')}, 오류: {e}")
             return False
     
+    def save_crypto_quotes(self, quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        여러 암호화폐 시세를 쓰기 버퍼에 한 번에 추가
+        
+        :return: 버퍼에 추가한 행 목록 (발행은 호출자가 처리)
+        """
+        rows = [self.build_crypto_row(crypto_data) for crypto_data in quotes]
+        if rows and not write_buffer.submit(CryptoQuote, rows):
+            logger.error(f" 암호화폐 시세 일괄 저장 실패: {len(rows)}개")
+        return rows
+    
     def get_latest_crypto_quote(self, symbol: str) -> Optional[CryptoQuote]:
         """최신 암호화폐 시세 조회"""
         try:
@@ -103,12 +126,80 @@ class CryptoQuoteService:
                     .filter(CryptoQuote.created_at >= since)\
                     .order_by(CryptoQuote.created_at.desc())\
                     .all()
-                return quotes
+                
+                # DB 보관 기간보다 긴 기간이면 보관 파일의 시세를 이어 붙임
+                return quote_archive.merge_history(CRYPTO, symbol, since, quotes)
                 
         except Exception as e:
             logger.error(f" 암호화폐 시세 이력 조회 실패: {symbol}, 오류: {e}")
             return []
     
+    def get_crypto_quote_history_page(self, symbol: str, hours: int = 24, limit: int = 500,
+                                      cursor: Optional[Tuple[datetime, int]] = None) -> Tuple[List[CryptoQuote], Optional[Tuple[datetime, int]]]:
+        """
+        암호화폐 시세 이력 키셋 페이지 조회 (최신순)
+        
+        :param cursor: 이전 페이지의 마지막 (created_at, id) - 없으면 첫 페이지
+        :return: (시세 목록, 다음 페이지 커서 또는 None)
+        """
+        try:
+            with SessionLocal() as db:
+                since = datetime.utcnow() - timedelta(hours=hours)
+                query = db.query(CryptoQuote)\
+                    .filter(CryptoQuote.symbol == symbol)\
+                    .filter(CryptoQuote.created_at >= since)
+                
+                if cursor:
+                    created_at, row_id = cursor
+                    query = query.filter(or_(
+                        CryptoQuote.created_at < created_at,
+                        and_(CryptoQuote.created_at == created_at, CryptoQuote.id < row_id)
+                    ))
+                
+                quotes = query\
+                    .order_by(CryptoQuote.created_at.desc(), CryptoQuote.id.desc())\
+                    .limit(limit + 1)\
+                    .all()
+                
+            # DB 이력이 끝나면 DB 보관 기간 밖의 보관 파일 시세로 페이지를 이어서 채움
+            if len(quotes) <= limit:
+                quotes += itertools.islice(
+                    quote_archive.iter_history_before(CRYPTO, symbol, since, cursor), limit + 1 - len(quotes)
+                )
+            
+            if len(quotes) > limit:
+                last = quotes[limit - 1]
+                return quotes[:limit], (last.created_at, last.id)
+            return quotes, None
+            
+        except Exception as e:
+            logger.error(f" 암호화폐 시세 이력 페이지 조회 실패: {symbol}, 오류: {e}")
+            return [], None
+    
+    def iter_crypto_quote_history(self, symbol: str, hours: int = 24, chunk_size: int = 1000) -> Iterator[List[Tuple]]:
+        """
+        암호화폐 시세 이력을 서버 측 커서로 chunk_size 행씩 생성 (최신순, CRYPTO_HISTORY_COLUMNS 순서)
+        
+        전체 결과를 메모리에 올리지 않으므로 긴 기간 내보내기에도 메모리 사용량이 일정함
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        query = select(*[getattr(CryptoQuote, column) for column in CRYPTO_HISTORY_COLUMNS])\
+            .where(CryptoQuote.symbol == symbol, CryptoQuote.created_at >= since)\
+            .order_by(CryptoQuote.created_at.desc(), CryptoQuote.id.desc())
+        
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            for rows in result.partitions():
+                yield rows
+        
+        # DB 보관 기간보다 긴 기간이면 DB 이력 뒤에 보관 파일 시세를 같은 순서로 이어서 전송
+        archived = quote_archive.iter_history_before(CRYPTO, symbol, since)
+        while True:
+            rows = [tuple(getattr(quote, column) for column in CRYPTO_HISTORY_COLUMNS) for quote in itertools.islice(archived, chunk_size)]
+            if not rows:
+                break
+            yield rows
+    
     def get_all_crypto_symbols(self) -> List[str]:
         """데이터베이스에 저장된 모든 암호화폐 심볼 조회"""
         try:
@@ -122,64 +213,30 @@ class CryptoQuoteService:
             logger.error(f"❌ 암호화폐 심볼 목록 조회 실패: {e}")
             return []
     
-    def get_crypto_quote_statistics(self, symbol: str) -> Dict[str, Any]:
-        """특정 암호화폐 심볼의 통계 정보 조회"""
+    def get_crypto_quote_statistics(self, symbol: str, window: str = DEFAULT_WINDOW) -> Dict[str, Any]:
+        """특정 암호화폐 심볼의 기간 통계 정보 조회 (DB 집계, TTL 캐시)"""
         try:
-            with SessionLocal() as db:
-                quotes = db.query(CryptoQuote)\
-                    .filter(CryptoQuote.symbol == symbol)\
-                    .order_by(CryptoQuote.created_at.desc())\
-                    .limit(100)\
-                    .all()
-                
-                if not quotes:
-                    return {}
-                
-                # 통계 계산 (문자열 가격을 float로 변환)
-                prices = [float(q.p) for q in quotes if q.p]
-                volumes = [float(q.v) for q in quotes if q.v and q.v != '0']
-                
-                return {
-                    "symbol": symbol,
-                    "total_records": len(quotes),
-                    "latest_price": float(quotes[0].p) if quotes[0].p else 0,
-                    "highest_price": max(prices) if prices else 0,
-                    "lowest_price": min(prices) if prices else 0,
-                    "average_price": sum(prices) / len(prices) if prices else 0,
-                    "total_volume": sum(volumes) if volumes else 0,
-                    "first_record": quotes[-1].created_at.isoformat(),
-                    "latest_record": quotes[0].created_at.isoformat()
-                }
-                
+            return quote_statistics.get_statistics(CRYPTO, symbol, window)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f" 암호화폐 통계 조회 실패: {symbol}, 오류: {e}")
             return {}
     
     def cleanup_old_crypto_data(self, days: int = 7) -> int:
-        """오래된 암호화폐 데이터 정리"""
+        """오래된 데이터 정리 - 파티션 테이블이면 만료 파티션 삭제, 아니면 청크 단위 DELETE"""
+        from stock.backend.services.retention import retention_service
+        
         try:
-            with SessionLocal() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                
-                # 오래된 데이터 조회
-                old_quotes = db.query(CryptoQuote)\
-                    .filter(CryptoQuote.created_at < cutoff_date)\
-                    .all()
-                
-                count = len(old_quotes)
-                
-                # 데이터 삭제
-                db.query(CryptoQuote)\
-                    .filter(CryptoQuote.created_at < cutoff_date)\
-                    .delete()
-                
-                db.commit()
-                logger.info(f" {count}개의 오래된 암호화폐 시세 데이터 정리 완료")
-                return count
-                
+            return retention_service.purge(CRYPTO, days)
         except Exception as e:
             logger.error(f" 암호화폐 데이터 정리 실패: {e}")
             return 0
 
 # 전역 서비스 인스턴스
 crypto_service = CryptoQuoteService()
+
+# 쓰기 버퍼가 시세를 저장할 때마다 같은 행으로 OHLCV 봉 갱신
+write_buffer.add_flush_hook(CryptoQuote, bar_rollup.apply_crypto_rows)
+# 같은 행으로 심볼별 최신 시세 테이블 갱신 (현재가 조회용)
+write_buffer.add_flush_hook(CryptoQuote, latest_quotes.apply_crypto_rows)
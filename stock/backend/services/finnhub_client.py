@@ -0,0 +1,226 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from stock.backend.core.config import api_settings
+
+logger = logging.getLogger(__name__)
+
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+
+# 우선순위 레인 (숫자가 작을수록 먼저 토큰을 받음)
+PRIORITY_INTERACTIVE = 0  # 사용자가 직접 요청한 시세
+PRIORITY_DASHBOARD = 1    # 대시보드 심볼 (MOST_ACTIVE_STOCKS, TOP_10_CRYPTOS)
+PRIORITY_BACKGROUND = 2   # 그 밖의 주기적 갱신
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_DASHBOARD: "dashboard",
+    PRIORITY_BACKGROUND: "background"
+}
+
+# 버킷에 쌓아 둘 수 있는 최대 버스트 (초 단위 환산)
+BURST_SECONDS = 2
+# 429 응답에 Retry-After 헤더가 없을 때 대기 시간 (초)
+DEFAULT_RETRY_AFTER = 5.0
+REQUEST_TIMEOUT = 10
+# keep-alive 연결 수
+MAX_CONNECTIONS = 10
+
+class TokenBucket:
+    """분당 한도 기반 토큰 버킷 - 대기 중인 요청은 우선순위 레인 순서로 토큰을 받음"""
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate_per_minute = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(self.rate * BURST_SECONDS))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        # penalize()로 미래 시점까지 지급이 멈춰 있으면 채우지 않음
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND):
+        """토큰 하나를 받을 때까지 대기"""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        """대기열이 빌 때까지 토큰이 생기는 대로 가장 높은 우선순위 요청부터 깨움"""
+        while self._waiters:
+            self._refill()
+            if self._tokens >= 1:
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    # 취소된 요청
+                    continue
+                self._tokens -= 1
+                future.set_result(None)
+                continue
+
+            delay = max(0.0, self._updated - time.monotonic()) + (1 - self._tokens) / self.rate
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: float):
+        """429 응답 시 버킷을 비우고 retry_after 동안 토큰 지급 중지"""
+        self._tokens = 0.0
+        self._updated = max(self._updated, time.monotonic() + retry_after)
+
+    def get_status(self) -> Dict[str, Any]:
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "waiting": waiting
+        }
+
+class FinnhubClient:
+    """
+    프로세스 공용 Finnhub 비동기 클라이언트
+
+    전용 스레드의 이벤트 루프에서 단일 aiohttp 세션(keep-alive)과 토큰 버킷을 운영하므로
+    수집기 스레드와 FastAPI 이벤트 루프 어디서 호출하든 같은 한도를 공유함
+    """
+
+    def __init__(self, api_key: Optional[str] = None, rate_per_minute: Optional[int] = None):
+        self.api_key = api_key if api_key is not None else api_settings.finnhub_api_key
+        self.bucket = TokenBucket(rate_per_minute or api_settings.finnhub_rate_limit)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._start_lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.rate_limited_count = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """첫 요청 시 클라이언트 전용 이벤트 루프 스레드 시작"""
+        with self._start_lock:
+            if self.loop is None or self.loop.is_closed():
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop, name="finnhub-client", daemon=True)
+                self._thread.start()
+                logger.info(f" Finnhub 클라이언트 시작 (분당 {self.bucket.rate_per_minute}회)")
+        return self.loop
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, keepalive_timeout=60, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def _request(self, path: str, params: Dict[str, Any], priority: int) -> Optional[Any]:
+        """클라이언트 루프에서 실행 - 토큰을 받은 뒤 요청하고, 429면 버킷을 멈춘 뒤 한 번 재시도"""
+        for attempt in range(2):
+            await self.bucket.acquire(priority)
+            self.request_count += 1
+
+            try:
+                async with self._get_session().get(
+                    f"{FINNHUB_BASE_URL}{path}",
+                    params={**params, "token": self.api_key}
+                ) as response:
+                    if response.status == 429:
+                        self.rate_limited_count += 1
+                        retry_after = float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+                        self.bucket.penalize(retry_after)
+                        logger.warning(f" Finnhub 요청 한도 초과: {path} {params} - {retry_after:.0f}초 대기")
+                        continue
+
+                    if response.status != 200:
+                        self.error_count += 1
+                        logger.error(f" Finnhub API 요청 실패: {path} {params} - {response.status}")
+                        return None
+
+                    return await response.json(content_type=None)
+
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f" Finnhub API 요청 중 오류: {path} {params} - {e}")
+                return None
+
+        return None
+
+    async def request(self, path: str, params: Optional[Dict[str, Any]] = None,
+                      priority: int = PRIORITY_BACKGROUND) -> Optional[Any]:
+        """어느 이벤트 루프에서든 await 가능한 요청 - 실패 시 None"""
+        loop = self._ensure_started()
+        coroutine = self._request(path, params or {}, priority)
+        if asyncio.get_running_loop() is loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def request_sync(self, path: str, params: Optional[Dict[str, Any]] = None,
+                     priority: int = PRIORITY_BACKGROUND, timeout: Optional[float] = None) -> Optional[Any]:
+        """수집기 스레드용 동기 요청 - 토큰 대기 시간을 포함해서 블로킹 (이벤트 루프에서 호출 금지)"""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._request(path, params or {}, priority), loop)
+        return future.result(timeout)
+
+    async def get_quote(self, symbol: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, Any]]:
+        """시세 조회 (/quote)"""
+        return await self.request("/quote", {"symbol": symbol}, priority)
+
+    def get_quote_sync(self, symbol: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, Any]]:
+        """시세 조회 (/quote) - 스레드용"""
+        return self.request_sync("/quote", {"symbol": symbol}, priority)
+
+    def close(self):
+        """세션을 닫고 클라이언트 루프 종료"""
+        if self.loop is None or self.loop.is_closed():
+            return
+
+        async def close_session():
+            if self._session and not self._session.closed:
+                await self._session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_session(), self.loop).result(5)
+        except Exception as e:
+            logger.error(f" Finnhub 세션 종료 오류: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        logger.info(" Finnhub 클라이언트 종료")
+
+    def get_status(self) -> Dict[str, Any]:
+        """클라이언트 상태 반환"""
+        return {
+            "running": self.loop is not None and self.loop.is_running(),
+            "request_count": self.request_count,
+            "error_count": self.error_count,
+            "rate_limited_count": self.rate_limited_count,
+            "bucket": self.bucket.get_status()
+        }
+
+# 전역 Finnhub 클라이언트 인스턴스
+finnhub_client = FinnhubClient()
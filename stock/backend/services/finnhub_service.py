@@ -1,12 +1,11 @@
 import os
 import time
-import requests
 import json
-import threading
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from typing import Dict, Any, List, Optional
 import logging
+from stock.backend.services.finnhub_client import finnhub_client, PRIORITY_INTERACTIVE
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -16,101 +15,60 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 API_KEY = os.getenv("FINNHUB_API_KEY")
 
-# 캐시 데이터와 마지막 요청 시간을 저장할 변수
-stock_cache: Dict[str, Dict[str, Any]] = {}
-last_request_time: Dict[str, float] = {}
-request_lock = threading.Lock()
+def _format_quote(symbol: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """통합 시세 캐시 데이터를 웹소켓 형식으로 변환"""
+    cached_at = data.get('_cache_info', {}).get('cached_at', time.time())
+    return {
+        's': symbol,                            # 심볼
+        'p': str(data['c']),                    # 현재 가격
+        'v': str(data.get('v', 0)),             # 거래량 (없을 수 있음)
+        'o': str(data.get('o', 0)),             # 시가
+        'h': str(data.get('h', 0)),             # 고가
+        'l': str(data.get('l', 0)),             # 저가
+        'pc': str(data.get('pc', 0)),           # 이전 종가
+        't': int(cached_at * 1000)              # 타임스탬프 (밀리초)
+    }
 
-def get_stock_quote(symbol: str) -> Optional[Dict[str, Any]]:
+def get_stock_quote(symbol: str, priority: int = PRIORITY_INTERACTIVE) -> Optional[Dict[str, Any]]:
     """
-    Finnhub API를 통해 주식 시세 정보를 가져오는 함수
-    요청 제한을 고려하여 캐싱 로직 구현
+    주식 시세 정보를 가져오는 함수
+    통합 수집 파이프라인이 갱신하는 stock_service 캐시를 읽고, 없을 때만 Finnhub에 요청
     
     :param symbol: 주식 심볼 (예: AAPL, MSFT)
+    :param priority: 공용 Finnhub 클라이언트의 우선순위 레인
     :return: 주식 데이터 사전 또는 오류 시 None
     """
-    current_time = time.time()
+    from stock.backend.services.stock_service import get_cached_stock_data
     
     # 가상화폐는 웹소켓으로 처리하므로 REST API 사용하지 않음
     if symbol.startswith("BINANCE:"):
         return None
     
-    # 디버깅 로그 추가
     logger.info(f"주식 시세 요청: 심볼={symbol}")
     
-    # 사용 가능한 캐시가 있는지 확인
-    with request_lock:
-        # 기존 캐시 확인
-        if symbol in stock_cache:
-            cache_age = current_time - last_request_time.get(symbol, 0)
-            # 60초(1분) 이내의 데이터는 캐시 사용
-            if cache_age < 60:
-                logger.info(f"캐시된 데이터 반환: {symbol}, 경과 시간: {cache_age:.1f}초")
-                return stock_cache[symbol]
-        
-        # 이 심볼에 대해 마지막 요청 후 최소 60초 지났는지 확인
-        if symbol in last_request_time and current_time - last_request_time[symbol] < 60:
-            logger.info(f"요청 제한으로 캐시된 데이터 반환: {symbol}")
-            return stock_cache.get(symbol)
-        
-        # API 요청
-        try:
-            url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={API_KEY}"
-            logger.info(f"Finnhub API 요청: {url}")
-            response = requests.get(url, timeout=10)  # 타임아웃 설정
-            
-            if response.status_code == 200:
-                data = response.json()
-                logger.info(f"API 응답: {data}")
-                
-                # 응답이 유효하면 캐시 업데이트
-                if 'c' in data:  # 'c'는 현재 가격
-                    formatted_data = {
-                        's': symbol,                 # 심볼
-                        'p': str(data['c']),         # 현재 가격
-                        'v': str(data['v'] if 'v' in data else 0),  # 거래량 (없을 수 있음)
-                        'o': str(data['o']),         # 시가
-                        'h': str(data['h']),         # 고가
-                        'l': str(data['l']),         # 저가
-                        'pc': str(data['pc']),       # 이전 종가
-                        't': int(time.time() * 1000) # 타임스탬프 (밀리초)
-                    }
-                    
-                    stock_cache[symbol] = formatted_data
-                    last_request_time[symbol] = current_time
-                    
-                    return formatted_data
-                else:
-                    logger.error(f"유효하지 않은 응답: {data}")
-            else:
-                logger.error(f"API 요청 실패: {response.status_code}, {response.text}")
-        
-        except Exception as e:
-            logger.error(f"API 요청 중 오류 발생: {e}")
-        
-        # 오류 시 기존 캐시가 있으면 반환
-        if symbol in stock_cache:
-            logger.warning(f"API 요청 실패로 캐시 데이터 반환: {symbol}")
-            return stock_cache.get(symbol)
-        
-        # 캐시도 없고 API 요청도 실패한 경우 직접 모의 데이터 반환 (임시 조치)
-        logger.warning(f"모의 데이터 생성: {symbol}")
-        mock_data = {
-            's': symbol,
-            'p': '150.00',
-            'v': '1000000',
-            'o': '149.00',
-            'h': '152.00',
-            'l': '148.00',
-            'pc': '149.50',
-            't': int(time.time() * 1000)
-        }
-        
-        # 모의 데이터도 캐싱
-        stock_cache[symbol] = mock_data
-        last_request_time[symbol] = current_time
-        
-        return mock_data
+    data = None
+    try:
+        data = get_cached_stock_data(symbol, priority)
+    except Exception as e:
+        logger.error(f"시세 조회 중 오류 발생: {e}")
+    
+    if data and 'c' in data:
+        return _format_quote(symbol, data)
+    
+    logger.error(f"시세 조회 실패: {symbol}")
+    
+    # 캐시도 없고 API 요청도 실패한 경우 직접 모의 데이터 반환 (임시 조치)
+    logger.warning(f"모의 데이터 생성: {symbol}")
+    return {
+        's': symbol,
+        'p': '150.00',
+        'v': '1000000',
+        'o': '149.00',
+        'h': '152.00',
+        'l': '148.00',
+        'pc': '149.50',
+        't': int(time.time() * 1000)
+    }
 
 def get_stock_data_for_broadcast(symbol: str) -> Optional[Dict[str, Any]]:
     """
@@ -128,83 +86,33 @@ def get_stock_data_for_broadcast(symbol: str) -> Optional[Dict[str, Any]]:
         }
     return None
 
-def update_stock_cache_periodically():
-    """
-    캐시된 모든 주식 심볼에 대해 주기적으로 업데이트하는 백그라운드 스레드 함수
-    """
-    while True:
-        try:
-            symbols_to_update = []
-            
-            # 업데이트가 필요한 심볼 목록 확인
-            with request_lock:
-                current_time = time.time()
-                for symbol in list(stock_cache.keys()):
-                    # 가상화폐는 제외
-                    if symbol.startswith("BINANCE:"):
-                        continue
-                    
-                    # 마지막 업데이트 후 60초 이상 지난 경우
-                    if current_time - last_request_time.get(symbol, 0) >= 60:
-                        symbols_to_update.append(symbol)
-            
-            # 업데이트가 필요한 각 심볼에 대해 API 요청
-            for symbol in symbols_to_update:
-                stock_data = get_stock_quote(symbol)
-                if stock_data:
-                    logger.info(f"백그라운드 업데이트 완료: {symbol}")
-                
-                # API 요청 제한 준수를 위해 요청 간 지연
-                time.sleep(1.2)  # 1.2초 간격으로 최대 50개/분 유지
-            
-            # 다음 검사 주기까지 대기
-            time.sleep(10)  # 10초마다 업데이트 필요한지 검사
-            
-        except Exception as e:
-            logger.error(f"주기적 업데이트 중 오류: {e}")
-            time.sleep(30)  # 오류 발생 시 30초 대기 후 재시도
-
-# 모듈 초기화 시 백그라운드 스레드 시작
-background_thread = threading.Thread(
-    target=update_stock_cache_periodically, 
-    daemon=True
-)
-background_thread.start()
-
-def stop_background_updates():
-    """백그라운드 업데이트 스레드 중지"""
-    global background_thread
-    if background_thread and background_thread.is_alive():
-        # 스레드 종료 신호 (데몬 스레드이므로 메인 프로그램 종료 시 자동 종료됨)
-        logger.info("백그라운드 업데이트 스레드 종료 예정")
-
 def get_cache_status():
-    """캐시 상태 정보 반환"""
-    with request_lock:
-        current_time = time.time()
-        return {
-            "total_cached_symbols": len(stock_cache),
-            "cache_ages": {
-                symbol: current_time - last_request_time.get(symbol, 0) 
-                for symbol in stock_cache.keys()
-            },
-            "oldest_cache": max([current_time - t for t in last_request_time.values()]) if last_request_time else 0
-        }
+    """캐시 상태 정보 반환 (통합 시세 캐시 기준)"""
+    from stock.backend.services.stock_service import get_cache_statistics
+    
+    statistics = get_cache_statistics()
+    cache_ages = statistics["last_updates"]
+    return {
+        "total_cached_symbols": statistics["cached_symbols"],
+        "cache_ages": cache_ages,
+        "oldest_cache": max(cache_ages.values()) if cache_ages else 0
+    }
 
 def clear_old_cache(max_age_hours=24):
-    """오래된 캐시 데이터 정리"""
+    """오래된 캐시 데이터 정리 (통합 시세 캐시 기준)"""
+    from stock.backend.services.stock_service import stock_cache, last_update_time, cache_lock
+    
     current_time = time.time()
     max_age_seconds = max_age_hours * 3600
-    symbols_to_remove = []
     
-    with request_lock:
-        for symbol in list(stock_cache.keys()):
-            if current_time - last_request_time.get(symbol, 0) > max_age_seconds:
-                symbols_to_remove.append(symbol)
-        
+    with cache_lock:
+        symbols_to_remove = [
+            symbol for symbol in list(stock_cache.keys())
+            if current_time - last_update_time.get(symbol, 0) > max_age_seconds
+        ]
         for symbol in symbols_to_remove:
             stock_cache.pop(symbol, None)
-            last_request_time.pop(symbol, None)
+            last_update_time.pop(symbol, None)
             logger.info(f"오래된 캐시 정리: {symbol}")
     
     return len(symbols_to_remove)
@@ -218,17 +126,18 @@ async def get_stock_symbols(exchange: str, currency: str = "USD"):
     :return: 주식 심볼 목록
     """
     try:
-        # 기본 URL 및 필수 파라미터
-        url = f"https://finnhub.io/api/v1/stock/symbol?exchange={exchange}&currency={currency}&token={API_KEY}"
-        
         logger.info(f"주식 심볼 목록 요청: exchange={exchange}, currency={currency}")
-        response = requests.get(url)
+        data = await finnhub_client.request(
+            "/stock/symbol",
+            {"exchange": exchange, "currency": currency},
+            PRIORITY_INTERACTIVE
+        )
         
-        if response.status_code == 200:
-            return response.json()
+        if data is not None:
+            return data
         else:
-            logger.error(f"API 요청 실패: {response.status_code}, {response.text}")
-            return {"error": f"API 요청 실패: {response.status_code}"}
+            logger.error(f"API 요청 실패: exchange={exchange}")
+            return {"error": "API 요청 실패"}
     
     except Exception as e:
         logger.error(f"주식 심볼 목록 요청 중 오류: {e}")
@@ -242,14 +151,10 @@ async def get_crypto_symbols(exchange: str):
     :return: 암호화폐 심볼 목록
     """
     try:
-        # 기본 URL 및 필수 파라미터
-        url = f"https://finnhub.io/api/v1/crypto/symbol?exchange={exchange}&token={API_KEY}"
-        
         logger.info(f"암호화폐 심볼 목록 요청: exchange={exchange}")
-        response = requests.get(url)
+        data = await finnhub_client.request("/crypto/symbol", {"exchange": exchange}, PRIORITY_INTERACTIVE)
         
-        if response.status_code == 200:
-            data = response.json()
+        if data is not None:
             
             # 응답 형식 조정
             formatted_data = []
@@ -263,8 +168,8 @@ async def get_crypto_symbols(exchange: str):
             
             return formatted_data
         else:
-            logger.error(f"암호화폐 API 요청 실패: {response.status_code}, {response.text}")
-            return {"error": f"API 요청 실패: {response.status_code}"}
+            logger.error(f"암호화폐 API 요청 실패: exchange={exchange}")
+            return {"error": "API 요청 실패"}
     
     except Exception as e:
         logger.error(f"암호화폐 심볼 목록 요청 중 오류: {e}")
@@ -0,0 +1,255 @@
+import asyncio
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from stock.backend.core.config import api_settings
+from stock.backend.services.finnhub_client import finnhub_client
+from stock.backend.services.symbol_registry import symbol_registry
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+# 수집 주기 (초) - 심볼이 요청 한도보다 많으면 한 라운드에 모든 심볼을 받을 수 있도록 늘림
+INGEST_INTERVAL = 60
+# Finnhub 분당 요청 한도 중 수집 라운드가 쓰는 비율 - 나머지는 사용자 요청(캐시 미스)용으로 남겨 둠
+ROUND_BUDGET_SHARE = 0.8
+
+class IngestionPipeline:
+    """
+    단일 시세 수집 파이프라인
+
+    심볼 레지스트리의 모든 심볼을 라운드마다 정확히 한 번씩 처리함. 라운드 주기는 interval과
+    (심볼 수 / 분당 수집 한도) 중 긴 쪽으로 정해 요청 한도를 넘지 않음
+    fetch → normalize → dedupe → cache update → batched persist → publish
+    """
+
+    def __init__(self, interval: float = INGEST_INTERVAL, rate_limit: Optional[int] = None):
+        self.interval = interval
+        # 수집 라운드가 쓸 수 있는 분당 요청 수
+        rate_limit = rate_limit or api_settings.finnhub_rate_limit
+        self.rate_budget = max(1.0, rate_limit * ROUND_BUDGET_SHARE)
+        # 마지막 라운드 대상 수로 정한 현재 주기 (초)
+        self.current_interval = interval
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # 심볼별 마지막으로 수집한 시세 키 (중복 제거용)
+        self._last_keys: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self.round_count = 0
+        self.fetched_count = 0
+        self.duplicate_count = 0
+        self.persisted_count = 0
+        self.error_count = 0
+        self.last_round_at: Optional[float] = None
+        self.last_round_seconds = 0.0
+
+    def start(self):
+        """수집 스레드 시작 (이미 실행 중이면 무시)"""
+        if self.is_running:
+            logger.warning("수집 파이프라인이 이미 실행 중입니다")
+            return
+
+        self.is_running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ingestion-pipeline", daemon=True)
+        self._thread.start()
+        logger.info(f" 통합 수집 파이프라인 시작 - {self.interval:.0f}초 주기, 분당 최대 {self.rate_budget:.0f}개 요청")
+
+    def stop(self):
+        """수집 스레드 중지"""
+        self.is_running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        logger.info(f" 통합 수집 파이프라인 중지됨 (라운드: {self.round_count}, 저장: {self.persisted_count})")
+
+    def _run(self):
+        """수집 루프 - 라운드 시작 시각 기준으로 interval마다 실행"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            while self.is_running:
+                start_time = time.time()
+                try:
+                    loop.run_until_complete(self.run_once())
+                except Exception as e:
+                    self.error_count += 1
+                    logger.error(f" 수집 라운드 오류: {e}")
+
+                remaining_time = self.current_interval - (time.time() - start_time)
+                if remaining_time > 0:
+                    self._stop_event.wait(remaining_time)
+                else:
+                    logger.warning(f" 수집 라운드가 주기를 초과했습니다 ({time.time() - start_time:.1f}초)")
+        finally:
+            loop.close()
+            logger.info(" 통합 수집 파이프라인 루프 종료")
+
+    async def run_once(self) -> Dict[str, int]:
+        """수집 라운드 1회 실행"""
+        start_time = time.time()
+        targets = [(STOCK, symbol) for symbol in symbol_registry.get_symbols(STOCK)]
+        targets += [(CRYPTO, symbol) for symbol in symbol_registry.get_symbols(CRYPTO)]
+        self.current_interval = self.round_interval(len(targets))
+
+        responses = await self._fetch(targets)
+        quotes = [quote for quote in (self._normalize(kind, symbol, data) for (kind, symbol), data in responses) if quote]
+        fresh = self._dedupe(quotes)
+        self._update_cache(responses)
+        saved = self._persist(fresh)
+        self._publish(fresh, saved)
+
+        self.round_count += 1
+        self.fetched_count += len(quotes)
+        self.duplicate_count += len(quotes) - len(fresh)
+        self.last_round_at = time.time()
+        self.last_round_seconds = self.last_round_at - start_time
+
+        logger.info(
+            f" 수집 라운드 #{self.round_count}: 대상 {len(targets)}개, 수신 {len(quotes)}개, "
+            f"신규 {len(fresh)}개, 저장 {len(saved[STOCK]) + len(saved[CRYPTO])}개 "
+            f"({self.last_round_seconds:.1f}초, 주기 {self.current_interval:.0f}초)"
+        )
+        return {"targets": len(targets), "received": len(quotes), "fresh": len(fresh)}
+
+    def round_interval(self, target_count: int) -> float:
+        """대상 수에 맞춘 라운드 주기 - 모든 심볼을 한 라운드에 받아도 분당 수집 한도를 넘지 않는 최소 주기"""
+        interval = max(self.interval, target_count * 60 / self.rate_budget)
+        if interval > self.current_interval:
+            logger.warning(
+                f" 수집 대상 {target_count}개가 분당 한도 {self.rate_budget:.0f}개를 넘어 주기를 {interval:.0f}초로 늘립니다"
+            )
+        return interval
+
+    async def _fetch(self, targets: List[Tuple[str, str]]) -> List[Tuple[Tuple[str, str], Optional[Dict[str, Any]]]]:
+        """fetch - 심볼마다 한 번, 레지스트리 우선순위 레인으로 공용 클라이언트에 요청"""
+        from stock.backend.services.stock_service import crypto_finnhub_symbol
+
+        async def fetch_one(kind: str, symbol: str):
+            finnhub_symbol = symbol if kind == STOCK else crypto_finnhub_symbol(symbol)
+            return await finnhub_client.get_quote(finnhub_symbol, symbol_registry.get_priority(kind, symbol))
+
+        results = await asyncio.gather(*(fetch_one(kind, symbol) for kind, symbol in targets), return_exceptions=True)
+
+        responses = []
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.error_count += 1
+                logger.error(f" {target[0]}:{target[1]} 수집 실패: {result}")
+                result = None
+            responses.append((target, result))
+        return responses
+
+    def _normalize(self, kind: str, symbol: str, data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """normalize - Finnhub 응답을 저장/발행 공통 형식으로 변환 (유효하지 않으면 None)"""
+        if not data or not data.get('c'):
+            return None
+
+        if kind == STOCK:
+            record = {
+                "symbol": symbol,
+                "c": float(data['c']),
+                "d": float(data.get('d') or 0),
+                "dp": float(data.get('dp') or 0),
+                "h": float(data.get('h') or 0),
+                "l": float(data.get('l') or 0),
+                "o": float(data.get('o') or 0),
+                "pc": float(data.get('pc') or 0)
+            }
+        else:
+            from stock.backend.services.stock_service import crypto_finnhub_symbol
+            record = {
+                "symbol": symbol,
+                "s": crypto_finnhub_symbol(symbol),
+                "p": str(data['c']),
+                "v": str(data.get('v', 0)),
+                "t": int(time.time() * 1000)
+            }
+
+        return {
+            "kind": kind,
+            "symbol": symbol,
+            # Finnhub 't'는 마지막 체결 시각(초) - 가격과 함께 중복 판단에 사용
+            "key": (data.get('t'), data['c']),
+            "record": record,
+            "persist": symbol_registry.should_persist(kind, symbol)
+        }
+
+    def _dedupe(self, quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """dedupe - 직전 라운드와 체결 시각/가격이 같은 시세는 저장/발행하지 않음"""
+        fresh = []
+        for quote in quotes:
+            identity = (quote["kind"], quote["symbol"])
+            if quote["key"][0] and self._last_keys.get(identity) == quote["key"]:
+                continue
+            self._last_keys[identity] = quote["key"]
+            fresh.append(quote)
+        return fresh
+
+    def _update_cache(self, responses: List[Tuple[Tuple[str, str], Optional[Dict[str, Any]]]]):
+        """cache update - 모든 소비자가 읽는 단일 시세 캐시 갱신 (중복이어도 캐시 경과 시간은 초기화)"""
+        from stock.backend.services.stock_service import _cache_stock_data, _cache_crypto_data
+
+        for (kind, symbol), data in responses:
+            if data is None:
+                continue
+            if kind == STOCK:
+                _cache_stock_data(symbol, dict(data))
+            else:
+                _cache_crypto_data(symbol, data)
+
+    def _persist(self, quotes: List[Dict[str, Any]]) -> Dict[str, list]:
+        """batched persist - 저장 대상 시세를 종류별로 쓰기 버퍼에 한 번에 추가"""
+        from stock.backend.services.quote_service import quote_service
+        from stock.backend.services.crypto_service import crypto_service
+
+        stock_records = [quote["record"] for quote in quotes if quote["persist"] and quote["kind"] == STOCK]
+        crypto_records = [quote["record"] for quote in quotes if quote["persist"] and quote["kind"] == CRYPTO]
+
+        saved = {
+            STOCK: quote_service.save_stock_quotes(stock_records),
+            CRYPTO: crypto_service.save_crypto_quotes(crypto_records)
+        }
+        self.persisted_count += len(saved[STOCK]) + len(saved[CRYPTO])
+        return saved
+
+    def _publish(self, quotes: List[Dict[str, Any]], saved: Dict[str, list]):
+        """publish - 저장 대상 여부와 관계없이 새 시세마다 틱 한 번 발행"""
+        from stock.backend.services.quote_service import quote_service
+        from stock.backend.services.crypto_service import crypto_service
+
+        stock_rows = saved[STOCK] + [
+            quote_service.build_stock_row(quote["record"])
+            for quote in quotes if not quote["persist"] and quote["kind"] == STOCK
+        ]
+        crypto_rows = saved[CRYPTO] + [
+            crypto_service.build_crypto_row(quote["record"])
+            for quote in quotes if not quote["persist"] and quote["kind"] == CRYPTO
+        ]
+
+        for row in stock_rows:
+            quote_service.publish_stock_tick(row)
+        for row in crypto_rows:
+            crypto_service.publish_crypto_tick(row)
+
+    def get_status(self) -> Dict[str, Any]:
+        """파이프라인 상태 반환"""
+        return {
+            "is_running": self.is_running,
+            "interval": self.interval,
+            "current_interval": round(self.current_interval, 1),
+            "rate_budget": self.rate_budget,
+            "round_count": self.round_count,
+            "fetched_count": self.fetched_count,
+            "duplicate_count": self.duplicate_count,
+            "persisted_count": self.persisted_count,
+            "error_count": self.error_count,
+            "last_round_seconds": round(self.last_round_seconds, 1),
+            "last_round_age": round(time.time() - self.last_round_at, 1) if self.last_round_at else None,
+            "registry": symbol_registry.get_status()
+        }
+
+# 전역 수집 파이프라인 인스턴스
+ingestion_pipeline = IngestionPipeline()
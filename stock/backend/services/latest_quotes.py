@@ -0,0 +1,145 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert
+
+from stock.backend.database import SessionLocal
+from stock.backend.database.models import LatestQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+def latest_quote_to_dict(latest: LatestQuote) -> Dict[str, Any]:
+    """LatestQuote를 응답 형식으로 변환"""
+    return {
+        "symbol": latest.symbol,
+        "price": latest.price,
+        "change": latest.change,
+        "change_percent": latest.change_percent,
+        "open": latest.open,
+        "high": latest.high,
+        "low": latest.low,
+        "prev_close": latest.prev_close,
+        "volume": latest.volume,
+        "seq": latest.seq,
+        "timestamp": latest.quoted_at.isoformat()
+    }
+
+class LatestQuoteService:
+    """
+    최신 시세 테이블 서비스
+
+    쓰기 버퍼가 시세를 저장할 때마다 배치 안의 심볼별 마지막 시세로 latest_quotes를
+    INSERT ... ON DUPLICATE KEY UPDATE 해서, 현재가 조회가 이력 테이블 정렬 대신
+    기본 키 조회(또는 작은 테이블 한 번 읽기)가 되도록 함
+    """
+
+    def apply_stock_rows(self, conn, rows: List[Dict[str, Any]]):
+        """쓰기 버퍼 후처리 - Finnhub 시세의 당일 시가/고가/저가/전일 종가를 그대로 반영"""
+        last: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            last[row["symbol"]] = row
+        if not last:
+            return
+
+        values = [
+            {
+                "kind": STOCK,
+                "symbol": symbol,
+                "price": row["c"],
+                "change": row.get("d"),
+                "change_percent": row.get("dp"),
+                "open": row.get("o"),
+                "high": row.get("h"),
+                "low": row.get("l"),
+                "prev_close": row.get("pc"),
+                "seq": 1,
+                "quoted_at": row["created_at"]
+            } for symbol, row in last.items()
+        ]
+        stmt = insert(LatestQuote).values(values)
+        inserted = stmt.inserted
+        conn.execute(stmt.on_duplicate_key_update(
+            price=inserted.price,
+            change=inserted.change,
+            change_percent=inserted.change_percent,
+            open=inserted.open,
+            high=inserted.high,
+            low=inserted.low,
+            prev_close=inserted.prev_close,
+            seq=LatestQuote.seq + 1,
+            quoted_at=inserted.quoted_at,
+            updated_at=func.now()
+        ))
+
+    def apply_crypto_rows(self, conn, rows: List[Dict[str, Any]]):
+        """쓰기 버퍼 후처리 - 배치를 심볼별로 합친 뒤 UTC 당일 시가/고가/저가/거래량을 이어서 갱신"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            price, volume = row["price"], row["volume"] or 0
+            quote = merged.get(row["symbol"])
+            if quote is None:
+                merged[row["symbol"]] = {
+                    "kind": CRYPTO,
+                    "symbol": row["symbol"],
+                    "price": price,
+                    "open": price,
+                    "high": price,
+                    "low": price,
+                    "volume": volume,
+                    "change": 0.0,
+                    "change_percent": 0.0,
+                    "seq": 1,
+                    "quoted_at": row["created_at"]
+                }
+            else:
+                quote["price"] = price
+                quote["high"] = max(quote["high"], price)
+                quote["low"] = min(quote["low"], price)
+                quote["volume"] += volume
+                quote["quoted_at"] = row["created_at"]
+        if not merged:
+            return
+
+        for quote in merged.values():
+            quote["change"] = quote["price"] - quote["open"]
+            quote["change_percent"] = quote["change"] / quote["open"] * 100 if quote["open"] else 0.0
+
+        stmt = insert(LatestQuote).values(list(merged.values()))
+        inserted = stmt.inserted
+        # 날짜가 바뀌었으면 당일 값을 새로 시작 (quoted_at은 다른 컬럼이 옛 값을 본 뒤 마지막에 갱신)
+        new_day = func.date(LatestQuote.quoted_at) != func.date(inserted.quoted_at)
+        day_open = func.if_(new_day, inserted.open, LatestQuote.open)
+        conn.execute(stmt.on_duplicate_key_update([
+            ("open", day_open),
+            ("high", func.if_(new_day, inserted.high, func.greatest(LatestQuote.high, inserted.high))),
+            ("low", func.if_(new_day, inserted.low, func.least(LatestQuote.low, inserted.low))),
+            ("volume", func.if_(new_day, inserted.volume, LatestQuote.volume + inserted.volume)),
+            ("change", inserted.price - day_open),
+            ("change_percent", (inserted.price - day_open) / func.nullif(day_open, 0) * 100),
+            ("price", inserted.price),
+            ("seq", LatestQuote.seq + 1),
+            ("updated_at", func.now()),
+            ("quoted_at", inserted.quoted_at)
+        ]))
+
+    def get(self, kind: str, symbol: str) -> Optional[LatestQuote]:
+        """심볼 하나의 최신 시세 (기본 키 조회)"""
+        with SessionLocal() as db:
+            return db.get(LatestQuote, (kind, symbol))
+
+    def get_latest(self, kind: str, symbols: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[LatestQuote]:
+        """종류별 최신 시세 목록 (심볼 순)"""
+        query = select(LatestQuote).where(LatestQuote.kind == kind)
+        if symbols is not None:
+            query = query.where(LatestQuote.symbol.in_(list(symbols)))
+        query = query.order_by(LatestQuote.symbol)
+        if limit:
+            query = query.limit(limit)
+
+        with SessionLocal() as db:
+            return list(db.execute(query).scalars())
+
+# 전역 최신 시세 서비스 인스턴스
+latest_quotes = LatestQuoteService()
@@ -0,0 +1,203 @@
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocket
+
+from stock.backend.websocket_manager import manager
+from stock.backend.services.tick_store import tick_store, from_epoch_ms, STOCK
+from stock.backend.services.market_snapshot import build_symbol_update, HISTORY_POINTS
+from stock.backend.services.wire_format import encode_message, ENCODING_JSON
+
+logger = logging.getLogger(__name__)
+
+# WebSocket 전송 방식 (?protocol=) - full은 매번 전체 히스토리, delta는 첫 스냅샷 이후 변경분만
+PROTOCOL_FULL = "full"
+PROTOCOL_DELTA = "delta"
+PROTOCOLS = (PROTOCOL_FULL, PROTOCOL_DELTA)
+
+# 클라이언트가 순번 누락을 감지했을 때 보내는 재동기화 요청
+RESYNC = "resync"
+
+# market_update 항목에서 변경 여부를 비교하는 값 필드
+MARKET_FIELDS = ("price", "change", "changePercent", "timestamp", "data_source")
+
+def parse_protocol(protocol: Optional[str]) -> str:
+    """전송 방식 확인 - 지정하지 않으면 기존 클라이언트와 같은 full"""
+    protocol = (protocol or PROTOCOL_FULL).lower()
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"지원하지 않는 전송 방식입니다: {protocol} ({', '.join(PROTOCOLS)})")
+    return protocol
+
+def is_resync_request(message: str) -> bool:
+    """"resync" 텍스트 또는 {"type": "resync"} JSON 메시지인지 확인"""
+    message = message.strip()
+    if message == RESYNC:
+        return True
+    if not message.startswith("{"):
+        return False
+    try:
+        return json.loads(message).get("type") == RESYNC
+    except (ValueError, AttributeError):
+        return False
+
+def build_symbol_delta(kind: str, symbol: str, base_seq: int) -> Optional[Dict[str, Any]]:
+    """
+    base_seq 이후 새 틱만 담은 델타 메시지
+
+    새 틱이 없으면 빈 딕셔너리, 틱 저장소에서 이미 밀려나 이어 붙일 수 없으면 None (스냅샷 필요)
+    """
+    since = tick_store.get_since(kind, symbol, base_seq, HISTORY_POINTS)
+    if since is None:
+        return None
+
+    prices, timestamps, seq = since
+    if seq == base_seq:
+        return {}
+
+    points = [
+        {
+            "time": from_epoch_ms(timestamp).strftime("%H:%M:%S"),
+            "price": price,
+            "timestamp": timestamp
+        }
+        for price, timestamp in zip(prices.tolist(), timestamps.tolist())
+    ]
+    return {
+        "type": "stock_delta" if kind == STOCK else "crypto_delta",
+        "seq": seq,
+        "base_seq": base_seq,
+        "data": {
+            "symbol": symbol,
+            "points": points,
+            "current_price": points[-1]["price"],
+            "last_update": from_epoch_ms(points[-1]["timestamp"]).isoformat()
+        }
+    }
+
+class SymbolDeltaStream:
+    """
+    개별 심볼 WebSocket 연결 하나의 전송 상태
+
+    delta 방식이면 처음에 seq가 붙은 전체 스냅샷을 보내고, 이후에는 마지막으로 보낸 seq 이후의
+    새 틱만 보냄. 허브 대기열에서 틱이 버려져도 틱 저장소 기준으로 계산하므로 누락이 없고,
+    클라이언트는 base_seq가 자기 seq와 다르면 resync를 보내 스냅샷을 다시 받음
+    """
+
+    def __init__(self, websocket: WebSocket, kind: str, symbol: str, protocol: str = PROTOCOL_FULL,
+                 encoding: str = ENCODING_JSON):
+        self.websocket = websocket
+        self.kind = kind
+        self.symbol = symbol
+        self.protocol = protocol
+        self.encoding = encoding
+        self.last_seq: Optional[int] = None
+        # 허브 전송 태스크와 재동기화 요청이 같은 연결에 동시에 쓰지 않도록 직렬화
+        self._lock = asyncio.Lock()
+
+    async def send_snapshot(self):
+        """seq가 붙은 전체 히스토리 전송"""
+        async with self._lock:
+            await self._send_snapshot()
+
+    async def _send_snapshot(self):
+        message = build_symbol_update(self.kind, self.symbol)
+        # full 방식은 아직 못 보낸 이전 히스토리를 최신 히스토리로 대체
+        key = f"{self.kind}:{self.symbol}" if self.protocol == PROTOCOL_FULL else None
+        await self._send(encode_message(message, self.encoding), key)
+        self.last_seq = message.get("seq", 0)
+
+    async def send_update(self, tick: Dict[str, Any]):
+        """새 틱 알림 처리 - full은 전체 히스토리, delta는 변경분 (이어 붙일 수 없으면 스냅샷)"""
+        async with self._lock:
+            if self.protocol == PROTOCOL_FULL or self.last_seq is None:
+                await self._send_snapshot()
+                return
+
+            message = build_symbol_delta(self.kind, self.symbol, self.last_seq)
+            if message is None:
+                await self._send_snapshot()
+            elif message:
+                await self._send(encode_message(message, self.encoding))
+                self.last_seq = message["seq"]
+
+    async def _send(self, encoded, key: Optional[str] = None):
+        # 전송 대기열이 이미 닫힌 연결이면 예외로 알려 허브 전송 태스크가 멈추고 연결을 닫게 함
+        if not await manager.send_encoded(encoded, self.websocket, key):
+            raise ConnectionError("전송 대기열이 닫힌 연결입니다")
+
+    async def on_message(self, message: str):
+        """클라이언트 메시지 처리 - resync 요청이면 스냅샷 재전송"""
+        if is_resync_request(message):
+            logger.info(f" 재동기화 요청: {self.kind}:{self.symbol} (seq {self.last_seq})")
+            await self.send_snapshot()
+
+def diff_market_item(before: Optional[Dict[str, Any]], item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    market_update 항목 하나의 변경분 - 바뀐 값 필드와 새 히스토리 가격(points)만 담음
+
+    이전 항목이 없거나 히스토리를 이어 붙일 수 없으면 {"symbol", "replace": 전체 항목}, 변경이 없으면 None
+    """
+    symbol = item["symbol"]
+    if before is None:
+        return {"symbol": symbol, "replace": item}
+
+    change: Dict[str, Any] = {
+        field: item.get(field) for field in MARKET_FIELDS
+        if item.get(field) != before.get(field)
+    }
+
+    if "seq" in item and "seq" in before:
+        # 틱 저장소 기반 항목은 심볼 seq 차이만큼이 새 포인트
+        added = item["seq"] - before["seq"]
+        if added < 0 or added > len(item["history"]):
+            return {"symbol": symbol, "replace": item}
+        if added:
+            change["points"] = [point["price"] for point in item["history"][-added:]]
+            # 현재가가 마지막 포인트와 같으면 생략 (클라이언트가 points에서 채움)
+            if change.get("price") == change["points"][-1]:
+                del change["price"]
+    elif item["history"] != before["history"]:
+        return {"symbol": symbol, "replace": item}
+
+    if not change:
+        return None
+    change["symbol"] = symbol
+    return change
+
+def diff_market_payload(before: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    두 market_update 페이로드의 변경분 (market_delta의 data)
+
+    클라이언트는 항목마다 값 필드를 덮어쓰고 points를 히스토리 뒤에 붙인 뒤
+    최근 HISTORY_POINTS개만 남기고 (price가 없으면 마지막 포인트가 현재가),
+    replace는 항목 전체를 교체, removed는 목록에서 제거
+    """
+    data: Dict[str, Any] = {}
+    removed: Dict[str, List[str]] = {}
+    for group in ("stocks", "cryptos"):
+        previous = {item["symbol"]: item for item in before["data"][group]}
+        changes = []
+        for item in payload["data"][group]:
+            change = diff_market_item(previous.pop(item["symbol"], None), item)
+            if change:
+                changes.append(change)
+        data[group] = changes
+        if previous:
+            removed[group] = list(previous)
+
+    if removed:
+        data["removed"] = removed
+    return data
+
+def build_market_delta(before: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """이전 스냅샷(base_seq)에서 새 스냅샷(seq)으로 가는 market_delta 메시지"""
+    return {
+        "type": "market_delta",
+        "seq": payload["seq"],
+        "base_seq": before["seq"],
+        "data": diff_market_payload(before, payload),
+        "timestamp": payload["timestamp"],
+        "data_source": payload.get("data_source")
+    }
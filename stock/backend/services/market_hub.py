@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from stock.backend.services.broker import broker, MARKET_CHANNEL
+from stock.backend.services.tick_store import tick_store, STOCK
+
+logger = logging.getLogger(__name__)
+
+# 연결별 대기열 크기 - 가득 차면 가장 오래된 틱을 버림
+DEFAULT_QUEUE_SIZE = 16
+
+def stock_topic(symbol: str) -> str:
+    """주식 심볼 토픽 이름"""
+    return f"stock:{symbol}"
+
+def crypto_topic(symbol: str) -> str:
+    """암호화폐 심볼 토픽 이름"""
+    return f"crypto:{symbol.upper()}"
+
+class Subscription:
+    """토픽 하나에 대한 연결별 구독 (크기 제한 대기열)"""
+
+    __slots__ = ("topic", "queue", "loop", "dropped")
+
+    def __init__(self, topic: str, maxsize: int, loop: asyncio.AbstractEventLoop):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = loop
+        self.dropped = 0
+
+    def deliver(self, message: Dict[str, Any]):
+        """이벤트 루프 스레드에서 메시지 적재 - 느린 구독자는 오래된 틱부터 버림"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Dict[str, Any]:
+        """다음 틱이 올 때까지 대기"""
+        return await self.queue.get()
+
+class MarketHub:
+    """심볼 토픽 기반 발행/구독 허브 - 수집기가 새 틱을 한 번 발행하면 구독자에게만 전달"""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published_count = 0
+
+    def subscribe(self, topic: str, maxsize: Optional[int] = None) -> Subscription:
+        """토픽 구독 - 이벤트 루프 안에서 호출"""
+        subscription = Subscription(topic, maxsize or self.queue_size, asyncio.get_running_loop())
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        logger.debug(f" 토픽 구독: {topic}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """구독 해제 - 마지막 구독자가 나가면 토픽도 제거"""
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+        logger.debug(f" 토픽 구독 해제: {subscription.topic}")
+
+    def publish(self, topic: str, message: Dict[str, Any]) -> int:
+        """
+        새 틱 발행 - 수집기 스레드와 이벤트 루프 어디서든 호출 가능
+
+        :return: 메시지를 전달한 구독자 수
+        """
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+            self.published_count += 1
+
+        if not subscribers:
+            return 0
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                if subscription.loop is current_loop:
+                    subscription.deliver(message)
+                else:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+                delivered += 1
+            except RuntimeError:
+                # 이벤트 루프가 이미 종료된 구독자
+                self.unsubscribe(subscription)
+        return delivered
+
+    async def stream(self, websocket: WebSocket, topic: str, send: Callable[[Dict[str, Any]], Awaitable[None]],
+                     on_message: Optional[Callable[[str], Awaitable[None]]] = None):
+        """
+        토픽의 새 틱마다 send 호출 - 클라이언트 연결이 끊기거나 전송이 실패할 때까지 반환하지 않음
+
+        새 틱이 없으면 아무것도 전송하지 않으며, 연결 해제 시 WebSocketDisconnect가 그대로 전파됨.
+        전송이 실패하면 수신 대기를 멈추고 연결을 닫아 갱신 없이 연결만 남지 않게 함
+        :param on_message: 클라이언트가 보낸 텍스트 메시지 처리 (재동기화 요청 등)
+        """
+        subscription = self.subscribe(topic)
+
+        async def pump():
+            while True:
+                message = await subscription.get()
+                try:
+                    await send(message)
+                except Exception as e:
+                    logger.error(f" 토픽 전송 오류: {topic}, 오류: {e}")
+                    return
+
+        async def receive():
+            # on_message가 없으면 클라이언트 메시지는 연결 해제 감지용으로만 수신
+            while True:
+                message = await websocket.receive_text()
+                if on_message is not None:
+                    await on_message(message)
+
+        pump_task = asyncio.create_task(pump())
+        receive_task = asyncio.create_task(receive())
+        try:
+            # 먼저 끝난 쪽(전송 실패 또는 연결 해제)에 맞춰 나머지 태스크도 정리
+            await asyncio.wait((pump_task, receive_task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            pump_task.cancel()
+            receive_task.cancel()
+            await asyncio.gather(pump_task, receive_task, return_exceptions=True)
+            self.unsubscribe(subscription)
+
+        if receive_task.done() and not receive_task.cancelled():
+            # 연결 해제(WebSocketDisconnect)나 on_message 오류를 호출한 쪽으로 전파
+            receive_task.result()
+
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
+    def get_status(self) -> Dict[str, Any]:
+        """허브 상태 반환"""
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscribers": sum(len(subscribers) for subscribers in self._topics.values()),
+                "published_count": self.published_count,
+                "queue_size": self.queue_size
+            }
+
+# 전역 허브 인스턴스
+market_hub = MarketHub()
+
+def publish_tick(kind: str, symbol: str, price: float, timestamp_ms: Optional[int] = None, **fields):
+    """
+    수집한 틱을 브로커로 발행 - 모든 워커가 apply_tick으로 자기 틱 저장소와 허브에 반영
+
+    타임스탬프는 발행 시점에 정해 워커마다 같은 값을 저장하도록 함
+    """
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    broker.publish(MARKET_CHANNEL, {"kind": kind, "symbol": symbol, "price": float(price),
+                                    "timestamp": int(timestamp_ms), **fields})
+
+def apply_tick(message: Dict[str, Any]):
+    """브로커로 받은 틱을 이 워커의 틱 저장소에 추가하고 구독자에게 한 번 발행"""
+    fields = dict(message)
+    kind, symbol = fields.pop("kind"), fields.pop("symbol")
+    tick = tick_store.append(kind, symbol, fields.pop("price"), fields.pop("timestamp"), **fields)
+    market_hub.publish(stock_topic(symbol) if kind == STOCK else crypto_topic(symbol), tick)
+
+broker.subscribe(MARKET_CHANNEL, apply_tick)
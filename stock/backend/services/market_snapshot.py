@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from stock.backend.data_service import DataService
+from stock.backend.database import SessionLocal, run_db
+from stock.backend.services.symbol_registry import MOST_ACTIVE_STOCKS, TOP_10_CRYPTOS
+from stock.backend.services.tick_store import tick_store, to_epoch_ms, from_epoch_ms, STOCK, CRYPTO
+from stock.backend.services.wire_format import encode_message, ENCODING_JSON
+
+logger = logging.getLogger(__name__)
+
+# /ws/main 브로드캐스트 주기 (초)
+SNAPSHOT_INTERVAL = 10.0
+# 차트용 히스토리 포인트 수
+HISTORY_POINTS = 30
+
+def build_symbol_update(kind: str, symbol: str) -> Dict[str, Any]:
+    """틱 저장소에서 개별 심볼 업데이트 메시지 구성 (DB 조회 없음)"""
+    message_type = "stock_update" if kind == STOCK else "crypto_update"
+    prices, timestamps, seq = tick_store.get_snapshot(kind, symbol, HISTORY_POINTS)
+
+    if len(prices) == 0:
+        # 저장소에 데이터가 없는 경우 빈 응답
+        return {
+            "type": message_type,
+            "seq": seq,
+            "data": {
+                "symbol": symbol,
+                "history": [],
+                "current_price": 0,
+                "last_update": None,
+                "data_source": "memory",
+                "message": "DB에 데이터가 없습니다"
+            }
+        }
+
+    history = []
+    for price, timestamp in zip(prices.tolist(), timestamps.tolist()):
+        history.append({
+            "time": from_epoch_ms(timestamp).strftime("%H:%M:%S"),
+            "price": price,
+            "timestamp": timestamp
+        })
+
+    return {
+        "type": message_type,
+        "seq": seq,
+        "data": {
+            "symbol": symbol,
+            "history": history,
+            "current_price": history[-1]["price"],
+            "last_update": from_epoch_ms(history[-1]["timestamp"]).isoformat(),
+            "data_source": "memory"
+        }
+    }
+
+class MarketSnapshotService:
+    """
+    /ws/main 시장 스냅샷 서비스 - 틱마다 한 번만 조회/직렬화해서 모든 클라이언트가 공유
+
+    스냅샷마다 seq(build_count)를 붙이고, 직전 스냅샷과의 변경분(market_delta)도 같이 한 번만 직렬화함.
+    json 외 인코딩은 그 인코딩을 쓰는 클라이언트가 있을 때 스냅샷마다 한 번만 만들어 재사용
+    """
+
+    def __init__(self, max_age: float = SNAPSHOT_INTERVAL):
+        self.max_age = max_age
+        self._payload: Optional[Dict[str, Any]] = None
+        self._encoded: Optional[str] = None
+        # 직전 스냅샷(build_count - 1)에서 현재 스냅샷으로 가는 변경분
+        self._delta: Optional[Dict[str, Any]] = None
+        self._delta_encoded: Optional[str] = None
+        # (인코딩, 변경분 여부)별 직렬화 결과 - 스냅샷을 새로 만들 때 비움
+        self._variants: Dict[Tuple[str, bool], Union[str, bytes]] = {}
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self.build_count = 0
+
+    def build_market_data(self, db: Session) -> Dict[str, Any]:
+        """DB에서 최근 30개 데이터를 조회해서 market_update 페이로드 구성"""
+
+        # 심볼 목록 전체를 주식/암호화폐 각각 한 번의 쿼리로 조회
+        data_service = DataService(db)
+        stock_history = data_service.get_recent_stock_quotes(MOST_ACTIVE_STOCKS, HISTORY_POINTS)
+        crypto_history = data_service.get_recent_crypto_quotes(TOP_10_CRYPTOS, HISTORY_POINTS)
+        # 암호화폐 변동폭은 최신 시세 테이블의 당일 시가 대비 값 사용
+        crypto_latest = {quote.symbol: quote for quote in data_service.get_latest_table(CRYPTO)}
+
+        stocks_data = []
+        for symbol in MOST_ACTIVE_STOCKS:
+            recent_quotes = stock_history.get(symbol)
+            if not recent_quotes:
+                continue
+
+            try:
+                latest = recent_quotes[-1]
+                stocks_data.append({
+                    "symbol": symbol,
+                    "price": float(latest.c),
+                    "change": float(latest.d) if latest.d else 0,
+                    "changePercent": float(latest.dp) if latest.dp else 0,
+                    "history": [
+                        {"time": i + 1, "price": float(quote.c)}
+                        for i, quote in enumerate(recent_quotes)
+                    ],
+                    "timestamp": to_epoch_ms(latest.created_at),
+                    "data_source": "database"
+                })
+            except Exception as e:
+                logger.error(f" 주식 {symbol} 처리 오류: {e}")
+                continue
+
+        cryptos_data = []
+        for symbol in TOP_10_CRYPTOS:
+            recent_crypto_quotes = crypto_history.get(symbol)
+            if not recent_crypto_quotes:
+                continue
+
+            try:
+                latest = recent_crypto_quotes[-1]
+                day_quote = crypto_latest.get(symbol)
+                cryptos_data.append({
+                    "symbol": symbol,
+                    "price": latest.price_value,
+                    "change": (day_quote.change or 0) if day_quote else 0,
+                    "changePercent": (day_quote.change_percent or 0) if day_quote else 0,
+                    "history": [
+                        {"time": i + 1, "price": quote.price_value}
+                        for i, quote in enumerate(recent_crypto_quotes)
+                    ],
+                    "timestamp": to_epoch_ms(latest.created_at),
+                    "data_source": "database"
+                })
+            except Exception as e:
+                logger.error(f" 암호화폐 {symbol} 처리 오류: {e}")
+                continue
+
+        return {
+            "type": "market_update",
+            "data": {
+                "stocks": stocks_data,
+                "cryptos": cryptos_data
+            },
+            "timestamp": int(time.time() * 1000),
+            "data_source": "database",
+            "message": f"DB에서 {len(stocks_data)}개 주식, {len(cryptos_data)}개 암호화폐 데이터 전송"
+        }
+
+    def build_market_data_from_store(self) -> Dict[str, Any]:
+        """메모리 틱 저장소에서 market_update 페이로드 구성 (DB 조회 없음)"""
+
+        def build_items(kind: str, symbols: List[str]) -> List[Dict[str, Any]]:
+            items = []
+            for symbol in symbols:
+                latest = tick_store.get_latest(kind, symbol)
+                if not latest:
+                    continue
+
+                prices, _, seq = tick_store.get_snapshot(kind, symbol, HISTORY_POINTS)
+                items.append({
+                    "symbol": symbol,
+                    "price": latest["price"],
+                    "change": float(latest.get("change") or 0),
+                    "changePercent": float(latest.get("change_percent") or 0),
+                    "history": [
+                        {"time": i + 1, "price": price}
+                        for i, price in enumerate(prices.tolist())
+                    ],
+                    "timestamp": latest["timestamp"],
+                    "data_source": "memory",
+                    # 심볼별 틱 순번 - market_delta에서 새 포인트 수 계산에 사용
+                    "seq": seq
+                })
+            return items
+
+        stocks_data = build_items(STOCK, MOST_ACTIVE_STOCKS)
+        cryptos_data = build_items(CRYPTO, TOP_10_CRYPTOS)
+
+        return {
+            "type": "market_update",
+            "data": {
+                "stocks": stocks_data,
+                "cryptos": cryptos_data
+            },
+            "timestamp": int(time.time() * 1000),
+            "data_source": "memory",
+            "message": f"메모리에서 {len(stocks_data)}개 주식, {len(cryptos_data)}개 암호화폐 데이터 전송"
+        }
+
+    def build_cached_market_data(self) -> Dict[str, Any]:
+        """캐시 데이터로 market_update 페이로드 구성 (DB 조회 실패 시 fallback)"""
+        from stock.backend.services.stock_service import get_cached_stock_data, get_cached_crypto_data
+
+        def flat_history(current_price: float) -> List[Dict[str, Any]]:
+            # 히스토리가 없으므로 현재 가격 주변으로 30개 포인트 생성
+            return [
+                {"time": i + 1, "price": current_price + current_price * 0.001 * (i - 15)}
+                for i in range(HISTORY_POINTS)
+            ]
+
+        now_ms = int(time.time() * 1000)
+
+        stocks_data = []
+        for symbol in MOST_ACTIVE_STOCKS:
+            stock_data = get_cached_stock_data(symbol)
+            if stock_data:
+                current_price = stock_data.get('c', 0)
+                stocks_data.append({
+                    "symbol": symbol,
+                    "price": current_price,
+                    "change": stock_data.get('d', 0),
+                    "changePercent": stock_data.get('dp', 0),
+                    "history": flat_history(current_price),
+                    "timestamp": now_ms,
+                    "data_source": "cache"
+                })
+
+        cryptos_data = []
+        for symbol in TOP_10_CRYPTOS:
+            crypto_data = get_cached_crypto_data(symbol)
+            if crypto_data:
+                current_price = float(crypto_data.get('p', 0))
+                cryptos_data.append({
+                    "symbol": symbol,
+                    "price": current_price,
+                    "change": 0,
+                    "changePercent": 0,
+                    "history": flat_history(current_price),
+                    "timestamp": now_ms,
+                    "data_source": "cache"
+                })
+
+        return {
+            "type": "market_update",
+            "data": {
+                "stocks": stocks_data,
+                "cryptos": cryptos_data
+            },
+            "timestamp": now_ms,
+            "data_source": "cache",
+            "message": f"캐시에서 {len(stocks_data)}개 주식, {len(cryptos_data)}개 암호화폐 데이터 전송"
+        }
+
+    def _build(self) -> Dict[str, Any]:
+        """스냅샷 1회 계산 (틱 저장소 우선, 적재 전이면 DB, 실패 시 캐시)"""
+        if tick_store.warmed:
+            return self.build_market_data_from_store()
+
+        try:
+            db = SessionLocal()
+            try:
+                return self.build_market_data(db)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f" 스냅샷 DB 조회 오류, 캐시 데이터 사용: {e}")
+            return self.build_cached_market_data()
+
+    async def _ensure_fresh(self, force: bool = False):
+        """max_age가 지났거나 강제 요청이면 스냅샷을 한 번 재계산"""
+        async with self._lock:
+            age = time.time() - self._built_at
+            if force or self._encoded is None or age >= self.max_age:
+                from stock.backend.services.market_delta import build_market_delta
+
+                start_time = time.time()
+                previous = self._payload
+                if tick_store.warmed:
+                    payload = self._build()
+                else:
+                    # 틱 저장소 적재 전에는 DB 조회가 필요하므로 이벤트 루프 밖에서 실행
+                    payload = await run_db(self._build)
+                self.build_count += 1
+                payload["seq"] = self.build_count
+                self._payload = payload
+                self._encoded = encode_message(payload)
+                self._delta = build_market_delta(previous, payload) if previous else None
+                self._delta_encoded = encode_message(self._delta) if self._delta else None
+                self._variants = {}
+                self._built_at = time.time()
+
+                stats = self._payload["data"]
+                logger.info(
+                    f" 시장 스냅샷 생성 #{self.build_count}: 주식 {len(stats['stocks'])}개, "
+                    f"암호화폐 {len(stats['cryptos'])}개 ({(self._built_at - start_time) * 1000:.0f}ms)"
+                )
+
+    async def get_encoded(self, force: bool = False) -> str:
+        """직렬화된 스냅샷 반환 - max_age 이내면 재계산 없이 공유 버퍼 재사용"""
+        await self._ensure_fresh(force)
+        return self._encoded
+
+    async def get_snapshot(self, force: bool = False, encoding: str = ENCODING_JSON) -> Tuple[int, Union[str, bytes]]:
+        """(seq, 직렬화된 스냅샷) 반환 - 클라이언트가 받은 seq를 기록할 때 사용"""
+        await self._ensure_fresh(force)
+        return self.build_count, self.encode_as(encoding)
+
+    def get_delta_encoded(self, base_seq: Optional[int], encoding: str = ENCODING_JSON) -> Optional[Union[str, bytes]]:
+        """base_seq가 직전 스냅샷이면 현재 스냅샷까지의 직렬화된 변경분, 아니면 None (스냅샷 필요)"""
+        if self._delta is None or base_seq != self.build_count - 1:
+            return None
+        return self.encode_as(encoding, delta=True)
+
+    def encode_as(self, encoding: str, delta: bool = False) -> Union[str, bytes]:
+        """현재 스냅샷(또는 변경분)을 encoding으로 직렬화 - 스냅샷마다 인코딩별로 한 번만 계산"""
+        if encoding == ENCODING_JSON:
+            return self._delta_encoded if delta else self._encoded
+
+        key = (encoding, delta)
+        encoded = self._variants.get(key)
+        if encoded is None:
+            encoded = self._variants[key] = encode_message(self._delta if delta else self._payload, encoding)
+        return encoded
+
+    async def get_payload(self, force: bool = False) -> Dict[str, Any]:
+        """스냅샷 페이로드(dict) 반환 - 직접 직렬화하는 매니저용"""
+        await self._ensure_fresh(force)
+        return self._payload
+
+    async def refresh(self) -> str:
+        """다음 틱용 스냅샷 강제 재계산"""
+        return await self.get_encoded(force=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        """스냅샷 상태 반환"""
+        return {
+            "build_count": self.build_count,
+            "age_seconds": round(time.time() - self._built_at, 1) if self._built_at else None,
+            "max_age": self.max_age,
+            "encoded_size": len(self._encoded) if self._encoded else 0,
+            "delta_size": len(self._delta_encoded) if self._delta_encoded else 0,
+            "encoded_sizes": {
+                f"{encoding}{'_delta' if delta else ''}": len(encoded)
+                for (encoding, delta), encoded in self._variants.items()
+            }
+        }
+
+# 전역 스냅샷 서비스 인스턴스
+market_snapshot = MarketSnapshotService()
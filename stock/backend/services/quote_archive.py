@@ -0,0 +1,238 @@
+import os
+import itertools
+import logging
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from stock.backend.core.config import db_settings
+from stock.backend.database import engine
+from stock.backend.models import StockQuote, CryptoQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+# 보관 파일에 저장하는 컬럼 (symbol/created_at 제외) - 실수 컬럼의 NULL은 NaN으로 저장
+FLOAT_COLUMNS = {
+    STOCK: ["c", "d", "dp", "h", "l", "o", "pc"],
+    CRYPTO: ["price", "volume"]
+}
+# 일 단위 보관 시 DB에서 나눠 읽는 행 수
+ARCHIVE_CHUNK = 5000
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+class QuoteArchive:
+    """
+    콜드 티어 시세 보관소
+
+    보관 기간이 지난 시세를 {root}/{종류}/{심볼}/{YYYY-MM-DD}.npz (압축 NumPy 컬럼 배열)로
+    옮겨 두고, 이력 조회 기간이 DB 보관 기간보다 길면 보관 파일을 함께 읽음
+    """
+
+    def __init__(self, root: Optional[str] = None, enabled: Optional[bool] = None):
+        self.root = Path(root or db_settings.archive_dir)
+        self.enabled = db_settings.archive_enabled if enabled is None else enabled
+        self.archived_rows = 0
+        self.archived_files = 0
+
+    def _models(self, kind: str):
+        return StockQuote if kind == STOCK else CryptoQuote
+
+    def _path(self, kind: str, symbol: str, day: date) -> Path:
+        return self.root / kind / symbol / f"{day:%Y-%m-%d}.npz"
+
+    def archive_before(self, kind: str, cutoff: date) -> Dict[str, int]:
+        """cutoff 날짜 이전의 DB 시세를 일 단위로 보관 파일에 기록 (DB 행은 지우지 않음)"""
+        model = self._models(kind)
+        with engine.connect() as conn:
+            oldest = conn.execute(
+                select(func.min(model.created_at)).where(model.created_at < day_start(cutoff))
+            ).scalar()
+        if oldest is None:
+            return {"days": 0, "rows": 0, "files": 0}
+
+        days = rows = files = 0
+        day = oldest.date()
+        while day < cutoff:
+            day_rows, day_files = self.archive_day(kind, day)
+            days += 1
+            rows += day_rows
+            files += day_files
+            day += timedelta(days=1)
+
+        logger.info(f" {kind} 시세 보관 완료: {days}일, {rows}행, 파일 {files}개 ({self.root})")
+        return {"days": days, "rows": rows, "files": files}
+
+    def archive_day(self, kind: str, day: date):
+        """하루치 시세를 심볼별 파일로 기록 - (행 수, 파일 수) 반환"""
+        model = self._models(kind)
+        if kind == STOCK:
+            columns = [getattr(model, column) for column in FLOAT_COLUMNS[STOCK]]
+            extra = []
+        else:
+            columns = [model.price_value.label("price"), model.volume_value.label("volume")]
+            extra = [model.s, model.t]
+
+        query = select(model.symbol, model.created_at, model.id, *columns, *extra)\
+            .where(model.created_at >= day_start(day), model.created_at < day_start(day + timedelta(days=1)))\
+            .order_by(model.symbol, model.created_at, model.id)
+
+        rows = files = 0
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=ARCHIVE_CHUNK).execute(query)
+            for symbol, group in itertools.groupby(result, key=lambda row: row[0]):
+                group = list(group)
+                self._write(self._path(kind, symbol, day), self._to_arrays(kind, group))
+                rows += len(group)
+                files += 1
+
+        self.archived_rows += rows
+        self.archived_files += files
+        return rows, files
+
+    def _to_arrays(self, kind: str, rows: List[Any]) -> Dict[str, np.ndarray]:
+        """DB 행 목록을 컬럼 배열로 변환"""
+        float_columns = FLOAT_COLUMNS[kind]
+        arrays = {
+            "created_at": np.array([row[1] for row in rows], dtype="datetime64[us]"),
+            "id": np.array([row[2] for row in rows], dtype=np.int64)
+        }
+        for offset, column in enumerate(float_columns, start=3):
+            arrays[column] = np.array([row[offset] for row in rows], dtype=np.float64)
+        if kind == CRYPTO:
+            base = 3 + len(float_columns)
+            arrays["s"] = np.array([row[base] for row in rows], dtype=str)
+            arrays["t"] = np.array([row[base + 1] for row in rows], dtype=np.int64)
+        return arrays
+
+    def _write(self, path: Path, arrays: Dict[str, np.ndarray]):
+        """기존 파일과 합쳐(id 기준 중복 제거) 임시 파일에 쓴 뒤 교체"""
+        if path.exists():
+            with np.load(path) as existing:
+                arrays = {name: np.concatenate((existing[name], values)) for name, values in arrays.items()}
+            _, unique = np.unique(arrays["id"], return_index=True)
+            order = unique[np.lexsort((arrays["id"][unique], arrays["created_at"][unique]))]
+            arrays = {name: values[order] for name, values in arrays.items()}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def _read_day(self, kind: str, symbol: str, day: date, since: datetime, until: datetime) -> list:
+        """하루치 보관 파일에서 [since, until) 시세를 모델 객체로 읽음 (오래된 순)"""
+        path = self._path(kind, symbol, day)
+        if not path.exists():
+            return []
+
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        created_at = arrays["created_at"]
+        mask = (created_at >= np.datetime64(since, "us")) & (created_at < np.datetime64(until, "us"))
+        if not mask.any():
+            return []
+
+        model = self._models(kind)
+        quotes = []
+        columns = {name: values[mask].tolist() for name, values in arrays.items()}
+        for i in range(int(mask.sum())):
+            fields = {
+                name: (None if isinstance(values[i], float) and values[i] != values[i] else values[i])
+                for name, values in columns.items()
+            }
+            if kind == CRYPTO:
+                fields["p"] = str(fields["price"])
+                fields["v"] = str(fields["volume"] or 0)
+            quotes.append(model(symbol=symbol, **fields))
+        return quotes
+
+    def read(self, kind: str, symbol: str, since: datetime, until: datetime) -> list:
+        """보관 파일에서 [since, until) 시세를 모델 객체로 읽음 (최신순)"""
+        quotes = []
+        day = since.date()
+        while day <= until.date():
+            quotes.extend(self._read_day(kind, symbol, day, since, until))
+            day += timedelta(days=1)
+
+        quotes.reverse()
+        return quotes
+
+    def covers(self, since: datetime) -> bool:
+        """since부터의 이력에 보관 파일을 함께 읽어야 하는지 (DB 보관 기간보다 긴 조회)"""
+        hot_since = day_start((datetime.utcnow() - timedelta(days=db_settings.retention_days)).date())
+        return self.enabled and since < hot_since
+
+    def _db_floor(self, kind: str, symbol: str) -> Optional[Tuple[datetime, int]]:
+        """DB에 남아 있는 심볼의 가장 오래된 (created_at, id)"""
+        model = self._models(kind)
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(model.created_at, model.id)
+                .where(model.symbol == symbol)
+                .order_by(model.created_at, model.id)
+                .limit(1)
+            ).first()
+        return (row[0], row[1]) if row else None
+
+    def iter_history_before(self, kind: str, symbol: str, since: datetime,
+                            cursor: Optional[Tuple[datetime, int]] = None) -> Iterator[Any]:
+        """
+        DB 이력이 끝난 뒤 이어질 보관 시세를 최신순으로 생성 - 페이지 조회/내보내기용
+
+        보관 후 아직 삭제되지 않은 DB 행과 겹치지 않도록 DB의 가장 오래된 (created_at, id)보다 이전 행만 내보내고,
+        cursor를 주면 그보다 이전 행부터 시작함. 파일은 하루씩 읽으므로 메모리 사용량은 하루치로 제한됨
+        """
+        if not self.covers(since):
+            return
+
+        bound = self._db_floor(kind, symbol)
+        if cursor is not None and (bound is None or tuple(cursor) < bound):
+            bound = tuple(cursor)
+        until = bound[0] + timedelta(microseconds=1) if bound else datetime.utcnow()
+
+        day = until.date()
+        while day >= since.date():
+            quotes = self._read_day(kind, symbol, day, since, until)
+            day -= timedelta(days=1)
+            for quote in reversed(quotes):
+                if bound is None or (quote.created_at, quote.id) < bound:
+                    yield quote
+
+    def merge_history(self, kind: str, symbol: str, since: datetime, quotes: list) -> list:
+        """
+        DB 이력(최신순)에 DB 보관 기간 밖의 보관 파일 시세를 이어 붙임
+
+        보관 후 아직 삭제되지 않은 행은 DB 쪽을 남김
+        """
+        if not self.covers(since):
+            return quotes
+
+        # 보관 기간을 줄여 수동 실행한 경우에도 빠지지 않도록 현재까지의 파일을 모두 확인
+        db_ids = {quote.id for quote in quotes}
+        archived = [
+            quote for quote in self.read(kind, symbol, since, datetime.utcnow())
+            if quote.id not in db_ids
+        ]
+        if not archived:
+            return quotes
+        merged = quotes + archived
+        merged.sort(key=lambda quote: (quote.created_at, quote.id), reverse=True)
+        return merged
+
+    def get_status(self) -> Dict[str, Any]:
+        """보관소 상태 반환"""
+        return {
+            "enabled": self.enabled,
+            "root": str(self.root),
+            "archived_rows": self.archived_rows,
+            "archived_files": self.archived_files
+        }
+
+# 전역 시세 보관소 인스턴스
+quote_archive = QuoteArchive()
@@ -1,45 +1,85 @@
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import Session
-from stock.backend.database import SessionLocal
+from stock.backend.database import SessionLocal, engine, write_buffer
 from stock.backend.models import StockQuote
+from stock.backend.services.tick_store import to_epoch_ms, STOCK
+from stock.backend.services.market_hub import publish_tick
+from stock.backend.services.bar_rollup import bar_rollup
+from stock.backend.services.latest_quotes import latest_quotes
+from stock.backend.services.quote_archive import quote_archive
+from stock.backend.services.quote_statistics import quote_statistics, DEFAULT_WINDOW
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 이력 스트리밍 시 내보내는 컬럼
+STOCK_HISTORY_COLUMNS = ["created_at", "c", "d", "dp", "h", "l", "o", "pc"]
+
 class StockQuoteService:
     """주식 시세 데이터베이스 서비스 클래스"""
     
     def __init__(self):
         pass
     
+    def build_stock_row(self, quote_data: Dict[str, Any]) -> Dict[str, Any]:
+        """시세 딕셔너리로 stock_quotes 저장용 행 생성 (저장 시각 포함)"""
+        now = datetime.utcnow()
+        return {
+            "symbol": quote_data.get('symbol', ''),
+            "c": float(quote_data.get('c', 0)),
+            "d": float(quote_data.get('d') or 0),
+            "dp": float(quote_data.get('dp') or 0),
+            "h": float(quote_data.get('h', 0)),
+            "l": float(quote_data.get('l', 0)),
+            "o": float(quote_data.get('o', 0)),
+            "pc": float(quote_data.get('pc', 0)),
+            "created_at": now,
+            "updated_at": now
+        }
+    
+    def publish_stock_tick(self, row: Dict[str, Any]):
+        """실시간 차트용 틱 발행 - 워커마다 메모리 틱 저장소에 반영 후 구독자에게 한 번 발행"""
+        publish_tick(
+            STOCK,
+            row["symbol"],
+            row["c"],
+            to_epoch_ms(row["created_at"]),
+            change=row["d"] or 0,
+            change_percent=row["dp"] or 0
+        )
+    
     def save_stock_quote(self, quote_data: Dict[str, Any]) -> bool:
-        """주식 시세 데이터를 데이터베이스에 저장"""
+        """
+        주식 시세 데이터를 쓰기 버퍼를 거쳐 데이터베이스에 저장
+        
+        틱은 바로 발행하고, DB에는 버퍼가 다른 행과 모아서 다중 행 INSERT로 저장함
+        """
         try:
-            with SessionLocal() as db:
-                # StockQuote 객체 생성
-                stock_quote = StockQuote(
-                    symbol=quote_data.get('symbol', ''),
-                    c=float(quote_data.get('c', 0)),
-                    d=float(quote_data.get('d', 0)),
-                    dp=float(quote_data.get('dp', 0)),
-                    h=float(quote_data.get('h', 0)),
-                    l=float(quote_data.get('l', 0)),
-                    o=float(quote_data.get('o', 0)),
-                    pc=float(quote_data.get('pc', 0))
-                )
-                
-                db.add(stock_quote)
-                db.commit()
-                db.refresh(stock_quote)
-                
-                logger.info(f" 주식 시세 저장 완료: {quote_data.get('symbol')} (ID: {stock_quote.id})")
-                return True
-                
+            row = self.build_stock_row(quote_data)
+            queued = write_buffer.submit(StockQuote, row)
+            self.publish_stock_tick(row)
+            
+            logger.debug(f" 주식 시세 저장 대기열 추가: {row['symbol']}")
+            return queued
+            
         except Exception as e:
             logger.error(f" 주식 시세 저장 실패: {quote_data.get('symbol')}, 오류: {e}")
             return False
     
+    def save_stock_quotes(self, quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        여러 주식 시세를 쓰기 버퍼에 한 번에 추가
+        
+        :return: 버퍼에 추가한 행 목록 (발행은 호출자가 처리)
+        """
+        rows = [self.build_stock_row(quote_data) for quote_data in quotes]
+        if rows and not write_buffer.submit(StockQuote, rows):
+            logger.error(f" 주식 시세 일괄 저장 실패: {len(rows)}개")
+        return rows
+    
     def get_latest_quote(self, symbol: str) -> Optional[StockQuote]:
         """최신 주식 시세 조회"""
         try:
@@ -64,12 +104,80 @@ class StockQuoteService:
                     .filter(StockQuote.created_at >= since)\
                     .order_by(StockQuote.created_at.desc())\
                     .all()
-                return quotes
+                
+                # DB 보관 기간보다 긴 기간이면 보관 파일의 시세를 이어 붙임
+                return quote_archive.merge_history(STOCK, symbol, since, quotes)
                 
         except Exception as e:
             logger.error(f" 시세 이력 조회 실패: {symbol}, 오류: {e}")
             return []
     
+    def get_quote_history_page(self, symbol: str, hours: int = 24, limit: int = 500,
+                               cursor: Optional[Tuple[datetime, int]] = None) -> Tuple[List[StockQuote], Optional[Tuple[datetime, int]]]:
+        """
+        주식 시세 이력 키셋 페이지 조회 (최신순)
+        
+        :param cursor: 이전 페이지의 마지막 (created_at, id) - 없으면 첫 페이지
+        :return: (시세 목록, 다음 페이지 커서 또는 None)
+        """
+        try:
+            with SessionLocal() as db:
+                since = datetime.utcnow() - timedelta(hours=hours)
+                query = db.query(StockQuote)\
+                    .filter(StockQuote.symbol == symbol)\
+                    .filter(StockQuote.created_at >= since)
+                
+                if cursor:
+                    created_at, row_id = cursor
+                    query = query.filter(or_(
+                        StockQuote.created_at < created_at,
+                        and_(StockQuote.created_at == created_at, StockQuote.id < row_id)
+                    ))
+                
+                quotes = query\
+                    .order_by(StockQuote.created_at.desc(), StockQuote.id.desc())\
+                    .limit(limit + 1)\
+                    .all()
+                
+            # DB 이력이 끝나면 DB 보관 기간 밖의 보관 파일 시세로 페이지를 이어서 채움
+            if len(quotes) <= limit:
+                quotes += itertools.islice(
+                    quote_archive.iter_history_before(STOCK, symbol, since, cursor), limit + 1 - len(quotes)
+                )
+            
+            if len(quotes) > limit:
+                last = quotes[limit - 1]
+                return quotes[:limit], (last.created_at, last.id)
+            return quotes, None
+            
+        except Exception as e:
+            logger.error(f" 주식 시세 이력 페이지 조회 실패: {symbol}, 오류: {e}")
+            return [], None
+    
+    def iter_quote_history(self, symbol: str, hours: int = 24, chunk_size: int = 1000) -> Iterator[List[Tuple]]:
+        """
+        주식 시세 이력을 서버 측 커서로 chunk_size 행씩 생성 (최신순, STOCK_HISTORY_COLUMNS 순서)
+        
+        전체 결과를 메모리에 올리지 않으므로 긴 기간 내보내기에도 메모리 사용량이 일정함
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        query = select(*[getattr(StockQuote, column) for column in STOCK_HISTORY_COLUMNS])\
+            .where(StockQuote.symbol == symbol, StockQuote.created_at >= since)\
+            .order_by(StockQuote.created_at.desc(), StockQuote.id.desc())
+        
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            for rows in result.partitions():
+                yield rows
+        
+        # DB 보관 기간보다 긴 기간이면 DB 이력 뒤에 보관 파일 시세를 같은 순서로 이어서 전송
+        archived = quote_archive.iter_history_before(STOCK, symbol, since)
+        while True:
+            rows = [tuple(getattr(quote, column) for column in STOCK_HISTORY_COLUMNS) for quote in itertools.islice(archived, chunk_size)]
+            if not rows:
+                break
+            yield rows
+    
     def get_all_symbols(self) -> List[str]:
         """데이터베이스에 저장된 모든 심볼 조회"""
         try:
@@ -83,61 +191,30 @@ class StockQuoteService:
             logger.error(f" 심볼 목록 조회 실패: {e}")
             return []
     
-    def get_quote_statistics(self, symbol: str) -> Dict[str, Any]:
-        """특정 심볼의 통계 정보 조회"""
+    def get_quote_statistics(self, symbol: str, window: str = DEFAULT_WINDOW) -> Dict[str, Any]:
+        """특정 심볼의 기간 통계 정보 조회 (DB 집계, TTL 캐시)"""
         try:
-            with SessionLocal() as db:
-                quotes = db.query(StockQuote)\
-                    .filter(StockQuote.symbol == symbol)\
-                    .order_by(StockQuote.created_at.desc())\
-                    .limit(100)\
-                    .all()
-                
-                if not quotes:
-                    return {}
-                
-                # 통계 계산
-                prices = [q.c for q in quotes]
-                return {
-                    "symbol": symbol,
-                    "total_records": len(quotes),
-                    "latest_price": quotes[0].c,
-                    "highest_price": max(prices),
-                    "lowest_price": min(prices),
-                    "average_price": sum(prices) / len(prices),
-                    "first_record": quotes[-1].created_at.isoformat(),
-                    "latest_record": quotes[0].created_at.isoformat()
-                }
-                
+            return quote_statistics.get_statistics(STOCK, symbol, window)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f" 통계 조회 실패: {symbol}, 오류: {e}")
             return {}
     
     def cleanup_old_data(self, days: int = 7) -> int:
-        """오래된 데이터 정리"""
+        """오래된 데이터 정리 - 파티션 테이블이면 만료 파티션 삭제, 아니면 청크 단위 DELETE"""
+        from stock.backend.services.retention import retention_service
+        
         try:
-            with SessionLocal() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                
-                # 오래된 데이터 조회
-                old_quotes = db.query(StockQuote)\
-                    .filter(StockQuote.created_at < cutoff_date)\
-                    .all()
-                
-                count = len(old_quotes)
-                
-                # 데이터 삭제
-                db.query(StockQuote)\
-                    .filter(StockQuote.created_at < cutoff_date)\
-                    .delete()
-                
-                db.commit()
-                logger.info(f" {count}개의 오래된 시세 데이터 정리 완료")
-                return count
-                
+            return retention_service.purge(STOCK, days)
         except Exception as e:
             logger.error(f" 데이터 정리 실패: {e}")
             return 0
 
 # 전역 서비스 인스턴스
 quote_service = StockQuoteService()
+
+# 쓰기 버퍼가 시세를 저장할 때마다 같은 행으로 OHLCV 봉 갱신
+write_buffer.add_flush_hook(StockQuote, bar_rollup.apply_stock_rows)
+# 같은 행으로 심볼별 최신 시세 테이블 갱신 (현재가 조회용)
+write_buffer.add_flush_hook(StockQuote, latest_quotes.apply_stock_rows)
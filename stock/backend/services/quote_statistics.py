@@ -0,0 +1,144 @@
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+
+from stock.backend.database import SessionLocal
+from stock.backend.models import StockQuote, CryptoQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+# 통계 기간 - 라벨: 시간
+WINDOWS = {
+    "1h": 1,
+    "24h": 24,
+    "7d": 168
+}
+DEFAULT_WINDOW = "24h"
+
+# 심볼별 통계 캐시 유지 시간 (초)
+STATISTICS_TTL = 30
+# 캐시 항목이 이 수를 넘으면 만료된 항목 정리
+MAX_CACHE_ENTRIES = 2000
+
+def parse_window(window: str) -> int:
+    """통계 기간 라벨을 시간으로 변환"""
+    if window not in WINDOWS:
+        raise ValueError(f"지원하지 않는 통계 기간입니다: {window} ({', '.join(WINDOWS)})")
+    return WINDOWS[window]
+
+class QuoteStatisticsService:
+    """
+    시세 통계 서비스
+
+    기간 내 시세를 DB 집계 쿼리 한 번으로 계산하고 (최저/최고/평균/표준편차/
+    VWAP/기간 변동률), 결과는 (종류, 심볼, 기간)별로 STATISTICS_TTL 동안 캐시함
+    """
+
+    def __init__(self, ttl: float = STATISTICS_TTL):
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get_cached(self, kind: str, symbol: str, window: str = DEFAULT_WINDOW) -> Optional[Dict[str, Any]]:
+        """캐시된 통계 (없거나 만료되면 None) - DB를 거치지 않으므로 이벤트 루프에서 바로 호출 가능"""
+        with self._lock:
+            entry = self._cache.get((kind, symbol, window))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self.hit_count += 1
+        return entry[1]
+
+    def get_statistics(self, kind: str, symbol: str, window: str = DEFAULT_WINDOW) -> Dict[str, Any]:
+        """기간 통계 조회 (캐시 우선) - 데이터가 없으면 빈 딕셔너리"""
+        hours = parse_window(window)
+        cached = self.get_cached(kind, symbol, window)
+        if cached is not None:
+            return cached
+
+        self.miss_count += 1
+        stats = self._compute(kind, symbol, window, hours)
+
+        now = time.monotonic()
+        with self._lock:
+            if len(self._cache) >= MAX_CACHE_ENTRIES:
+                for key in [key for key, (expires, _) in self._cache.items() if expires < now]:
+                    del self._cache[key]
+            self._cache[(kind, symbol, window)] = (now + self.ttl, stats)
+        return stats
+
+    def _compute(self, kind: str, symbol: str, window: str, hours: int) -> Dict[str, Any]:
+        """집계 쿼리 한 번으로 기간 통계 계산 (처음/마지막 가격은 스칼라 서브쿼리)"""
+        model = StockQuote if kind == STOCK else CryptoQuote
+        price = model.c if kind == STOCK else model.price_value
+        since = datetime.utcnow() - timedelta(hours=hours)
+        in_window = and_(model.symbol == symbol, model.created_at >= since)
+
+        def edge_price(*order_by):
+            return select(price).where(in_window).order_by(*order_by).limit(1).scalar_subquery()
+
+        columns = [
+            func.count(),
+            func.min(price),
+            func.max(price),
+            func.avg(price),
+            func.stddev_pop(price),
+            func.min(model.created_at),
+            func.max(model.created_at),
+            edge_price(model.created_at.asc(), model.id.asc()),
+            edge_price(model.created_at.desc(), model.id.desc())
+        ]
+        if kind == CRYPTO:
+            volume = model.volume_value
+            columns += [func.sum(volume), func.sum(price * volume)]
+
+        with SessionLocal() as db:
+            row = db.execute(select(*columns).where(in_window)).one()
+
+        count, lowest, highest, average, stddev, first_record, latest_record, first_price, latest_price = row[:9]
+        if not count:
+            return {}
+
+        first_price = float(first_price)
+        latest_price = float(latest_price)
+        change = latest_price - first_price
+        stats = {
+            "symbol": symbol,
+            "window": window,
+            "total_records": count,
+            "first_price": first_price,
+            "latest_price": latest_price,
+            "highest_price": float(highest),
+            "lowest_price": float(lowest),
+            "average_price": float(average),
+            "stddev": float(stddev or 0),
+            "change": change,
+            "change_percent": change / first_price * 100 if first_price else 0,
+            # 주식 시세에는 거래량이 없어 VWAP를 계산할 수 없음
+            "vwap": None,
+            "first_record": first_record.isoformat(),
+            "latest_record": latest_record.isoformat()
+        }
+        if kind == CRYPTO:
+            total_volume, notional = float(row[9] or 0), float(row[10] or 0)
+            stats["total_volume"] = total_volume
+            stats["vwap"] = notional / total_volume if total_volume else None
+        return stats
+
+    def get_status(self) -> Dict[str, Any]:
+        """캐시 상태 반환"""
+        return {
+            "ttl": self.ttl,
+            "cached": len(self._cache),
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count
+        }
+
+# 전역 시세 통계 서비스 인스턴스
+quote_statistics = QuoteStatisticsService()
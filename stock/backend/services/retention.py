@@ -0,0 +1,254 @@
+import threading
+import time
+import logging
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, text
+
+from stock.backend.core.config import db_settings
+from stock.backend.database import engine
+from stock.backend.models import StockQuote, CryptoQuote
+from stock.backend.services.tick_store import STOCK, CRYPTO
+from stock.backend.services.quote_archive import quote_archive
+
+logger = logging.getLogger(__name__)
+
+# 정리 작업 주기 (초)
+MAINTENANCE_INTERVAL = 3600
+# 미리 만들어 둘 미래 일 파티션 수 (오늘 포함)
+FUTURE_PARTITIONS = 3
+# 파티션이 없는 테이블에서 한 번에 지우는 행 수와 청크 사이 대기 시간 (초)
+DELETE_CHUNK = 5000
+DELETE_PAUSE = 0.1
+# 청크 삭제 진행 로그 간격 (청크 수)
+PROGRESS_LOG_CHUNKS = 20
+
+# 범위 파티션의 마지막 (MAXVALUE) 파티션 이름
+MAX_PARTITION = "pmax"
+
+def to_days(day: date) -> int:
+    """MySQL TO_DAYS()와 같은 값"""
+    return day.toordinal() + 365
+
+def partition_name(day: date) -> str:
+    """일 파티션 이름 (해당 날짜의 행을 보관)"""
+    return f"p{day:%Y%m%d}"
+
+def partition_clause(day: date) -> str:
+    """day 하루치 행을 담는 파티션 정의"""
+    return f"PARTITION {partition_name(day)} VALUES LESS THAN ({to_days(day + timedelta(days=1))})"
+
+class RetentionService:
+    """
+    시세 테이블 보관 기간 관리
+
+    created_at 기준 일 단위 RANGE 파티션 테이블이면 미래 파티션을 미리 만들고
+    보관 기간이 지난 파티션을 DROP PARTITION으로 바로 지움.
+    파티션이 없으면 오래된 행을 DELETE_CHUNK개씩 나눠 지우고 진행 상황을 기록함.
+    보관소가 켜져 있으면 지우기 전에 같은 날짜 범위를 보관 파일로 먼저 옮김
+    """
+
+    def __init__(self, retention_days: Optional[int] = None, interval: float = MAINTENANCE_INTERVAL,
+                 chunk_size: int = DELETE_CHUNK, pause: float = DELETE_PAUSE):
+        self.retention_days = retention_days or db_settings.retention_days
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        # 테이블별 마지막 실행 결과 / 진행 중인 청크 삭제 행 수
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+        self.progress: Dict[str, int] = {}
+        self.last_run_at: Optional[float] = None
+
+    def _models(self):
+        return {STOCK: StockQuote, CRYPTO: CryptoQuote}
+
+    def start(self):
+        """정리 스레드 시작 (이미 실행 중이면 무시)"""
+        if self.is_running:
+            logger.warning("보관 기간 정리 작업이 이미 실행 중입니다")
+            return
+
+        self.is_running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="quote-retention", daemon=True)
+        self._thread.start()
+        logger.info(f" 시세 보관 기간 정리 시작 - {self.retention_days}일 보관, {self.interval:.0f}초 주기")
+
+    def stop(self):
+        """정리 스레드 중지 (진행 중인 청크 삭제는 다음 청크 전에 멈춤)"""
+        self.is_running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        logger.info(" 시세 보관 기간 정리 중지됨")
+
+    def _run(self):
+        while self.is_running:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f" 보관 기간 정리 오류: {e}")
+            self._stop_event.wait(self.interval)
+
+    def run_once(self, days: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """모든 시세 테이블에 대해 파티션 관리 또는 청크 삭제 1회 실행"""
+        with self._run_lock:
+            results = {kind: self._maintain(kind, model, days or self.retention_days) for kind, model in self._models().items()}
+            self.last_results = results
+            self.last_run_at = time.time()
+            return results
+
+    def purge(self, kind: str, days: Optional[int] = None) -> int:
+        """종류 하나의 보관 기간 정리 - 지운 행 수 반환 (파티션 삭제는 행 수를 세지 않으므로 0)"""
+        with self._run_lock:
+            result = self._maintain(kind, self._models()[kind], days or self.retention_days)
+            self.last_results[kind] = result
+            return result["deleted"]
+
+    def _maintain(self, kind: str, model, days: int) -> Dict[str, Any]:
+        table = model.__tablename__
+        # 파티션 삭제와 보관 파일이 같은 범위를 다루도록 날짜 단위로 자름
+        cutoff = datetime.combine((datetime.utcnow() - timedelta(days=days)).date(), day_time.min)
+        partitions = self.get_partitions(table)
+        created = self.ensure_future_partitions(table, partitions) if partitions else []
+
+        archived = None
+        if quote_archive.enabled:
+            try:
+                archived = quote_archive.archive_before(kind, cutoff.date())
+            except Exception as e:
+                # 보관에 실패한 행은 지우지 않고 다음 실행에서 다시 시도
+                logger.error(f" {table} 시세 보관 실패 - 삭제를 건너뜁니다: {e}")
+                return {"mode": "skipped", "created": created, "dropped": [], "deleted": 0, "error": str(e)}
+
+        if partitions:
+            dropped = self.drop_expired_partitions(table, partitions, cutoff.date())
+            return {"mode": "partition", "created": created, "dropped": dropped, "deleted": 0, "archived": archived}
+
+        deleted = self.delete_in_chunks(model, cutoff)
+        return {"mode": "chunked", "created": [], "dropped": [], "deleted": deleted, "archived": archived}
+
+    def get_partitions(self, table: str) -> List[Tuple[str, str]]:
+        """(파티션 이름, VALUES LESS THAN 값) 목록 - MySQL 파티션 테이블이 아니면 빈 목록"""
+        if engine.dialect.name != "mysql":
+            return []
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+                    "ORDER BY PARTITION_ORDINAL_POSITION"
+                ),
+                {"table": table}
+            ).all()
+        return [(name, description) for name, description in rows]
+
+    def ensure_future_partitions(self, table: str, partitions: List[Tuple[str, str]]) -> List[str]:
+        """오늘부터 FUTURE_PARTITIONS일치 파티션이 없으면 MAXVALUE 파티션을 나눠서 추가"""
+        bounds = [int(description) for _, description in partitions if description != "MAXVALUE"]
+        last_bound = max(bounds) if bounds else 0
+        today = datetime.utcnow().date()
+        days = [
+            today + timedelta(days=offset) for offset in range(FUTURE_PARTITIONS)
+            if to_days(today + timedelta(days=offset + 1)) > last_bound
+        ]
+        if not days:
+            return []
+
+        clauses = ", ".join(partition_clause(day) for day in days)
+        if any(name == MAX_PARTITION for name, _ in partitions):
+            # 비어 있는 MAXVALUE 파티션만 다시 나누므로 데이터 복사 없음
+            sql = (
+                f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO "
+                f"({clauses}, PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE)"
+            )
+        else:
+            sql = f"ALTER TABLE {table} ADD PARTITION ({clauses})"
+
+        with engine.begin() as conn:
+            conn.execute(text(sql))
+
+        created = [partition_name(day) for day in days]
+        logger.info(f" {table} 파티션 추가: {', '.join(created)}")
+        return created
+
+    def drop_expired_partitions(self, table: str, partitions: List[Tuple[str, str]], cutoff: date) -> List[str]:
+        """cutoff 날짜 이전 행만 담은 파티션 삭제 (메타데이터 작업이라 행 수와 무관)"""
+        limit = to_days(cutoff)
+        expired = [
+            name for name, description in partitions
+            if description != "MAXVALUE" and int(description) <= limit
+        ]
+        # 파티션 테이블은 파티션이 최소 하나 남아야 함
+        if len(expired) == len(partitions):
+            expired = expired[:-1]
+        if not expired:
+            return []
+
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}"))
+
+        logger.info(f" {table} 만료 파티션 삭제: {', '.join(expired)}")
+        return expired
+
+    def delete_in_chunks(self, model, cutoff: datetime) -> int:
+        """
+        파티션이 없을 때의 대체 경로 - cutoff 이전 행을 chunk_size개씩 지움
+
+        청크마다 짧은 트랜잭션으로 커밋하고 pause만큼 쉬어서 잠금을 오래 잡지 않음
+        """
+        table = model.__tablename__
+        deleted = 0
+        chunks = 0
+        self.progress[table] = 0
+
+        while True:
+            with engine.begin() as conn:
+                ids = conn.execute(
+                    select(model.id)
+                    .where(model.created_at < cutoff)
+                    .order_by(model.created_at)
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                conn.execute(delete(model).where(model.id.in_(ids)))
+
+            deleted += len(ids)
+            chunks += 1
+            self.progress[table] = deleted
+            if chunks % PROGRESS_LOG_CHUNKS == 0:
+                logger.info(f" {table} 오래된 시세 삭제 진행 중: {deleted}행")
+
+            if len(ids) < self.chunk_size:
+                break
+            # 중지 요청이 오면 다음 실행에서 이어서 지움
+            if self._stop_event.wait(self.pause):
+                logger.info(f" {table} 청크 삭제 중단: {deleted}행 삭제됨")
+                break
+
+        self.progress.pop(table, None)
+        if deleted:
+            logger.info(f" {table} 오래된 시세 {deleted}개 정리 완료 (청크 {chunks}개)")
+        return deleted
+
+    def get_status(self) -> Dict[str, Any]:
+        """정리 작업 상태 반환"""
+        return {
+            "is_running": self.is_running,
+            "retention_days": self.retention_days,
+            "interval": self.interval,
+            "last_run_age": round(time.time() - self.last_run_at, 1) if self.last_run_at else None,
+            "last_results": self.last_results,
+            "in_progress": dict(self.progress),
+            "archive": quote_archive.get_status()
+        }
+
+# 전역 보관 기간 정리 인스턴스
+retention_service = RetentionService()
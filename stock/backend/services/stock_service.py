@@ -1,10 +1,16 @@
 import asyncio
-import websocket
-import json
 import threading
 import time
-import requests
-from stock.backend.utils.ws_manager import broadcast_stock_data
+from stock.backend.services.finnhub_client import (
+    finnhub_client,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_DASHBOARD,
+    PRIORITY_BACKGROUND
+)
+from stock.backend.services.symbol_registry import symbol_registry, TOP_10_CRYPTOS
+from stock.backend.services.tick_store import STOCK, CRYPTO
+from stock.backend.services.broker import broker, QUOTE_CHANNEL
+from stock.backend.core.config import app_settings
 import os
 from dotenv import load_dotenv
 import logging
@@ -15,126 +21,105 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 API_KEY = os.getenv("FINNHUB_API_KEY")
-loop = asyncio.get_event_loop()
+
+# 수집기가 없는 워커가 같은 심볼의 시세를 다시 요청하기까지의 최소 간격 (초)
+QUOTE_REQUEST_INTERVAL = 30
 
 # 주식 데이터 캐시
 stock_cache = {}
 last_update_time = {}
 cache_lock = threading.Lock()
 
-def run_ws(loop, symbol):
-    def on_message(ws, message):
-        try:
-            data = json.loads(message)
-            asyncio.run_coroutine_threadsafe(broadcast_stock_data(data), loop)
-        except Exception as e:
-            print("수신 처리 중 에러:", e)
-
-    def on_open(ws):
-        ws.send(json.dumps({
-            "type": "subscribe",
-            "symbol": symbol
-        }))
-        print(f" {symbol} 구독 시작")
-
-    ws = websocket.WebSocketApp(
-        f"wss://ws.finnhub.io?token={API_KEY}",
-        on_message=on_message,
-        on_open=on_open
-    )
-    ws.run_forever()
-
-# 모든 활성 심볼에 대한 업데이트를 관리
-active_symbols = set()
-update_thread = None
-thread_running = False
-
-def update_stock_data(symbol):
-    """주식 데이터를 업데이트하고 캐시에 저장"""
+def _cache_stock_data(symbol, data):
+    """Finnhub 응답을 검증해서 캐시에 저장"""
+    if data is None:
+        logger.error(f"API 요청 실패: {symbol}")
+        return False
+    
+    if 'c' not in data:
+        logger.error(f"유효하지 않은 응답: {data}")
+        return False
+    
+    current_time = time.time()
+    # 캐시 정보 추가
+    data['_cache_info'] = {
+        'cached_at': current_time,
+        'source': 'api'
+    }
+    data['_cache_age'] = 0
+    
+    with cache_lock:
+        stock_cache[symbol] = data
+        last_update_time[symbol] = current_time
+    logger.info(f"주식 데이터 업데이트 완료: {symbol} (API 호출)")
+    share_cached_quote(STOCK, symbol, data)
+    return True
+
+def apply_stock_trade(symbol, price):
+    """
+    실시간 체결가를 캐시에 반영 (현재가/고가/저가, 전일 종가 기준 변동폭 재계산)
+    
+    :return: (변동폭, 변동률%)
+    """
+    current_time = time.time()
+    
+    with cache_lock:
+        data = stock_cache.get(symbol)
+        if data is None:
+            data = {'c': price, 'd': 0, 'dp': 0, 'h': price, 'l': price, 'o': price, 'pc': 0}
+            stock_cache[symbol] = data
+        
+        data['c'] = price
+        data['h'] = max(data.get('h') or price, price)
+        data['l'] = min(data.get('l') or price, price)
+        previous_close = data.get('pc') or 0
+        if previous_close:
+            data['d'] = price - previous_close
+            data['dp'] = data['d'] / previous_close * 100
+        data['_cache_info'] = {
+            'cached_at': current_time,
+            'source': 'stream'
+        }
+        last_update_time[symbol] = current_time
+        shared = dict(data)
+    
+    share_cached_quote(STOCK, symbol, shared)
+    return shared.get('d') or 0, shared.get('dp') or 0
+
+def update_stock_data(symbol, priority=PRIORITY_BACKGROUND):
+    """주식 데이터를 업데이트하고 캐시에 저장 (공용 Finnhub 클라이언트의 우선순위 레인 사용)"""
     try:
-        url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={API_KEY}"
         logger.info(f"주식 업데이트 요청: {symbol}")
-        
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if 'c' in data:
-                current_time = time.time()
-                # 캐시 정보 추가
-                data['_cache_info'] = {
-                    'cached_at': current_time,
-                    'source': 'api'
-                }
-                data['_cache_age'] = 0
-                
-                with cache_lock:
-                    stock_cache[symbol] = data
-                    last_update_time[symbol] = current_time
-                logger.info(f"주식 데이터 업데이트 완료: {symbol} (API 호출)")
-                return True
-            else:
-                logger.error(f"유효하지 않은 응답: {data}")
-        else:
-            logger.error(f"API 요청 실패: {response.status_code}")
-            
+        return _cache_stock_data(symbol, finnhub_client.get_quote_sync(symbol, priority))
+    except Exception as e:
+        logger.error(f"업데이트 중 오류: {e}")
         return False
+
+async def update_stock_data_async(symbol, priority=PRIORITY_BACKGROUND):
+    """update_stock_data의 비동기 버전 - 이벤트 루프를 막지 않고 토큰/응답을 기다림"""
+    try:
+        logger.info(f"주식 업데이트 요청: {symbol}")
+        return _cache_stock_data(symbol, await finnhub_client.get_quote(symbol, priority))
     except Exception as e:
         logger.error(f"업데이트 중 오류: {e}")
         return False
 
-def periodic_update_worker():
-    """모든 활성 심볼에 대해 주기적으로 업데이트하는 워커 스레드"""
-    global thread_running
-    
-    while thread_running:
-        try:
-            # 활성 심볼 목록 복사
-            with cache_lock:
-                symbols = list(active_symbols)
-            
-            current_time = time.time()
-            symbols_to_update = []
-            
-            # 업데이트가 필요한 심볼 확인
-            for symbol in symbols:
-                if symbol not in last_update_time or (current_time - last_update_time.get(symbol, 0)) >= 60:
-                    symbols_to_update.append(symbol)
-            
-            # 업데이트 실행
-            for symbol in symbols_to_update:
-                update_stock_data(symbol)
-                # API 요청 제한을 위해 요청 간 간격 두기
-                time.sleep(1.2)  # 초당 1회 미만 (분당 50회 이하로 유지)
-            
-            # 다음 검사 주기까지 대기
-            time.sleep(5)
-            
-        except Exception as e:
-            logger.error(f"주기적 업데이트 중 오류: {e}")
-            time.sleep(10)
+def _activate_symbol(symbol):
+    """심볼을 수집 레지스트리에 등록 - 이후 갱신은 통합 수집 파이프라인이 담당"""
+    symbol_registry.register(STOCK, symbol)
 
-def register_symbol(symbol):
-    """심볼을 활성 목록에 등록하고 필요하면 업데이트 스레드 시작"""
-    global update_thread, thread_running
-    
-    with cache_lock:
-        active_symbols.add(symbol)
-        logger.info(f"심볼 등록: {symbol}, 현재 활성 심볼 수: {len(active_symbols)}")
-        
-        # 스레드가 실행 중이 아니면 시작
-        if not thread_running:
-            thread_running = True
-            update_thread = threading.Thread(target=periodic_update_worker, daemon=True)
-            update_thread.start()
-            logger.info("주기적 업데이트 스레드 시작")
-    
-    # 즉시 초기 데이터 가져오기
-    update_stock_data(symbol)
-
-def get_cached_stock_data(symbol):
-    """캐시된 주식 데이터 조회, 없으면 업데이트 후 반환"""
+def register_symbol(symbol, priority=PRIORITY_INTERACTIVE):
+    """심볼을 활성 목록에 등록하고 즉시 초기 데이터 가져오기"""
+    _activate_symbol(symbol)
+    update_stock_data(symbol, priority)
+
+async def register_symbol_async(symbol, priority=PRIORITY_INTERACTIVE):
+    """register_symbol의 비동기 버전 (이벤트 루프에서 호출)"""
+    _activate_symbol(symbol)
+    await update_stock_data_async(symbol, priority)
+
+def _get_cached_copy(symbol):
+    """캐시 사본에 경과 시간/출처 표시를 붙여 반환 - 없으면 None"""
     current_time = time.time()
     
     with cache_lock:
@@ -150,11 +135,10 @@ def get_cached_stock_data(symbol):
             logger.info(f" 캐시에서 데이터 반환: {symbol} (캐시 경과: {cache_age:.1f}초)")
             return cached_data
     
-    # 캐시에 없으면 등록하고 업데이트
-    logger.info(f" 캐시에 없음, 새로 API 호출: {symbol}")
-    register_symbol(symbol)
-    
-    # 업데이트 후 다시 확인
+    return None
+
+def _get_fresh_copy(symbol):
+    """방금 업데이트된 캐시 사본 반환 - 없으면 None"""
     with cache_lock:
         if symbol in stock_cache:
             cached_data = stock_cache[symbol].copy()
@@ -165,11 +149,45 @@ def get_cached_stock_data(symbol):
     
     return None
 
+def get_cached_stock_data(symbol, priority=PRIORITY_INTERACTIVE):
+    """캐시된 주식 데이터 조회, 없으면 업데이트 후 반환 (스레드용)"""
+    cached_data = _get_cached_copy(symbol)
+    if cached_data:
+        return cached_data
+    
+    # 수집기가 없는 워커는 Finnhub를 직접 부르지 않고 수집 인스턴스에 요청만 보냄
+    if not app_settings.market_collector_enabled:
+        request_quote(STOCK, symbol)
+        return None
+    
+    # 캐시에 없으면 등록하고 업데이트
+    logger.info(f" 캐시에 없음, 새로 API 호출: {symbol}")
+    register_symbol(symbol, priority)
+    return _get_fresh_copy(symbol)
+
+async def get_cached_stock_data_async(symbol, priority=PRIORITY_INTERACTIVE):
+    """
+    캐시된 주식 데이터 조회, 없으면 업데이트 후 반환 (이벤트 루프용)
+    
+    캐시 미스 시에도 Finnhub 응답을 비동기로 기다리므로 이벤트 루프를 막지 않음
+    """
+    cached_data = _get_cached_copy(symbol)
+    if cached_data:
+        return cached_data
+    
+    if not app_settings.market_collector_enabled:
+        request_quote(STOCK, symbol)
+        return None
+    
+    logger.info(f" 캐시에 없음, 새로 API 호출: {symbol}")
+    await register_symbol_async(symbol, priority)
+    return _get_fresh_copy(symbol)
+
 def cleanup_inactive_symbols():
     """비활성화된 심볼들을 캐시에서 정리"""
-    global active_symbols
-    
     current_time = time.time()
+    symbol_registry.expire_inactive()
+    active_symbols = set(symbol_registry.get_symbols(STOCK))
     symbols_to_remove = []
     
     with cache_lock:
@@ -183,208 +201,113 @@ def cleanup_inactive_symbols():
             last_update_time.pop(symbol, None)
             logger.info(f"비활성 심볼 캐시 정리: {symbol}")
 
-def stop_update_thread():
-    """업데이트 스레드 중지"""
-    global thread_running
-    thread_running = False
-    logger.info("주기적 업데이트 스레드 중지됨")
-
 def get_cache_statistics():
     """캐시 통계 정보 반환"""
     with cache_lock:
         return {
             "cached_symbols": len(stock_cache),
-            "active_symbols": len(active_symbols),
+            "active_symbols": len(symbol_registry.get_symbols(STOCK)),
             "last_updates": {symbol: time.time() - last_time for symbol, last_time in last_update_time.items()}
         }
 
-# 상위 10개 암호화폐 목록
-TOP_10_CRYPTOS = [
-    "BTC", "ETH", "USDT", "XRP", "BNB", 
-    "SOL", "USDC", "DOGE", "ADA", "TRX"
-]
-
 # 암호화폐 데이터 캐시 (별도 관리)
 crypto_cache = {}
 crypto_last_update_time = {}
-crypto_thread = None
-crypto_thread_running = False
 
-def update_crypto_data(symbol):
+def _cache_crypto_data(symbol, data):
+    """Finnhub 응답을 웹소켓 형식으로 변환해서 캐시에 저장"""
+    if data is None:
+        logger.error(f"암호화폐 API 요청 실패: {symbol}")
+        return False
+    
+    if 'c' not in data or data['c'] == 0:  # 유효한 가격 데이터 확인
+        logger.error(f"유효하지 않은 암호화폐 응답: {symbol} - {data}")
+        return False
+    
+    current_time = time.time()
+    
+    # 암호화폐 데이터를 웹소켓 형식으로 변환
+    crypto_data = {
+        's': crypto_finnhub_symbol(symbol),  # 심볼 (BINANCE:BTCUSDT 형식)
+        'p': str(data['c']),  # 현재 가격 (문자열로 변환)
+        'v': str(data.get('v', 0)),  # 거래량 (문자열로 변환)
+        't': int(current_time * 1000),  # 타임스탬프 (밀리초)
+        
+        # 캐시 메타데이터
+        '_cache_info': {
+            'cached_at': current_time,
+            'source': 'api'
+        },
+        '_cache_age': 0,
+        '_data_source': 'api'
+    }
+    
+    with cache_lock:
+        crypto_cache[symbol] = crypto_data
+        crypto_last_update_time[symbol] = current_time
+    
+    logger.info(f"암호화폐 데이터 업데이트 완료: {symbol} = ${data['c']:.4f}")
+    share_cached_quote(CRYPTO, symbol, crypto_data)
+    return True
+
+def apply_crypto_trade(symbol, price, volume, timestamp_ms):
+    """실시간 체결가를 웹소켓 형식 암호화폐 캐시에 반영"""
+    current_time = time.time()
+    crypto_data = {
+        's': crypto_finnhub_symbol(symbol),
+        'p': str(price),
+        'v': str(volume),
+        't': int(timestamp_ms),
+        '_cache_info': {
+            'cached_at': current_time,
+            'source': 'stream'
+        },
+        '_cache_age': 0,
+        '_data_source': 'stream'
+    }
+    
+    with cache_lock:
+        crypto_cache[symbol] = crypto_data
+        crypto_last_update_time[symbol] = current_time
+    
+    share_cached_quote(CRYPTO, symbol, crypto_data)
+
+def crypto_finnhub_symbol(symbol):
+    """바이낸스 심볼 형식으로 변환 (예: BTC -> BINANCE:BTCUSDT)"""
+    return f"BINANCE:{symbol}USDT"
+
+def update_crypto_data(symbol, priority=PRIORITY_DASHBOARD):
     """암호화폐 데이터를 업데이트하고 캐시에 저장"""
     try:
-        # 바이낸스 심볼 형식으로 변환 (예: BTC -> BINANCE:BTCUSDT)
-        binance_symbol = f"BINANCE:{symbol}USDT"
-        url = f"https://finnhub.io/api/v1/quote?symbol={binance_symbol}&token={API_KEY}"
+        binance_symbol = crypto_finnhub_symbol(symbol)
         logger.info(f"암호화폐 업데이트 요청: {symbol} ({binance_symbol})")
-        
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if 'c' in data and data['c'] != 0:  # 유효한 가격 데이터 확인
-                current_time = time.time()
-                
-                # 암호화폐 데이터를 웹소켓 형식으로 변환
-                crypto_data = {
-                    's': binance_symbol,  # 심볼 (BINANCE:BTCUSDT 형식)
-                    'p': str(data['c']),  # 현재 가격 (문자열로 변환)
-                    'v': str(data.get('v', 0)),  # 거래량 (문자열로 변환)
-                    't': int(time.time() * 1000),  # 타임스탬프 (밀리초)
-                    
-
-                    
-                    # 캐시 메타데이터
-                    '_cache_info': {
-                        'cached_at': current_time,
-                        'source': 'api'
-                    },
-                    '_cache_age': 0,
-                    '_data_source': 'api'
-                }
-                
-                with cache_lock:
-                    crypto_cache[symbol] = crypto_data
-                    crypto_last_update_time[symbol] = current_time
-                
-                logger.info(f"암호화폐 데이터 업데이트 완료: {symbol} = ${data['c']:.4f}")
-                return True
-            else:
-                logger.error(f"유효하지 않은 암호화폐 응답: {symbol} - {data}")
-        else:
-            logger.error(f"암호화폐 API 요청 실패: {symbol} - {response.status_code}")
-            
-        return False
+        return _cache_crypto_data(symbol, finnhub_client.get_quote_sync(binance_symbol, priority))
     except Exception as e:
         logger.error(f"암호화폐 업데이트 중 오류: {symbol} - {e}")
         return False
 
-def crypto_periodic_update_worker():
-    """암호화폐 데이터를 1분마다 업데이트하는 워커 스레드"""
-    global crypto_thread_running
-    
-    logger.info(f" 암호화폐 자동 수집 시작 - {len(TOP_10_CRYPTOS)}개 코인")
-    
-    while crypto_thread_running:
-        try:
-            start_time = time.time()
-            success_count = 0
-            
-            logger.info(f" 암호화폐 데이터 수집 시작 - {len(TOP_10_CRYPTOS)}개 처리")
-            
-            # 모든 암호화폐 업데이트
-            for symbol in TOP_10_CRYPTOS:
-                if not crypto_thread_running:
-                    break
-                    
-                if update_crypto_data(symbol):
-                    success_count += 1
-                    
-                    #  암호화폐 데이터 DB 저장 프로세스 설명:
-                    # 1. API에서 받은 데이터를 캐시에 저장 후
-                    # 2. 캐시에서 데이터를 가져와서 DB 저장용 형식으로 변환
-                    # 3. crypto_service를 통해 crypto_quotes 테이블에 저장
-                    
-                    # DB 저장 (crypto_service 사용)
-                    try:
-                        from stock.backend.services.crypto_service import crypto_service
-                        crypto_data_obj = crypto_cache.get(symbol)
-                        
-                        logger.info(f" 캐시에서 가져온 데이터: {symbol} -> {crypto_data_obj}")
-                        
-                        if crypto_data_obj:
-                            # CryptoQuote 형식으로 변환하여 저장
-                            crypto_quote_data = {
-                                "symbol": symbol,  # BTC, ETH 등
-                                "s": crypto_data_obj.get('s', ''),     # BINANCE:BTCUSDT
-                                "p": crypto_data_obj.get('p', '0'),    # 현재가 (문자열)
-                                "v": crypto_data_obj.get('v', '0'),    # 거래량 (문자열)
-                                "t": crypto_data_obj.get('t', 0)       # 타임스탬프 (밀리초)
-                            }
-                            
-                            #  타임스탬프 값 검증 및 로깅
-                            timestamp_value = crypto_quote_data.get('t', 0)
-                            logger.info(f" {symbol} 타임스탬프 값: {timestamp_value} ({type(timestamp_value)})")
-                            
-                            # 타임스탬프 범위 검증 (밀리초 단위)
-                            if timestamp_value <= 0:
-                                logger.error(f" {symbol} 잘못된 타임스탬프: {timestamp_value}")
-                                continue
-                            
-                            # BIGINT 범위 검증 (2^63-1 = 9223372036854775807)
-                            if timestamp_value > 9223372036854775807:
-                                logger.error(f" {symbol} 타임스탬프 범위 초과: {timestamp_value}")
-                                continue
-                            
-                            logger.info(f" DB 저장용 데이터 변환: {symbol} -> {crypto_quote_data}")
-                            
-                            if crypto_service.save_crypto_quote(crypto_quote_data):
-                                logger.debug(f" {symbol} 암호화폐 데이터 DB 저장 완료")
-                            else:
-                                logger.error(f" {symbol} 암호화폐 데이터 DB 저장 실패")
-                                #  실패 원인 분석을 위한 추가 로깅
-                                logger.error(f" 실패한 데이터: {crypto_quote_data}")
-                                logger.error(f" 캐시 원본 데이터: {crypto_data_obj}")
-                        else:
-                            logger.error(f" {symbol} 캐시에서 데이터를 찾을 수 없음")
-                            
-                    except Exception as e:
-                        logger.error(f" {symbol} DB 저장 중 오류: {e}")
-                        # 스택 트레이스 출력
-                        import traceback
-                        logger.error(f" 스택 트레이스:\n{traceback.format_exc()}")
-                
-                # API 요청 제한을 위한 지연
-                time.sleep(1.2)
-            
-            elapsed_time = time.time() - start_time
-            logger.info(f" 암호화폐 수집 완료: {success_count}/{len(TOP_10_CRYPTOS)} 성공 (소요: {elapsed_time:.1f}초)")
-            
-            # 다음 실행까지 대기 (1분 - 처리 시간)
-            remaining_time = 60 - elapsed_time
-            if remaining_time > 0:
-                logger.info(f" 다음 암호화폐 수집까지 {remaining_time:.1f}초 대기...")
-                time.sleep(remaining_time)
-            else:
-                logger.warning(f" 암호화폐 처리 시간이 1분 초과: {elapsed_time:.1f}초")
-            
-        except Exception as e:
-            logger.error(f" 암호화폐 수집 루프 오류: {e}")
-            time.sleep(10)
-    
-    logger.info(" 암호화폐 자동 수집 스레드 종료")
+async def update_crypto_data_async(symbol, priority=PRIORITY_DASHBOARD):
+    """update_crypto_data의 비동기 버전 - 이벤트 루프를 막지 않고 토큰/응답을 기다림"""
+    try:
+        binance_symbol = crypto_finnhub_symbol(symbol)
+        logger.info(f"암호화폐 업데이트 요청: {symbol} ({binance_symbol})")
+        return _cache_crypto_data(symbol, await finnhub_client.get_quote(binance_symbol, priority))
+    except Exception as e:
+        logger.error(f"암호화폐 업데이트 중 오류: {symbol} - {e}")
+        return False
 
 def start_crypto_collection():
-    """암호화폐 자동 수집 시작"""
-    global crypto_thread, crypto_thread_running
-    
-    if crypto_thread_running:
-        logger.warning("암호화폐 수집이 이미 실행 중입니다")
-        return
-    
-    # 초기 데이터 수집
-    logger.info(" 암호화폐 초기 데이터 수집 시작")
-    for symbol in TOP_10_CRYPTOS:
-        if update_crypto_data(symbol):
-            logger.info(f" {symbol} 초기 데이터 수집 완료")
-        else:
-            logger.error(f" {symbol} 초기 데이터 수집 실패")
-        time.sleep(1.2)
-    
-    crypto_thread_running = True
-    crypto_thread = threading.Thread(target=crypto_periodic_update_worker, daemon=True)
-    crypto_thread.start()
-    logger.info(" 암호화폐 자동 수집 스레드 시작")
+    """암호화폐 자동 수집 시작 - 통합 수집 파이프라인 시작"""
+    from stock.backend.services.ingestion_pipeline import ingestion_pipeline
+    ingestion_pipeline.start()
 
 def stop_crypto_collection():
-    """암호화폐 자동 수집 중지"""
-    global crypto_thread_running
-    crypto_thread_running = False
-    logger.info(" 암호화폐 자동 수집 중지됨")
+    """암호화폐 자동 수집 중지 - 통합 수집 파이프라인 중지"""
+    from stock.backend.services.ingestion_pipeline import ingestion_pipeline
+    ingestion_pipeline.stop()
 
-def get_cached_crypto_data(symbol):
-    """캐시된 암호화폐 데이터 조회"""
+def _get_cached_crypto_copy(symbol):
+    """암호화폐 캐시 사본에 경과 시간/출처 표시를 붙여 반환 - 없으면 None"""
     current_time = time.time()
     
     with cache_lock:
@@ -399,30 +322,133 @@ def get_cached_crypto_data(symbol):
             logger.info(f" 암호화폐 캐시 데이터 반환: {symbol} (경과: {cache_age:.1f}초)")
             return cached_data
     
-    # 캐시에 없으면 즉시 업데이트
+    return None
+
+def _get_fresh_crypto_copy(symbol):
+    """방금 업데이트된 암호화폐 캐시 사본 반환 - 없으면 None"""
+    with cache_lock:
+        if symbol in crypto_cache:
+            cached_data = crypto_cache[symbol].copy()
+            cached_data['_cache_age'] = 0
+            cached_data['_data_source'] = 'api'
+            logger.info(f" 새 암호화폐 데이터 반환: {symbol}")
+            return cached_data
+    
+    return None
+
+def get_cached_crypto_data(symbol):
+    """캐시된 암호화폐 데이터 조회, 없으면 업데이트 후 반환 (스레드용)"""
+    cached_data = _get_cached_crypto_copy(symbol)
+    if cached_data:
+        return cached_data
+    
+    if not app_settings.market_collector_enabled:
+        request_quote(CRYPTO, symbol)
+        return None
+    
+    # 캐시에 없으면 레지스트리에 등록하고 즉시 업데이트
     logger.info(f" 암호화폐 캐시 없음, 새로 API 호출: {symbol}")
-    if update_crypto_data(symbol):
-        with cache_lock:
-            if symbol in crypto_cache:
-                cached_data = crypto_cache[symbol].copy()
-                cached_data['_cache_age'] = 0
-                cached_data['_data_source'] = 'api'
-                logger.info(f" 새 암호화폐 데이터 반환: {symbol}")
-                return cached_data
+    symbol_registry.register(CRYPTO, symbol)
+    if update_crypto_data(symbol, PRIORITY_INTERACTIVE):
+        return _get_fresh_crypto_copy(symbol)
+    
+    return None
+
+async def get_cached_crypto_data_async(symbol):
+    """
+    캐시된 암호화폐 데이터 조회, 없으면 업데이트 후 반환 (이벤트 루프용)
+    
+    캐시 미스 시에도 Finnhub 응답을 비동기로 기다리므로 이벤트 루프를 막지 않음
+    """
+    cached_data = _get_cached_crypto_copy(symbol)
+    if cached_data:
+        return cached_data
+    
+    if not app_settings.market_collector_enabled:
+        request_quote(CRYPTO, symbol)
+        return None
+    
+    logger.info(f" 암호화폐 캐시 없음, 새로 API 호출: {symbol}")
+    symbol_registry.register(CRYPTO, symbol)
+    if await update_crypto_data_async(symbol, PRIORITY_INTERACTIVE):
+        return _get_fresh_crypto_copy(symbol)
     
     return None
 
 def get_crypto_statistics():
     """암호화폐 캐시 통계 정보 반환"""
+    from stock.backend.services.ingestion_pipeline import ingestion_pipeline
+    
     with cache_lock:
         return {
             "cached_cryptos": len(crypto_cache),
             "monitored_cryptos": len(TOP_10_CRYPTOS),
             "crypto_symbols": list(TOP_10_CRYPTOS),
-            "thread_running": crypto_thread_running,
+            "thread_running": ingestion_pipeline.is_running,
             "last_updates": {
                 symbol: time.time() - last_time 
                 for symbol, last_time in crypto_last_update_time.items()
             }
         }
 
+# 워커 간 시세 캐시 공유 - 수집 인스턴스만 Finnhub를 호출하고, 나머지 워커는 브로커로 받은 캐시로 응답
+_quote_requests = {}
+
+def share_cached_quote(kind, symbol, data):
+    """수집 인스턴스에서 갱신한 캐시 항목을 다른 워커에 전달"""
+    if not app_settings.market_collector_enabled:
+        return
+    entry = {key: value for key, value in data.items() if key not in ('_cache_age', '_data_source')}
+    broker.publish(QUOTE_CHANNEL, {"op": "cache", "kind": kind, "symbol": symbol, "data": entry})
+
+def request_quote(kind, symbol):
+    """캐시에 없는 심볼을 수집 인스턴스에 요청 (심볼마다 QUOTE_REQUEST_INTERVAL초에 한 번)"""
+    now = time.time()
+    if now - _quote_requests.get((kind, symbol), 0) < QUOTE_REQUEST_INTERVAL:
+        return
+    _quote_requests[(kind, symbol)] = now
+    logger.info(f" 캐시에 없음, 수집 인스턴스에 요청: {kind}:{symbol}")
+    broker.publish(QUOTE_CHANNEL, {"op": "request", "kind": kind, "symbol": symbol})
+
+def _send_cached_quote(kind, symbol):
+    """이미 캐시에 있는 항목을 다시 공유 - 있으면 True"""
+    cache = stock_cache if kind == STOCK else crypto_cache
+    with cache_lock:
+        data = cache.get(symbol)
+        data = dict(data) if data is not None else None
+    if data is None:
+        return False
+    share_cached_quote(kind, symbol, data)
+    return True
+
+def apply_quote_message(message):
+    """
+    브로커로 받은 시세 캐시 메시지 처리
+
+    cache - 수집기가 없는 워커가 자기 캐시에 반영 / request - 수집 인스턴스가 심볼을 등록하고 캐시를 보내 줌
+    """
+    op, kind, symbol = message.get("op"), message.get("kind"), message.get("symbol")
+    if op == "cache" and not app_settings.market_collector_enabled:
+        data = dict(message.get("data") or {})
+        cached_at = (data.get('_cache_info') or {}).get('cached_at', time.time())
+        with cache_lock:
+            if kind == STOCK:
+                stock_cache[symbol] = data
+                last_update_time[symbol] = cached_at
+            else:
+                crypto_cache[symbol] = data
+                crypto_last_update_time[symbol] = cached_at
+        _quote_requests.pop((kind, symbol), None)
+    elif op == "request" and app_settings.market_collector_enabled:
+        if _send_cached_quote(kind, symbol):
+            return
+        symbol_registry.register(kind, symbol)
+        update = update_stock_data_async(symbol, PRIORITY_INTERACTIVE) if kind == STOCK \
+            else update_crypto_data_async(symbol, PRIORITY_INTERACTIVE)
+        try:
+            asyncio.get_running_loop().create_task(update)
+        except RuntimeError:
+            # 이벤트 루프 밖이면 다음 수집 라운드에서 갱신
+            update.close()
+
+broker.subscribe(QUOTE_CHANNEL, apply_quote_message)
@@ -0,0 +1,106 @@
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Tuple
+
+from stock.backend.services.finnhub_client import PRIORITY_DASHBOARD, PRIORITY_BACKGROUND
+from stock.backend.services.tick_store import STOCK, CRYPTO
+
+logger = logging.getLogger(__name__)
+
+# 가장 활발한 주식 목록 (대시보드)
+MOST_ACTIVE_STOCKS = [
+    "NVDA", "TSLA", "PLTR", "INTC", "AAPL", "BAC", "AMZN", "AMD", "GOOG", "MSFT",
+    "META", "AVGO", "NFLX", "COST", "UNH", "MSTR", "LLY", "CRM", "V", "REGN",
+    "APP", "WMT", "XOM", "MRVL", "ORCL", "JPM", "TXN", "ZS", "NOW", "MA",
+    "IBM", "UBER", "JNJ", "AMAT", "HOOD", "ADI", "GE", "MU", "PANW", "INTU",
+    "ABBV", "PG", "DELL", "CRWD", "SPOT", "LIN", "KO", "TMUS", "QCOM", "F"
+]
+
+# 상위 10개 암호화폐 목록 (대시보드)
+TOP_10_CRYPTOS = [
+    "BTC", "ETH", "USDT", "XRP", "BNB",
+    "SOL", "USDC", "DOGE", "ADA", "TRX"
+]
+
+# 심볼 출처
+SOURCE_DASHBOARD = "dashboard"
+SOURCE_INTERACTIVE = "interactive"
+
+# 사용자가 요청한 심볼을 마지막 요청 이후 유지하는 시간 (12시간)
+INTERACTIVE_TTL = 43200
+
+class SymbolRegistry:
+    """
+    수집 대상 심볼 단일 레지스트리
+
+    대시보드 심볼은 항상 수집/저장하고, 사용자가 요청한 심볼은 마지막 요청 후
+    INTERACTIVE_TTL 동안만 캐시 갱신 대상으로 유지함
+    """
+
+    def __init__(self):
+        self._dashboard: Dict[str, List[str]] = {
+            STOCK: list(MOST_ACTIVE_STOCKS),
+            CRYPTO: list(TOP_10_CRYPTOS)
+        }
+        self._interactive: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, symbol: str) -> bool:
+        """사용자 요청 심볼 등록 (이미 있으면 마지막 요청 시간만 갱신) - 새로 추가되면 True"""
+        if self.is_dashboard(kind, symbol):
+            return False
+
+        with self._lock:
+            is_new = (kind, symbol) not in self._interactive
+            self._interactive[(kind, symbol)] = time.time()
+
+        if is_new:
+            logger.info(f" 심볼 등록: {kind}:{symbol}")
+        return is_new
+
+    def is_dashboard(self, kind: str, symbol: str) -> bool:
+        return symbol in self._dashboard.get(kind, ())
+
+    def get_symbols(self, kind: str) -> List[str]:
+        """수집 대상 심볼 목록 (대시보드 심볼 먼저, 중복 없음)"""
+        self.expire_inactive()
+        with self._lock:
+            interactive = [symbol for (k, symbol) in self._interactive if k == kind]
+        dashboard = self._dashboard.get(kind, [])
+        return dashboard + [symbol for symbol in interactive if symbol not in dashboard]
+
+    def get_priority(self, kind: str, symbol: str) -> int:
+        """주기적 수집 시 사용할 Finnhub 우선순위 레인"""
+        return PRIORITY_DASHBOARD if self.is_dashboard(kind, symbol) else PRIORITY_BACKGROUND
+
+    def should_persist(self, kind: str, symbol: str) -> bool:
+        """DB 저장 대상 여부 - 대시보드 심볼만 주기적으로 저장"""
+        return self.is_dashboard(kind, symbol)
+
+    def expire_inactive(self) -> int:
+        """오래 요청되지 않은 사용자 심볼 제거"""
+        cutoff = time.time() - INTERACTIVE_TTL
+        with self._lock:
+            expired = [key for key, last_seen in self._interactive.items() if last_seen < cutoff]
+            for key in expired:
+                del self._interactive[key]
+
+        for kind, symbol in expired:
+            logger.info(f" 비활성 심볼 해제: {kind}:{symbol}")
+        return len(expired)
+
+    def get_status(self) -> Dict[str, Any]:
+        """레지스트리 상태 반환"""
+        with self._lock:
+            interactive = list(self._interactive)
+        return {
+            "dashboard": {kind: len(symbols) for kind, symbols in self._dashboard.items()},
+            "interactive": {
+                kind: [symbol for (k, symbol) in interactive if k == kind]
+                for kind in (STOCK, CRYPTO)
+            }
+        }
+
+# 전역 심볼 레지스트리 인스턴스
+symbol_registry = SymbolRegistry()
@@ -0,0 +1,247 @@
+import calendar
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 자산 종류
+STOCK = "stock"
+CRYPTO = "crypto"
+
+# 심볼별 보관할 최대 틱 수
+DEFAULT_CAPACITY = 120
+# DB에 데이터가 없던 심볼의 재적재 시도 간격 (초)
+RELOAD_INTERVAL = 60
+
+def to_epoch_ms(value: datetime) -> int:
+    """
+    UTC 시각을 epoch 밀리초로 변환 - 서버 시간대와 무관
+
+    DB/수집기의 created_at은 UTC 기준 naive datetime이므로 datetime.timestamp()(로컬 시간으로 해석)를 쓰지 않음
+    """
+    return calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000
+
+def from_epoch_ms(timestamp_ms: int) -> datetime:
+    """epoch 밀리초를 UTC 기준 naive datetime으로 변환 (DB created_at과 같은 형식) - 서버 시간대와 무관"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+class TickRingBuffer:
+    """
+    심볼 하나의 고정 크기 링 버퍼 (float64 가격 + int64 밀리초 타임스탬프)
+
+    seq는 지금까지 추가된 틱 수 - 마지막 틱의 순번이며 델타 전송 기준으로 사용
+    """
+
+    __slots__ = ("capacity", "prices", "timestamps", "_next", "_size", "seq")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self._next = 0
+        self._size = 0
+        self.seq = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, timestamp_ms: int):
+        """틱 추가 - 가득 차면 가장 오래된 틱을 덮어씀"""
+        self.prices[self._next] = price
+        self.timestamps[self._next] = timestamp_ms
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.seq += 1
+
+    def latest(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """최근 n개 틱을 오래된 것부터 (가격, 타임스탬프) 복사본으로 반환"""
+        n = self._size if n is None else max(0, min(n, self._size))
+        start = (self._next - n) % self.capacity
+        end = start + n
+
+        if end <= self.capacity:
+            return self.prices[start:end].copy(), self.timestamps[start:end].copy()
+
+        # 버퍼 끝을 넘어가면 두 구간을 이어 붙임
+        wrap = end - self.capacity
+        return (
+            np.concatenate((self.prices[start:], self.prices[:wrap])),
+            np.concatenate((self.timestamps[start:], self.timestamps[:wrap]))
+        )
+
+class TickStore:
+    """프로세스 메모리 틱 저장소 - 실시간 차트 히스토리를 DB 대신 제공"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers: Dict[Tuple[str, str], TickRingBuffer] = {}
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._load_attempts: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    def append(self, kind: str, symbol: str, price: float, timestamp_ms: Optional[int] = None, **fields) -> Dict[str, Any]:
+        """
+        새 틱 추가 (수집기 저장 시 호출)
+
+        :param kind: STOCK 또는 CRYPTO
+        :param fields: 최신 틱에 함께 보관할 부가 정보 (change, change_percent, volume 등)
+        :return: 추가된 최신 틱 정보 (허브 발행용)
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+
+        key = (kind, symbol)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = TickRingBuffer(self.capacity)
+            buffer.append(float(price), int(timestamp_ms))
+            latest = self._latest[key] = {"price": float(price), "timestamp": int(timestamp_ms), "seq": buffer.seq, **fields}
+            return {"kind": kind, "symbol": symbol, **latest}
+
+    def get_history(self, kind: str, symbol: str, n: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+        """최근 n개 틱 (가격, 타임스탬프) 배열 반환 - 없으면 빈 배열"""
+        with self._lock:
+            buffer = self._buffers.get((kind, symbol))
+            if buffer is None:
+                return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+            return buffer.latest(n)
+
+    def get_snapshot(self, kind: str, symbol: str, n: int = 30) -> Tuple[np.ndarray, np.ndarray, int]:
+        """최근 n개 틱과 마지막 틱 순번을 함께 반환 (순번 0이면 데이터 없음)"""
+        with self._lock:
+            buffer = self._buffers.get((kind, symbol))
+            if buffer is None:
+                return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64), 0
+            prices, timestamps = buffer.latest(n)
+            return prices, timestamps, buffer.seq
+
+    def get_since(self, kind: str, symbol: str, seq: int, n: int = 30) -> Optional[Tuple[np.ndarray, np.ndarray, int]]:
+        """
+        seq 이후에 추가된 틱과 마지막 틱 순번 반환
+
+        새 틱이 n개를 넘거나 버퍼에서 이미 밀려났으면 델타로 이어 붙일 수 없으므로 None
+        """
+        with self._lock:
+            buffer = self._buffers.get((kind, symbol))
+            if buffer is None:
+                return None
+            added = buffer.seq - seq
+            if added < 0 or added > min(n, len(buffer)):
+                return None
+            prices, timestamps = buffer.latest(added)
+            return prices, timestamps, buffer.seq
+
+    def get_latest(self, kind: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """가장 최근 틱 정보 반환"""
+        with self._lock:
+            latest = self._latest.get((kind, symbol))
+            return dict(latest) if latest else None
+
+    def has_symbol(self, kind: str, symbol: str) -> bool:
+        with self._lock:
+            return (kind, symbol) in self._buffers
+
+    def load_from_db(self, kind: str, symbols: Iterable[str]) -> int:
+        """DB의 최근 레코드로 심볼 버퍼 채우기 - 이미 있는 심볼은 건너뜀"""
+        from stock.backend.database import SessionLocal
+        from stock.backend.data_service import get_recent_quotes_by_symbol
+        from stock.backend.models import StockQuote, CryptoQuote
+
+        symbols = [symbol for symbol in symbols if not self.has_symbol(kind, symbol)]
+        if not symbols:
+            return 0
+
+        model = StockQuote if kind == STOCK else CryptoQuote
+        db = SessionLocal()
+        try:
+            history = get_recent_quotes_by_symbol(db, model, symbols, self.capacity)
+        finally:
+            db.close()
+
+        loaded = 0
+        with self._lock:
+            for symbol, quotes in history.items():
+                if not quotes or (kind, symbol) in self._buffers:
+                    continue
+
+                buffer = self._buffers[(kind, symbol)] = TickRingBuffer(self.capacity)
+                for quote in quotes:
+                    price = float(quote.c) if kind == STOCK else quote.price_value
+                    buffer.append(price, to_epoch_ms(quote.created_at))
+
+                latest = quotes[-1]
+                if kind == STOCK:
+                    fields = {"price": float(latest.c), "change": latest.d or 0, "change_percent": latest.dp or 0}
+                else:
+                    fields = {"price": latest.price_value, "volume": latest.volume_value, "s": latest.s, "t": latest.t}
+                self._latest[(kind, symbol)] = {
+                    "timestamp": to_epoch_ms(latest.created_at),
+                    "seq": buffer.seq,
+                    **fields
+                }
+                loaded += len(quotes)
+
+        return loaded
+
+    def ensure_symbol(self, kind: str, symbol: str) -> bool:
+        """수집 대상이 아닌 심볼은 처음 요청될 때 DB에서 한 번만 적재"""
+        if self.has_symbol(kind, symbol):
+            return True
+
+        # DB에도 없던 심볼은 매 요청마다 다시 조회하지 않음
+        last_attempt = self._load_attempts.get((kind, symbol), 0)
+        if time.time() - last_attempt < RELOAD_INTERVAL:
+            return False
+        self._load_attempts[(kind, symbol)] = time.time()
+
+        try:
+            self.load_from_db(kind, [symbol])
+        except Exception as e:
+            logger.error(f" 틱 저장소 적재 실패: {kind}:{symbol}, 오류: {e}")
+        return self.has_symbol(kind, symbol)
+
+    async def ensure_symbol_async(self, kind: str, symbol: str) -> bool:
+        """ensure_symbol의 비동기 버전 - 적재가 필요할 때만 DB 스레드 풀에서 실행"""
+        if self.has_symbol(kind, symbol):
+            return True
+
+        from stock.backend.database import run_db
+        return await run_db(self.ensure_symbol, kind, symbol)
+
+    def warm_from_db(self, stock_symbols: Iterable[str], crypto_symbols: Iterable[str]) -> bool:
+        """애플리케이션 시작 시 DB에서 한 번 적재"""
+        try:
+            start_time = time.time()
+            stock_ticks = self.load_from_db(STOCK, stock_symbols)
+            crypto_ticks = self.load_from_db(CRYPTO, crypto_symbols)
+            self.warmed = True
+            logger.info(
+                f" 틱 저장소 적재 완료: 주식 {stock_ticks}개, 암호화폐 {crypto_ticks}개 틱 "
+                f"({(time.time() - start_time) * 1000:.0f}ms)"
+            )
+            return True
+        except Exception as e:
+            logger.error(f" 틱 저장소 적재 실패: {e}")
+            return False
+
+    def get_status(self) -> Dict[str, Any]:
+        """저장소 상태 반환"""
+        with self._lock:
+            return {
+                "warmed": self.warmed,
+                "capacity": self.capacity,
+                "stock_symbols": sum(1 for kind, _ in self._buffers if kind == STOCK),
+                "crypto_symbols": sum(1 for kind, _ in self._buffers if kind == CRYPTO),
+                "total_ticks": sum(len(buffer) for buffer in self._buffers.values())
+            }
+
+# 전역 틱 저장소 인스턴스
+tick_store = TickStore()
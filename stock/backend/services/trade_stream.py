@@ -0,0 +1,252 @@
+import asyncio
+import json
+import random
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from stock.backend.core.config import api_settings
+from stock.backend.services.symbol_registry import symbol_registry
+from stock.backend.services.tick_store import tick_store, STOCK, CRYPTO
+from stock.backend.services.ingestion_pipeline import INGEST_INTERVAL
+from stock.backend.services.market_hub import publish_tick
+
+logger = logging.getLogger(__name__)
+
+FINNHUB_WS_URL = "wss://ws.finnhub.io"
+
+# 체결을 심볼별로 모아서 반영하는 주기 (초)
+COALESCE_INTERVAL = 0.25
+# 차트 포인트 간격 (밀리초) - 체결은 시세 캐시에는 매번 반영하지만, 차트용 틱 저장소에는 마지막 포인트(REST 시세 포함)에서
+# 이만큼 지났을 때만 추가해 차트 히스토리가 수집 주기 단위(30포인트 ≈ 30분)를 유지하도록 함
+CHART_INTERVAL_MS = INGEST_INTERVAL * 1000
+# 레지스트리와 구독 목록을 맞추는 주기 (초)
+SYNC_INTERVAL = 30
+# 재연결 대기 시간 (지수 증가, 초)
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+HEARTBEAT = 30
+
+class FinnhubTradeStream:
+    """
+    Finnhub 실시간 체결 스트림 - 웹소켓 연결 하나로 여러 심볼을 구독
+
+    체결은 COALESCE_INTERVAL 동안 심볼별 마지막 가격/누적 거래량으로 합친 뒤
+    시세 캐시에 반영하고, 차트 포인트 간격이 지난 심볼만 틱 저장소/허브에 한 번 발행함
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_symbols: Optional[int] = None):
+        self.api_key = api_key if api_key is not None else api_settings.finnhub_api_key
+        self.max_symbols = max_symbols or api_settings.finnhub_stream_max_symbols
+        self.is_running = False
+        self._tasks = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        # Finnhub 심볼 -> (kind, 심볼)
+        self._subscribed: Dict[str, Tuple[str, str]] = {}
+        # Finnhub 심볼 -> 이번 주기에 모인 체결 (마지막 가격, 누적 거래량, 마지막 체결 시각)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self.connected_at: Optional[float] = None
+        self.reconnect_count = 0
+        self.trade_count = 0
+        self.update_count = 0
+        self.chart_count = 0
+
+    def start(self):
+        """스트림 시작 - 이벤트 루프 안에서 호출"""
+        if self.is_running:
+            logger.warning("체결 스트림이 이미 실행 중입니다")
+            return
+        if not self.api_key:
+            logger.warning(" FINNHUB_API_KEY가 없어 체결 스트림을 시작하지 않습니다")
+            return
+
+        self.is_running = True
+        self._tasks = [
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._flush_loop())
+        ]
+        logger.info(f" Finnhub 체결 스트림 시작 (최대 {self.max_symbols}심볼)")
+
+    async def stop(self):
+        """스트림 중지"""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session and not self._session.closed:
+            await self._session.close()
+        logger.info(f" Finnhub 체결 스트림 중지됨 (체결: {self.trade_count}, 반영: {self.update_count})")
+
+    def _desired_symbols(self) -> Dict[str, Tuple[str, str]]:
+        """구독할 Finnhub 심볼 목록 - 24시간 거래되는 암호화폐 먼저, 최대 max_symbols개"""
+        from stock.backend.services.stock_service import crypto_finnhub_symbol
+
+        desired: Dict[str, Tuple[str, str]] = {}
+        for symbol in symbol_registry.get_symbols(CRYPTO):
+            desired[crypto_finnhub_symbol(symbol)] = (CRYPTO, symbol)
+        for symbol in symbol_registry.get_symbols(STOCK):
+            desired[symbol] = (STOCK, symbol)
+        return dict(list(desired.items())[:self.max_symbols])
+
+    async def _sync_subscriptions(self):
+        """레지스트리 변경 사항만 subscribe/unsubscribe 메시지로 전송"""
+        ws = self._ws
+        if ws is None or ws.closed:
+            return
+
+        desired = self._desired_symbols()
+        added = [symbol for symbol in desired if symbol not in self._subscribed]
+        removed = [symbol for symbol in self._subscribed if symbol not in desired]
+
+        for symbol in removed:
+            await ws.send_str(json.dumps({"type": "unsubscribe", "symbol": symbol}))
+            del self._subscribed[symbol]
+        for symbol in added:
+            await ws.send_str(json.dumps({"type": "subscribe", "symbol": symbol}))
+            self._subscribed[symbol] = desired[symbol]
+
+        if added or removed:
+            logger.info(f" 체결 스트림 구독 갱신: +{len(added)} -{len(removed)} (총 {len(self._subscribed)}개)")
+
+    async def _run(self):
+        """연결 유지 루프 - 끊기면 지수 백오프(지터 포함) 후 재연결"""
+        backoff = MIN_BACKOFF
+        while self.is_running:
+            try:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession()
+
+                async with self._session.ws_connect(
+                    f"{FINNHUB_WS_URL}?token={self.api_key}",
+                    heartbeat=HEARTBEAT
+                ) as ws:
+                    self._ws = ws
+                    self._subscribed = {}
+                    self.connected_at = time.time()
+                    logger.info(" Finnhub 체결 스트림 연결됨")
+                    await self._sync_subscriptions()
+
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            if self._handle_message(message.data):
+                                backoff = MIN_BACKOFF
+                        elif message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                            break
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f" Finnhub 체결 스트림 오류: {e}")
+            finally:
+                self._ws = None
+                self.connected_at = None
+
+            if not self.is_running:
+                break
+
+            delay = backoff * (1 + random.random() * 0.5)
+            self.reconnect_count += 1
+            logger.warning(f" Finnhub 체결 스트림 재연결 대기: {delay:.1f}초")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _handle_message(self, raw: str) -> bool:
+        """수신 메시지 처리 - 체결이면 심볼별로 합쳐 두고 True 반환"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.error(f" 체결 스트림 메시지 파싱 실패: {raw[:100]}")
+            return False
+
+        message_type = message.get("type")
+        if message_type == "trade":
+            for trade in message.get("data") or ():
+                symbol = trade.get("s")
+                if symbol not in self._subscribed or not trade.get("p"):
+                    continue
+                pending = self._pending.get(symbol)
+                volume = float(trade.get("v") or 0)
+                if pending is None:
+                    self._pending[symbol] = {"p": float(trade["p"]), "v": volume, "t": int(trade.get("t") or 0)}
+                else:
+                    pending["p"] = float(trade["p"])
+                    pending["v"] += volume
+                    pending["t"] = int(trade.get("t") or pending["t"])
+                self.trade_count += 1
+            return True
+
+        if message_type == "error":
+            logger.error(f" Finnhub 체결 스트림 오류 메시지: {message.get('msg')}")
+        return False
+
+    async def _flush_loop(self):
+        """합쳐 둔 체결을 주기마다 반영하고, SYNC_INTERVAL마다 구독 목록 동기화"""
+        last_sync = time.monotonic()
+        while self.is_running:
+            await asyncio.sleep(COALESCE_INTERVAL)
+            try:
+                self._flush()
+                if time.monotonic() - last_sync >= SYNC_INTERVAL:
+                    last_sync = time.monotonic()
+                    await self._sync_subscriptions()
+            except Exception as e:
+                logger.error(f" 체결 반영 오류: {e}")
+
+    def _flush(self):
+        """심볼별 마지막 체결을 캐시에 반영하고, 차트 포인트 간격이 지났으면 틱 저장소/허브에도 반영"""
+        from stock.backend.services.stock_service import apply_stock_trade, apply_crypto_trade
+
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        for finnhub_symbol, trade in pending.items():
+            target = self._subscribed.get(finnhub_symbol)
+            if target is None:
+                continue
+            kind, symbol = target
+            timestamp_ms = trade["t"] or int(time.time() * 1000)
+
+            if kind == STOCK:
+                change, change_percent = apply_stock_trade(symbol, trade["p"])
+            else:
+                apply_crypto_trade(symbol, trade["p"], trade["v"], timestamp_ms)
+            self.update_count += 1
+
+            latest = tick_store.get_latest(kind, symbol)
+            if latest is not None and timestamp_ms - latest["timestamp"] < CHART_INTERVAL_MS:
+                continue
+
+            if kind == STOCK:
+                publish_tick(
+                    STOCK, symbol, trade["p"], timestamp_ms,
+                    change=change, change_percent=change_percent
+                )
+            else:
+                publish_tick(
+                    CRYPTO, symbol, trade["p"], timestamp_ms,
+                    volume=trade["v"], s=finnhub_symbol, t=timestamp_ms
+                )
+            self.chart_count += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        """스트림 상태 반환"""
+        return {
+            "is_running": self.is_running,
+            "connected": self._ws is not None and not self._ws.closed,
+            "connected_seconds": round(time.time() - self.connected_at, 1) if self.connected_at else None,
+            "subscribed": len(self._subscribed),
+            "max_symbols": self.max_symbols,
+            "reconnect_count": self.reconnect_count,
+            "trade_count": self.trade_count,
+            "update_count": self.update_count,
+            "chart_count": self.chart_count,
+            "chart_interval_ms": CHART_INTERVAL_MS
+        }
+
+# 전역 체결 스트림 인스턴스
+trade_stream = FinnhubTradeStream()
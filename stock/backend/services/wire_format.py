@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional, Union
+
+from stock.backend.utils.ws_broadcast import encode_json
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성 - 없으면 msgpack 인코딩만 비활성화
+    msgpack = None
+
+# WebSocket 메시지 인코딩 (?encoding=)
+# json: 기존 형식 (기본값), compact: 축약 열 형식 JSON 텍스트, msgpack: 축약 열 형식 MessagePack 바이너리 프레임
+ENCODING_JSON = "json"
+ENCODING_COMPACT = "compact"
+ENCODING_MSGPACK = "msgpack"
+ENCODINGS = (ENCODING_JSON, ENCODING_COMPACT, ENCODING_MSGPACK)
+
+# 축약 형식의 필드 이름
+KEY_MAP = {
+    "type": "t",
+    "seq": "q",
+    "base_seq": "b",
+    "data": "d",
+    "symbol": "s",
+    "price": "p",
+    "change": "c",
+    "changePercent": "cp",
+    "history": "h",
+    "points": "pt",
+    "timestamp": "ts",
+    "data_source": "src",
+    "current_price": "cur",
+    "last_update": "lu",
+    "stocks": "st",
+    "cryptos": "cr",
+    "replace": "r",
+    "removed": "rm"
+}
+# 축약 형식에서 빼는 필드 - 히스토리 순번/표시용 시각은 배열 위치와 timestamp로, 안내 문구는 생략
+DERIVED_FIELDS = frozenset({"time", "message"})
+# 같은 키를 가진 객체 목록을 열 배열로 바꿀 때 행 수를 담는 키
+ROW_COUNT = "#"
+
+def available_encodings() -> List[str]:
+    """현재 서버에서 사용할 수 있는 인코딩 목록"""
+    return [encoding for encoding in ENCODINGS if encoding != ENCODING_MSGPACK or msgpack is not None]
+
+def parse_encoding(encoding: Optional[str]) -> str:
+    """인코딩 확인 - 지정하지 않으면 json"""
+    encoding = (encoding or ENCODING_JSON).lower()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"지원하지 않는 인코딩입니다: {encoding} ({', '.join(ENCODINGS)})")
+    if encoding == ENCODING_MSGPACK and msgpack is None:
+        raise ValueError("msgpack 패키지가 설치되지 않아 msgpack 인코딩을 사용할 수 없습니다")
+    return encoding
+
+def compact(value: Any) -> Any:
+    """
+    메시지를 축약 열 형식으로 변환
+
+    필드 이름은 KEY_MAP으로 줄이고 DERIVED_FIELDS는 뺌. 키 구성이 같은 객체 목록은
+    {"#": 행 수, 필드: [값, ...]} 형태의 열 배열이 되므로, 클라이언트는 "#" 키가 있는 객체를
+    i번째 행 = {필드: 값[i]}로 되돌리면 됨 (예: 시장 스냅샷의 심볼 목록, 심볼별 가격 히스토리)
+    """
+    if isinstance(value, dict):
+        return {KEY_MAP.get(key, key): compact(item) for key, item in value.items() if key not in DERIVED_FIELDS}
+
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            keys = value[0].keys()
+            if all(item.keys() == keys for item in value):
+                columns: Dict[str, Any] = {ROW_COUNT: len(value)}
+                for key in keys:
+                    if key not in DERIVED_FIELDS:
+                        columns[KEY_MAP.get(key, key)] = [compact(item[key]) for item in value]
+                return columns
+        return [compact(item) for item in value]
+
+    return value
+
+def encode_message(message: Dict[str, Any], encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """메시지를 인코딩 - msgpack은 바이너리 프레임(bytes), 나머지는 텍스트 프레임(str)"""
+    if encoding == ENCODING_JSON:
+        return encode_json(message)
+    if encoding == ENCODING_COMPACT:
+        return encode_json(compact(message))
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(compact(message), use_bin_type=True)
+    raise ValueError(f"지원하지 않는 인코딩입니다: {encoding}")
@@ -3,7 +3,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.crypto_service import crypto_service
-from database import test_connection, create_db_and_tables
+from database import test_connection, create_db_and_tables, write_buffer
 import logging
 
 # 로깅 설정
@@ -47,6 +47,8 @@ def test_crypto_save():
     
     # 4. 저장 시도
     result = crypto_service.save_crypto_quote(test_crypto_data)
+    # 쓰기 버퍼에 대기 중인 행을 바로 저장
+    write_buffer.flush()
     
     if result:
         print("✅ 암호화폐 데이터 저장 성공!")
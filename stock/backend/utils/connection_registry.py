@@ -0,0 +1,82 @@
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+class ConnectionRegistry:
+    """
+    WebSocket 연결 목록 - 메타데이터의 type, symbol로 색인
+
+    추가/제거는 O(1)이고, 타입별/토픽(타입+심볼)별 연결 집합을 전체 목록을 훑지 않고 바로 조회함
+    """
+
+    def __init__(self):
+        # 연결 -> 메타데이터 (등록 순서 유지)
+        self.connection_data: Dict[WebSocket, Dict[str, Any]] = {}
+        self._by_type: Dict[Optional[str], Set[WebSocket]] = {}
+        self._by_topic: Dict[Tuple[Optional[str], str], Set[WebSocket]] = {}
+
+    def __len__(self) -> int:
+        return len(self.connection_data)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return websocket in self.connection_data
+
+    def __iter__(self) -> Iterator[WebSocket]:
+        return iter(self.connection_data)
+
+    @staticmethod
+    def _topic(metadata: Dict[str, Any]) -> Optional[Tuple[Optional[str], str]]:
+        symbol = metadata.get("symbol")
+        return None if symbol is None else (metadata.get("type"), symbol)
+
+    def add(self, websocket: WebSocket, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """연결 등록 - 이미 있는 연결이면 새 메타데이터로 다시 색인"""
+        self.remove(websocket)
+        metadata = metadata if metadata is not None else {}
+        self.connection_data[websocket] = metadata
+        self._by_type.setdefault(metadata.get("type"), set()).add(websocket)
+        topic = self._topic(metadata)
+        if topic is not None:
+            self._by_topic.setdefault(topic, set()).add(websocket)
+        return metadata
+
+    def remove(self, websocket: WebSocket) -> Optional[Dict[str, Any]]:
+        """연결 제거 - 등록된 연결이 아니면 None, 빈 색인 집합은 삭제"""
+        metadata = self.connection_data.pop(websocket, None)
+        if metadata is None:
+            return None
+        self._discard(self._by_type, metadata.get("type"), websocket)
+        topic = self._topic(metadata)
+        if topic is not None:
+            self._discard(self._by_topic, topic, websocket)
+        return metadata
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[WebSocket]], key: Any, websocket: WebSocket):
+        members = index.get(key)
+        if members is not None:
+            members.discard(websocket)
+            if not members:
+                del index[key]
+
+    def get(self, websocket: WebSocket) -> Optional[Dict[str, Any]]:
+        """연결의 메타데이터 조회"""
+        return self.connection_data.get(websocket)
+
+    def by_type(self, connection_type: Optional[str]) -> Set[WebSocket]:
+        """타입별 연결 집합 (내부 집합이므로 순회 중 연결이 바뀔 수 있으면 복사해서 사용)"""
+        return self._by_type.get(connection_type, set())
+
+    def by_topic(self, symbol: str, connection_type: Optional[str] = None) -> Set[WebSocket]:
+        """타입+심볼을 구독하는 연결 집합 (내부 집합이므로 필요하면 복사해서 사용)"""
+        return self._by_topic.get((connection_type, symbol), set())
+
+    def count(self, connection_type: Optional[str] = None) -> int:
+        """전체 또는 타입별 연결 수"""
+        if connection_type is None:
+            return len(self.connection_data)
+        return len(self._by_type.get(connection_type, ()))
+
+    def symbols(self, connection_type: Optional[str] = None) -> List[str]:
+        """구독자가 있는 심볼 목록"""
+        return [symbol for kind, symbol in self._by_topic if kind == connection_type]
@@ -0,0 +1,99 @@
+import numpy as np
+
+LTTB = "lttb"
+MINMAX = "minmax"
+METHODS = (LTTB, MINMAX)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets로 남길 점의 인덱스 선택
+
+    첫/마지막 점은 항상 남기고, 가운데 구간은 max_points - 2개 버킷마다
+    이전 선택점과 다음 버킷 평균점으로 만든 삼각형 넓이가 가장 큰 점 하나를 고름
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = max_points - 2
+    every = (n - 2) / buckets
+    # 버킷 i는 [edges[i], edges[i + 1]) 구간 (첫 점 제외)
+    edges = np.minimum(np.floor(np.arange(buckets + 2) * every).astype(np.int64) + 1, n - 1)
+    edges[-1] = n
+
+    # 모든 버킷의 평균점을 누적합으로 한 번에 계산 (i번째는 i + 1번째 버킷 평균)
+    x_sum = np.concatenate(([0.0], np.cumsum(x)))
+    y_sum = np.concatenate(([0.0], np.cumsum(y)))
+    next_start, next_end = edges[1:], np.append(edges[2:], n)
+    counts = np.maximum(next_end - next_start, 1)
+    avg_x = (x_sum[next_end] - x_sum[next_start]) / counts
+    avg_y = (y_sum[next_end] - y_sum[next_start]) / counts
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = a = 0
+    for i in range(buckets):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """버킷마다 최솟값/최댓값 점을 남기는 인덱스 선택 (첫/마지막 점 포함, 시간순)"""
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    buckets = (max_points - 2) // 2
+    bucket_ids = np.arange(n) * buckets // n
+    starts = np.searchsorted(bucket_ids, np.arange(buckets))
+    bucket_min = np.minimum.reduceat(y, starts)[bucket_ids]
+    bucket_max = np.maximum.reduceat(y, starts)[bucket_ids]
+
+    # 버킷마다 최솟값/최댓값이 처음 나오는 점
+    min_candidates = np.flatnonzero(y == bucket_min)
+    max_candidates = np.flatnonzero(y == bucket_max)
+    _, first_min = np.unique(bucket_ids[min_candidates], return_index=True)
+    _, first_max = np.unique(bucket_ids[max_candidates], return_index=True)
+    return np.unique(np.concatenate((
+        [0, n - 1],
+        min_candidates[first_min],
+        max_candidates[first_max]
+    )))
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: int, method: str = LTTB) -> np.ndarray:
+    """
+    차트 모양을 유지하면서 max_points개 이하로 줄일 점의 인덱스 (시간순)
+
+    :param x: 시간 (오름차순)
+    :param y: 가격
+    :param method: lttb 또는 minmax
+    """
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 다운샘플링 방식입니다: {method} (lttb, minmax)")
+    if method == MINMAX:
+        return minmax_indices(y, max_points)
+    return lttb_indices(x, y, max_points)
+
+def downsample_rows(rows: list, times, prices, max_points: int, method: str = LTTB) -> list:
+    """
+    행 목록을 max_points개 이하로 줄임 - 원래 행 순서(최신순 등)는 유지
+
+    :param times: 각 행의 시간 (정렬 여부 무관)
+    :param prices: 각 행의 가격
+    """
+    if not max_points or len(rows) <= max_points:
+        return rows
+
+    times = np.asarray(times, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    order = np.argsort(times, kind="stable")
+    keep = np.sort(order[downsample_indices(times[order], prices[order], max_points, method)])
+    return [rows[i] for i in keep]
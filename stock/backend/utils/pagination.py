@@ -0,0 +1,19 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """(created_at, id) 키셋 커서를 URL에 쓸 수 있는 문자열로 변환"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """커서 문자열을 (created_at, id)로 변환 - 형식이 잘못되면 ValueError"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError(f"잘못된 커서입니다: {cursor}")
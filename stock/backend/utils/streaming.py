@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Sequence
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv"
+}
+
+def _value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def iter_ndjson(chunks: Iterable[Sequence[Sequence[Any]]], columns: List[str]) -> Iterator[bytes]:
+    """행 묶음마다 NDJSON(한 줄에 JSON 객체 하나) 바이트 생성"""
+    for rows in chunks:
+        yield "".join(
+            json.dumps({column: _value(value) for column, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+def iter_csv(chunks: Iterable[Sequence[Sequence[Any]]], columns: List[str]) -> Iterator[bytes]:
+    """헤더 한 줄 뒤에 행 묶음마다 CSV 바이트 생성"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+def iter_rows(chunks: Iterable[Sequence[Sequence[Any]]], columns: List[str], fmt: str) -> Iterator[bytes]:
+    """요청 형식(ndjson/csv)에 맞는 스트리밍 바이트 생성기"""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (ndjson, csv)")
+    return iter_csv(chunks, columns) if fmt == CSV else iter_ndjson(chunks, columns)
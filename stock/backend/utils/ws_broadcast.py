@@ -0,0 +1,236 @@
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Union
+
+from fastapi import WebSocket
+
+from stock.backend.core.config import app_settings
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 표준 json 사용
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 전송 대기열이 가득 찼을 때의 정책
+DROP_OLDEST = "drop_oldest"
+# 같은 키(시세 토픽 등)로 대기 중인 메시지를 최신 메시지로 교체, 키가 없거나 그래도 가득 차면 drop_oldest
+COALESCE_LATEST = "coalesce_latest"
+# 가득 차면 바로 연결 해제
+DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE_LATEST, DISCONNECT)
+
+# 느린 연결을 해제할 때 보내는 종료 코드 (1013 Try Again Later)
+EVICT_CLOSE_CODE = 1013
+# 전송 중 오류로 연결을 닫을 때 보내는 종료 코드 (1011 Internal Error)
+SEND_ERROR_CLOSE_CODE = 1011
+
+def encode_json(message: Any) -> str:
+    """
+    메시지를 JSON 텍스트로 한 번 직렬화
+
+    orjson이 설치되어 있으면 orjson으로 (공백 없는 형식), orjson이 처리하지 못하는 값
+    (문자열이 아닌 키 등)이 있거나 설치되지 않았으면 표준 json을 사용
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(message).decode()
+        except TypeError:
+            pass
+    return json.dumps(message, separators=(",", ":"))
+
+async def send_frame(websocket: WebSocket, encoded: Union[str, bytes]):
+    """미리 직렬화한 메시지 전송 - str은 텍스트 프레임, bytes는 바이너리 프레임"""
+    if isinstance(encoded, bytes):
+        await websocket.send_bytes(encoded)
+    else:
+        await websocket.send_text(encoded)
+
+class ConnectionWriter:
+    """
+    연결 하나의 크기 제한 전송 대기열과 전용 전송 태스크
+
+    enqueue는 대기열에 넣기만 하고 바로 반환하며, 실제 전송은 연결마다 하나인 태스크가 순서대로 처리함
+    """
+
+    def __init__(self, websocket: WebSocket, maxsize: int, policy: str, evict_after: int,
+                 send_timeout: float, on_close: Callable[[WebSocket], None]):
+        self.websocket = websocket
+        self.maxsize = maxsize
+        self.policy = policy
+        self.evict_after = evict_after
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        # [키, 메시지] 항목 - 키가 있는 항목은 coalesce_latest에서 제자리 교체
+        self._queue: Deque[list] = deque()
+        self._keyed: Dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # 마지막 전송 성공 이후 버린 메시지 수
+        self._overflow = 0
+        self._task = asyncio.create_task(self._run())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, encoded: Union[str, bytes], key: Optional[str] = None) -> bool:
+        """메시지를 대기열에 추가 - 연결이 닫혔거나 이번 추가로 해제되면 False"""
+        if self.closed:
+            return False
+
+        if key is not None and self.policy == COALESCE_LATEST:
+            entry = self._keyed.get(key)
+            if entry is not None:
+                entry[1] = encoded
+                self.coalesced += 1
+                return True
+
+        if len(self._queue) >= self.maxsize:
+            if self.policy == DISCONNECT:
+                self.evict(f"전송 대기열 초과 ({self.maxsize}개)")
+                return False
+            self._pop()
+            self.dropped += 1
+            self._overflow += 1
+            if self.evict_after and self._overflow >= self.evict_after:
+                self.evict(f"전송 없이 메시지 {self._overflow}개 버림")
+                return False
+
+        entry = [key, encoded]
+        self._queue.append(entry)
+        if key is not None and self.policy == COALESCE_LATEST:
+            self._keyed[key] = entry
+        self._ready.set()
+        return True
+
+    def _pop(self) -> Union[str, bytes]:
+        key, encoded = entry = self._queue.popleft()
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+        return encoded
+
+    async def _run(self):
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                # 별도 태스크를 만들지 않는 타임아웃 (메시지마다 wait_for 태스크를 만들지 않도록)
+                async with asyncio.timeout(self.send_timeout):
+                    await send_frame(self.websocket, self._pop())
+                self.sent += 1
+                self._overflow = 0
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.evict(f"전송이 {self.send_timeout:.0f}초를 넘김")
+        except Exception as e:
+            # 전송이 실패한 연결은 등록을 해제하고 소켓도 닫아 클라이언트가 다시 연결하게 함
+            logger.debug(f" WebSocket 전송 실패: {e}")
+            self._shutdown()
+            await self._close_socket(SEND_ERROR_CLOSE_CODE)
+
+    def evict(self, reason: str):
+        """느린 연결 해제 - 남은 메시지를 버리고 종료 코드와 함께 연결을 닫음"""
+        if self.closed:
+            return
+        logger.warning(f" 느린 WebSocket 연결 해제: {reason} (버린 메시지 {self.dropped}개)")
+        self._shutdown()
+        asyncio.create_task(self._close_socket(EVICT_CLOSE_CODE))
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _shutdown(self):
+        self.stop()
+        self.on_close(self.websocket)
+
+    def stop(self):
+        """전송 태스크 중지 (남은 메시지는 버림)"""
+        self.closed = True
+        self._queue.clear()
+        self._keyed.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+class SendQueues:
+    """
+    연결별 전송 대기열 모음
+
+    브로드캐스트는 연결마다 대기열에 넣기만 하므로 느린 연결이 다른 연결의 전송을 늦추지 않고,
+    전송 태스크가 따라가지 못하는 연결은 정책에 따라 메시지를 버리거나 해제함
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, policy: Optional[str] = None,
+                 evict_after: Optional[int] = None, send_timeout: Optional[float] = None,
+                 on_evict: Optional[Callable[[WebSocket], None]] = None):
+        self.maxsize = maxsize or app_settings.ws_send_queue_size
+        self.policy = policy or app_settings.ws_overflow_policy
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"지원하지 않는 전송 대기열 정책입니다: {self.policy} ({', '.join(OVERFLOW_POLICIES)})")
+        self.evict_after = app_settings.ws_evict_after if evict_after is None else evict_after
+        self.send_timeout = send_timeout or app_settings.ws_send_timeout
+        self.on_evict = on_evict
+        self._writers: Dict[WebSocket, ConnectionWriter] = {}
+        self.evicted_count = 0
+
+    def register(self, websocket: WebSocket) -> ConnectionWriter:
+        """연결의 전송 대기열과 전송 태스크 생성 - 이벤트 루프 안에서 호출"""
+        writer = self._writers.get(websocket)
+        if writer is None:
+            writer = self._writers[websocket] = ConnectionWriter(
+                websocket, self.maxsize, self.policy, self.evict_after, self.send_timeout, self._closed
+            )
+        return writer
+
+    def unregister(self, websocket: WebSocket):
+        """연결 해제 시 전송 태스크 중지"""
+        writer = self._writers.pop(websocket, None)
+        if writer is not None:
+            writer.stop()
+
+    def _closed(self, websocket: WebSocket):
+        # 전송 실패/느린 연결 해제 - 매니저에게 알려 연결 목록에서도 제거
+        if self._writers.pop(websocket, None) is None:
+            return
+        self.evicted_count += 1
+        if self.on_evict is not None:
+            self.on_evict(websocket)
+
+    def send(self, websocket: WebSocket, encoded: Union[str, bytes], key: Optional[str] = None) -> bool:
+        """연결 하나의 대기열에 메시지 추가 - 등록되지 않았거나 닫힌 연결이면 False"""
+        writer = self._writers.get(websocket)
+        return writer is not None and writer.enqueue(encoded, key)
+
+    def fan_out(self, connections: Iterable[WebSocket], encoded: Union[str, bytes], key: Optional[str] = None) -> int:
+        """미리 직렬화한 메시지를 여러 연결의 대기열에 추가 - 추가한 연결 수 반환 (전송을 기다리지 않음)"""
+        delivered = 0
+        for websocket in list(connections):
+            if self.send(websocket, encoded, key):
+                delivered += 1
+        return delivered
+
+    def get_status(self) -> Dict[str, Any]:
+        """전송 대기열 상태 반환"""
+        writers = list(self._writers.values())
+        return {
+            "connections": len(writers),
+            "queued": sum(len(writer) for writer in writers),
+            "max_queued": max((len(writer) for writer in writers), default=0),
+            "sent": sum(writer.sent for writer in writers),
+            "dropped": sum(writer.dropped for writer in writers),
+            "coalesced": sum(writer.coalesced for writer in writers),
+            "evicted": self.evicted_count,
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "evict_after": self.evict_after
+        }
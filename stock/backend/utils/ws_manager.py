@@ -1,25 +1,30 @@
+import asyncio
 from asyncio import Lock
 from fastapi import WebSocket
-import json
+from stock.backend.utils.ws_broadcast import encode_json, SendQueues
+from stock.backend.utils.connection_registry import ConnectionRegistry
 import logging
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-clients=[]
+# 클라이언트 -> {"symbol": 구독 심볼}, 심볼별 색인으로 추가/제거/구독자 조회가 O(1)
+clients = ConnectionRegistry()
 clients_lock =Lock()
+# 클라이언트별 전송 대기열 - 느린 클라이언트가 해제되면 목록에서도 제거
+send_queues = SendQueues(on_evict=lambda ws: asyncio.create_task(safe_remove_client(ws)))
 
 async def safe_add_client(ws: WebSocket, symbol: str):
     async with clients_lock:
-        clients.append({"websocket": ws, "symbol": symbol})
+        clients.add(ws, {"symbol": symbol})
+        send_queues.register(ws)
         logger.info(f"클라이언트 추가됨: {symbol}, 현재 접속자 수: {len(clients)}")
 
 async def safe_remove_client(ws: WebSocket):
     async with clients_lock:
-        clients[:] = [
-            client for client in clients if client["websocket"] != ws
-        ]
+        clients.remove(ws)
+        send_queues.unregister(ws)
         logger.info(f"클라이언트 제거됨, 현재 접속자 수: {len(clients)}")
 
 async def broadcast_stock_data(data: dict):
@@ -28,13 +33,10 @@ async def broadcast_stock_data(data: dict):
         symbol = data["data"][0]["s"]
         logger.info(f"브로드캐스트: {symbol}")
         
+        # 잠금은 구독자 목록 복사에만 사용하고 전송은 클라이언트별 대기열에서 처리
         async with clients_lock:
-            for client in clients:
-                if client["symbol"] == symbol:
-                    try:
-                        await client["websocket"].send_text(json.dumps(data))
-                    except Exception as e:
-                        logger.error(f"전송 실패: {e}")
+            subscribers = list(clients.by_topic(symbol))
+        send_queues.fan_out(subscribers, encode_json(data), key=symbol)
     except Exception as e:
         logger.error(f"브로드캐스트 중 오류: {e}")
 
@@ -49,27 +51,12 @@ async def send_rest_api_data(symbol: str):
             await broadcast_stock_data(data)
 
 async def broadcast_to_symbol_subscribers(symbol: str, data: dict):
-    """특정 심볼 구독자들에게만 데이터 브로드캐스트"""
-    disconnected_clients = []
-    
+    """특정 심볼 구독자들에게만 데이터 브로드캐스트 (전송 실패/느린 클라이언트는 대기열이 제거)"""
     async with clients_lock:
-        for client in clients:
-            if client["symbol"] == symbol:
-                try:
-                    await client["websocket"].send_text(json.dumps(data))
-                except Exception as e:
-                    logger.error(f"클라이언트 전송 실패: {e}")
-                    disconnected_clients.append(client)
-    
-    # 연결이 끊어진 클라이언트 제거
-    if disconnected_clients:
-        async with clients_lock:
-            for client in disconnected_clients:
-                if client in clients:
-                    clients.remove(client)
-        logger.info(f"연결 끊어진 클라이언트 {len(disconnected_clients)}개 제거됨")
+        subscribers = list(clients.by_topic(symbol))
+    send_queues.fan_out(subscribers, encode_json(data), key=symbol)
 
 async def get_active_symbols():
     """현재 활성화된 심볼 목록 반환"""
     async with clients_lock:
-        return list(set(client["symbol"] for client in clients))
\ No newline at end of file
+        return clients.symbols()
\ No newline at end of file
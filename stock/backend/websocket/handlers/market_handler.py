@@ -15,12 +15,11 @@ class MarketDataHandler:
     async def send_initial_data(self, websocket: WebSocket):
         """연결 시 초기 데이터 전송"""
         try:
-            from ...database import SessionLocal
-            db = SessionLocal()
-            try:
-                await self.send_market_data_from_db(websocket, db)
-            finally:
-                db.close()
+            from ...services.market_snapshot import market_snapshot
+            
+            # 스냅샷 서비스가 DB 조회를 이벤트 루프 밖에서 처리
+            market_data = await market_snapshot.get_payload()
+            await self.manager.send_personal_message(market_data, websocket)
         except Exception as e:
             logger.error(f"❌ 초기 데이터 전송 실패: {e}")
             await self.send_cached_market_data(websocket)
@@ -30,20 +29,12 @@ class MarketDataHandler:
         await self.send_initial_data(websocket)
     
     async def broadcast_market_data(self):
-        """모든 메인 연결에 시장 데이터 브로드캐스트"""
+        """모든 메인 연결에 시장 데이터 브로드캐스트 - 스냅샷은 틱당 한 번만 생성"""
         try:
-            from ...database import SessionLocal
-            db = SessionLocal()
-            try:
-                main_connections = self.manager.get_connections_by_type("main")
-                for websocket in main_connections.copy():
-                    try:
-                        await self.send_market_data_from_db(websocket, db)
-                    except Exception as e:
-                        logger.error(f"❌ 클라이언트 전송 오류: {e}")
-                        self.manager.disconnect(websocket)
-            finally:
-                db.close()
+            from ...services.market_snapshot import market_snapshot
+            
+            market_data = await market_snapshot.get_payload(force=True)
+            await self.manager.broadcast_to_type(market_data, "main")
         except Exception as e:
             logger.error(f"❌ 브로드캐스트 오류: {e}")
     
@@ -52,7 +43,7 @@ class MarketDataHandler:
         try:
             from ...database.models import StockQuote, CryptoQuote
             from ...services.stock_service import TOP_10_CRYPTOS
-            from sqlalchemy import desc
+            from ...data_service import get_recent_quotes_by_symbol
             
             # 주요 주식 데이터 수집
             stock_symbols = [
@@ -64,17 +55,15 @@ class MarketDataHandler:
             ]
             stocks_data = []
             
+            # 전체 심볼의 최근 30개를 주식/암호화폐 각각 한 번의 쿼리로 조회
+            stock_history = get_recent_quotes_by_symbol(db, StockQuote, stock_symbols, 30)
+            crypto_history = get_recent_quotes_by_symbol(db, CryptoQuote, TOP_10_CRYPTOS, 30)
+            
             for symbol in stock_symbols:
                 try:
-                    recent_quotes = db.query(StockQuote)\
-                        .filter(StockQuote.symbol == symbol)\
-                        .order_by(desc(StockQuote.created_at))\
-                        .limit(30)\
-                        .all()
+                    recent_quotes = stock_history.get(symbol)
                     
                     if recent_quotes:
-                        recent_quotes.reverse()
-                        
                         history_data = []
                         for i, quote in enumerate(recent_quotes):
                             history_data.append({
@@ -96,22 +85,16 @@ class MarketDataHandler:
                             "data_source": "database"
                         })
                 except Exception as e:
-                    logger.error(f"❌ 주식 {symbol} 조회 오류: {e}")
+                    logger.error(f"❌ 주식 {symbol} 처리 오류: {e}")
                     continue
             
             # 암호화폐 데이터 수집
             cryptos_data = []
             for symbol in TOP_10_CRYPTOS:
                 try:
-                    recent_crypto_quotes = db.query(CryptoQuote)\
-                        .filter(CryptoQuote.symbol == symbol)\
-                        .order_by(desc(CryptoQuote.created_at))\
-                        .limit(30)\
-                        .all()
+                    recent_crypto_quotes = crypto_history.get(symbol)
                     
                     if recent_crypto_quotes:
-                        recent_crypto_quotes.reverse()
-                        
                         history_data = []
                         for i, quote in enumerate(recent_crypto_quotes):
                             history_data.append({
@@ -129,7 +112,7 @@ class MarketDataHandler:
                             "data_source": "database"
                         })
                 except Exception as e:
-                    logger.error(f"❌ 암호화폐 {symbol} 조회 오류: {e}")
+                    logger.error(f"❌ 암호화폐 {symbol} 처리 오류: {e}")
                     continue
             
             market_data = {
@@ -1,7 +1,6 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from sqlalchemy.orm import Session
-from ..database import get_db, SessionLocal
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from . import manager, stock_handler, crypto_handler
+from ..services.market_snapshot import market_snapshot
 import asyncio
 import logging
 import time
@@ -14,62 +13,6 @@ router = APIRouter()
 background_task = None
 is_broadcasting = False
 
-async def send_market_data_from_db(websocket: WebSocket, db: Session = None):
-    """DB에서 최근 30개 데이터를 가져와서 전송"""
-    if db is None:
-        logger.warning("⚠️ DB 세션이 없어서 캐시된 데이터 사용")
-        await send_cached_market_data(websocket)
-        return
-        
-    try:
-        # 주식 데이터 수집
-        stocks_data = await stock_handler.get_stock_market_data(db)
-        logger.info(f"📈 주식 데이터 수집 완료: {len(stocks_data)}개")
-        
-        # 암호화폐 데이터 수집
-        cryptos_data = await crypto_handler.get_crypto_market_data(db)
-        logger.info(f"💰 암호화폐 데이터 수집 완료: {len(cryptos_data)}개")
-        
-        # 프론트엔드가 기대하는 형식으로 데이터 전송
-        market_data = {
-            "type": "market_update",
-            "data": {
-                "stocks": stocks_data,
-                "cryptos": cryptos_data
-            },
-            "timestamp": int(time.time() * 1000),
-            "data_source": "database",
-            "message": f"DB에서 {len(stocks_data)}개 주식, {len(cryptos_data)}개 암호화폐 데이터 전송"
-        }
-        
-        await manager.send_personal_message(market_data, websocket)
-        logger.info(f"✅ DB market data sent - {len(stocks_data)} stocks, {len(cryptos_data)} cryptos")
-        
-    except Exception as e:
-        logger.error(f"❌ DB에서 데이터 조회 오류: {e}")
-        await send_cached_market_data(websocket)
-
-async def send_cached_market_data(websocket: WebSocket):
-    """캐시된 데이터를 전송 (DB 연결 실패 시 fallback)"""
-    try:
-        # 캐시 데이터 로직 (기존 코드 유지)
-        market_data = {
-            "type": "market_update",
-            "data": {
-                "stocks": [],
-                "cryptos": []
-            },
-            "timestamp": int(time.time() * 1000),
-            "data_source": "cache",
-            "message": "캐시 모드로 동작 중"
-        }
-        
-        await manager.send_personal_message(market_data, websocket)
-        logger.info("Cache market data sent")
-        
-    except Exception as e:
-        logger.error(f"❌ 캐시 데이터 전송 오류: {e}")
-
 @router.websocket("/ws/main")
 async def websocket_endpoint(websocket: WebSocket):
     """메인 WebSocket 엔드포인트 - DB 기반"""
@@ -85,12 +28,8 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.info("Started background broadcasting task")
     
     try:
-        # 연결 즉시 데이터 전송
-        db = SessionLocal()
-        try:
-            await send_market_data_from_db(websocket, db)
-        finally:
-            db.close()
+        # 연결 즉시 데이터 전송 (DB 조회는 스냅샷 서비스가 이벤트 루프 밖에서 처리)
+        await manager.send_personal_message(await market_snapshot.get_payload(), websocket)
         
         # 클라이언트로부터 메시지 대기
         while True:
@@ -99,11 +38,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 logger.info(f"Received message from client: {message}")
                 
                 if message == "get_latest":
-                    db = SessionLocal()
-                    try:
-                        await send_market_data_from_db(websocket, db)
-                    finally:
-                        db.close()
+                    await manager.send_personal_message(await market_snapshot.get_payload(), websocket)
                     
             except WebSocketDisconnect:
                 break
@@ -119,21 +54,13 @@ async def websocket_endpoint(websocket: WebSocket):
             logger.info("Stopped background broadcasting task")
 
 async def broadcast_market_data():
-    """DB에서 최근 30개 데이터를 10초마다 모든 클라이언트에게 브로드캐스트"""
+    """공유 스냅샷을 10초마다 모든 클라이언트에게 브로드캐스트"""
     while True:
         try:
             if manager.get_connection_count() > 0:
-                db = SessionLocal()
-                try:
-                    # 모든 연결된 클라이언트에게 데이터 전송
-                    for websocket in manager.active_connections.copy():
-                        try:
-                            await send_market_data_from_db(websocket, db)
-                        except Exception as e:
-                            logger.error(f"❌ 클라이언트 전송 오류: {e}")
-                            manager.disconnect(websocket)
-                finally:
-                    db.close()
+                # 스냅샷은 틱당 한 번만 생성하고 같은 메시지를 모든 클라이언트에게 전송
+                market_data = await market_snapshot.get_payload(force=True)
+                await manager.broadcast(market_data)
             
             await asyncio.sleep(10)
             
@@ -145,25 +72,25 @@ async def broadcast_market_data():
             await asyncio.sleep(10)
 
 @router.websocket("/ws/stocks")
-async def websocket_stocks_endpoint(websocket: WebSocket, symbol: str = Query(...), db: Session = Depends(get_db)):
+async def websocket_stocks_endpoint(websocket: WebSocket, symbol: str = Query(...)):
     """개별 주식 심볼용 WebSocket 엔드포인트"""
     await manager.connect(websocket, {"type": "stock", "symbol": symbol})
     logger.info(f"주식 WebSocket 연결: {symbol}")
     
     try:
-        await stock_handler.handle_stock_updates(websocket, symbol, db)
+        await stock_handler.handle_stock_updates(websocket, symbol)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         logger.info(f"주식 WebSocket 연결 해제: {symbol}")
 
 @router.websocket("/ws/crypto")
-async def websocket_crypto_endpoint(websocket: WebSocket, symbol: str = Query(...), db: Session = Depends(get_db)):
+async def websocket_crypto_endpoint(websocket: WebSocket, symbol: str = Query(...)):
     """암호화폐용 WebSocket 엔드포인트"""
     await manager.connect(websocket, {"type": "crypto", "symbol": symbol})
     logger.info(f"암호화폐 WebSocket 연결: {symbol}")
     
     try:
-        await crypto_handler.handle_crypto_updates(websocket, symbol, db)
+        await crypto_handler.handle_crypto_updates(websocket, symbol)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         logger.info(f"암호화폐 WebSocket 연결 해제: {symbol}")
@@ -1,48 +1,82 @@
-import json
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from fastapi import WebSocket, WebSocketDisconnect
+from stock.backend.utils.ws_broadcast import encode_json, SendQueues
+from stock.backend.utils.connection_registry import ConnectionRegistry
 import logging
 
 logger = logging.getLogger(__name__)
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # 연결 목록 - 타입/심볼별 색인으로 추가/제거/조회가 O(1)
+        self.registry = ConnectionRegistry()
+        self.connection_data: Dict[WebSocket, Dict[str, Any]] = self.registry.connection_data
+        # 연결별 전송 대기열 - 전송 태스크가 따라가지 못하는 연결은 대기열에서 해제 후 여기서도 제거
+        self.queues = SendQueues(on_evict=self.disconnect)
         
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, metadata: Optional[Dict[str, Any]] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
+        self.registry.add(websocket, metadata)
+        self.queues.register(websocket)
+        logger.info(f"Client connected. Total connections: {len(self.registry)}")
         
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
+        if self.registry.remove(websocket) is None:
+            return
+        self.queues.unregister(websocket)
+        logger.info(f"Client disconnected. Total connections: {len(self.registry)}")
+        
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """전체 연결 목록 (복사본)"""
+        return list(self.registry)
+        
+    def get_connections_by_type(self, connection_type: str) -> List[WebSocket]:
+        """타입별 연결 조회 - 전체를 훑지 않고 타입 색인에서 복사"""
+        return list(self.registry.by_type(connection_type))
+        
+    def get_connections_by_symbol(self, connection_type: str, symbol: str) -> List[WebSocket]:
+        """타입+심볼을 구독하는 연결 조회"""
+        return list(self.registry.by_topic(symbol, connection_type))
+        
+    def count_by_type(self, connection_type: str) -> int:
+        """타입별 연결 수 (목록을 만들지 않음)"""
+        return self.registry.count(connection_type)
         
     async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+        await self.send_encoded(encode_json(message), websocket)
+        
+    async def send_encoded(self, message_str: Union[str, bytes], websocket: WebSocket, key: Optional[str] = None) -> bool:
+        """
+        이미 직렬화된 메시지를 연결의 전송 대기열에 추가 (bytes면 바이너리 프레임)
+
+        :param key: 대기 중인 같은 키의 메시지를 이 메시지로 교체 (coalesce_latest 정책)
+        :return: 등록이 해제된(전송 실패/느린 연결로 닫힌) 연결이면 False
+        """
+        return self.queues.send(websocket, message_str, key)
             
     async def broadcast(self, message: Dict[str, Any]):
-        """모든 연결된 클라이언트에게 메시지 브로드캐스트"""
-        if not self.active_connections:
+        """모든 연결된 클라이언트에게 메시지 브로드캐스트 (직렬화는 한 번만)"""
+        if not self.registry:
             return
+        await self.send_encoded_many(encode_json(message), self.active_connections)
             
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-                
-        # 연결이 끊어진 클라이언트 제거
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def broadcast_encoded(self, message_str: Union[str, bytes], connection_type: Optional[str] = None):
+        """이미 직렬화된 메시지를 (타입별) 모든 연결에 그대로 전송"""
+        if connection_type is None:
+            targets = self.active_connections
+        else:
+            targets = self.get_connections_by_type(connection_type)
+        await self.send_encoded_many(message_str, targets)
+        
+    async def send_encoded_many(self, message_str: Union[str, bytes], targets: List[WebSocket], key: Optional[str] = None):
+        """
+        이미 직렬화된 메시지를 지정한 연결들의 전송 대기열에 그대로 추가
+
+        전송은 연결별 태스크가 처리하므로 느린 연결을 기다리지 않음 (전송 실패 연결은 대기열이 제거)
+        """
+        self.queues.fan_out(targets, message_str, key)
 
 # 글로벌 WebSocket 매니저 인스턴스
 manager = WebSocketManager()